@@ -1,174 +1,979 @@
 import pandas as pd
+import numpy as np
 import json
 import math
-
-def loadData(fileDataset,quadri,sheet):
+import os
+import glob
+import hashlib
+import string
+from collections import defaultdict
+import openpyxl
+
+"""
+Process-wide cache of parsed datasets.
+A dataset file is parsed once per process : every later call to loadData/loadCursusData on the same file
+is served from memory as long as the file on disk is unchanged.
+
+_datasetCache = dictionary with :
+    - key = (string) absolute path of the dataset file
+    - value = dictionary with :
+        - "key" : (tuple) (path, mtime, size) of the file when it was loaded
+        - "digest" : (string) content hash of the file (see getContentDigest)
+        - "format" : (string) "json" for the backend export and the week separation, "xlsx" for the datasetXXX.xlsx workbooks
+        - "diff" : (dict) changes since the previous snapshot of the same file, None if there is no previous snapshot (see diffTables)
+        - "tables" : (dict) key = sheet name, value = (dict) key = column name, value = (list) column values
+        - "sheets" : (dict) key = (quadri, sheet), value = (pandas.DataFrame) sheet view already built
+        - "weeks" : (dict) week index of a week separation, built on first use (see loadWeeks)
+        - "records" : (dict) key = quadri, value = (list) AA records of the "TFE" sheet, built on first use (see loadAARecords)
+        - "groupIdsOfCursus" : (dict) group ids of each cursus, built on first use (see loadGroupIdsOfCursus)
+        - "AAIndex" : (dict) key = quadri, value = inverted index of the AA records, built on first use (see loadAAIndex)
+        - "quadriTables" : (dict) key = (quadri, sheet), value = (dict) columns of a workbook sheet restricted to a quadrimester (see loadTable)
+
+_datasetCacheStatistics counts hits and misses at the dataset level (load avoided or not), at the sheet level (DataFrame reused or not)
+and at the compiled level (compiled file reused or JSON parsed and compiled)
+"""
+_datasetCache = {}
+_datasetCacheStatistics = {"datasetHits": 0, "datasetMisses": 0, "sheetHits": 0, "sheetMisses": 0, "compiledHits": 0, "compiledMisses": 0}
+
+"""
+Compiled datasets.
+The tables built from a dataset are saved in a binary file placed next to the source file : <source>.compiled-<digest>.npz
+The digest is a hash of the source content : a modified source gets a new compiled file and the old one is removed.
+The .npz archive contains :
+    - "manifest" : JSON (utf-8 bytes) describing each table as a list of [column name, kind, array name]
+    - "strings" : all distinct strings of the dataset, utf-8 encoded and separated by "\\0"
+    - one array per column :
+        - kind "int" = int64 values
+        - kind "float" = float64 values (missing values are NaN)
+        - kind "str" = int32 index in "strings" (-1 for a missing value)
+        - kind "mixed" = JSON (utf-8 bytes) list of the values (null for a missing value), for columns mixing numbers and strings
+          (i.e. a workbook column where some cells are typed as text)
+Loading a compiled file requires neither JSON decoding nor pandas.
+"""
+COMPILED_FORMAT_VERSION = 2
+
+"""
+Conversion of the group names used in the week separation (weekseparation.json) :
+    - GROUP_CONVERSION = key : group name in the week separation, value : group name in the model
+    - CURSUS_CONVERSION = key : group name in the week separation, value : cursus name in the model
+    - BACHELOR_CURSUS = cursus kept by loadDataFromJSON (archi and master cursus are put aside for now)
+"""
+GROUP_CONVERSION = {"BAA1-A":"BAA1_A","BAA1-B":"BAA1_B","BAB1-A":"BA1_A","BAB1-B":"BA1_B","BAB1-C":"BA1_C","BAB1-D":"BA1_D","BAB1-E":"BA1_E","BAB1-F":"BA1_F","BAB1-G":"BA1_G","BAB1-H":"BA1_H","BAA2":"BAA2","BAB2-A":"BA2_A","BAB2-B":"BA2_B","BAB2-C":"BA2_C","BAB2-D":"BA2_D","BAA3":"BAA3","BAB3-MECA LAB1":"BA3_MECA_A","BAB3-MECA LAB2":"BA3_MECA_B","BAB3-ELEC":"BA3_ELEC","BAB3-IG":"BA3_IG","BAB3-CHIM.SDM":"BA3_CHIM","BAB3-MIN":"BA3_MIN","MA1ARCHI-UtEn":"MAA1","MA1-MECA-FS CP":"MA1_MECA_A","MA1-MECA-FS GE":"MA1_MECA_B","MA1-MECA- FS Mecatro":"MA1_MECA_C","MA1CHSDM.GM":"MA1_CHIM","MA2CHSDM.PEE-OUV":"MA2_CHIM_A","MA2CHSDM.GM-OUV":"MA2_CHIM_B"}
+CURSUS_CONVERSION = {"BAA1-A": "BAA1", "BAA1-B": "BAA1", "BAB1-A": "BA1", "BAB1-B": "BA1", "BAB1-C": "BA1",
+                     "BAB1-D": "BA1", "BAB1-E": "BA1", "BAB1-F": "BA1", "BAB1-G": "BA1", "BAB1-H": "BA1",
+                     "BAA2": "BAA2", "BAB2-A": "BA2", "BAB2-B": "BA2", "BAB2-C": "BA2", "BAB2-D": "BA2",
+                     "BAA3": "BAA3", "BAB3-MECA LAB1": "BA3_MECA", "BAB3-MECA LAB2": "BA3_MECA",
+                     "BAB3-ELEC": "BA3_ELEC", "BAB3-IG": "BA3_IG", "BAB3-CHIM.SDM": "BA3_CHIM", "BAB3-MIN": "BA3_MIN",
+                     "MA1ARCHI-UtEn": "MAA1", "MA1-MECA-FS CP": "MA1_MECA", "MA1-MECA-FS GE": "MA1_MECA",
+                     "MA1-MECA- FS Mecatro": "MA1_MECA", "MA1CHSDM.GM": "MA1_CHIM",
+                     "MA2CHSDM.PEE-OUV": "MA2_CHIM", "MA2CHSDM.GM-OUV": "MA2_CHIM"}
+BACHELOR_CURSUS = ["BA1", "BA2", "BA3_CHIM", "BA3_ELEC", "BA3_IG", "BA3_MECA", "BA3_MIN"]
+
+def normalizeTeacherName(email):
     """
-    Function loading from an .xlsx file the data contained in the sheet specified by the parameter "sheet".
-    Only the quadrimester specified by the parameter "quadri" will be loaded.
+    Function converting the e-mail address of a teacher in the name used in the model.
+    i.e. "xavier.siebert@umons.ac.be" becomes "xavier siebert"
 
-    :param fileDataset: (string) file's name of the .xlsx file to load. The file must be placed in the /data folder
-    :param quadri: (string) quadrimester from which the data is loaded. Must be "Q1" or "Q2"
-    :param sheet: (string) sheet name from which the data is loaded.
-    :return dataset: (pandas.DataFrame) DataFrame containing data.
+    :param email: (string) e-mail address of the teacher
+    :return: (string) name of the teacher
     """
+    return email.split("@")[0].replace(".", " ")
 
-    dataset = {}
-    desiderata = {}
-
-    with open( "../data/"+ fileDataset, encoding='utf-8') as fh:
-        data = json.load(fh)
-
-    for des in data["desideratas"]:
-        code = des["AAID"]["code"]
-        if code not in desiderata:
-            desiderata[code] = {}
-        if "WeekStartStop" not in desiderata[code]:
-            desiderata[code]["WeekStartStop"] = {"Theorie":[1, 12], "Exercice":[1, 12], "Travaux pratiques":[1, 12], "Projet":[1, 12]}
-
-        desiderata[code]["WeekStartStop"][des["desiderataTypeID"]["type"]][0] = des["semaine_debut"]
-        # uncomment by code below when backend start to bouger ses couilles
-        #desiderata[des["AAID"]["code"]]["WeekStartStop"][des["desiderataTypeID"]["type"]][1] = des["semaine_fin"]
-
-        if "listTeacher" not in desiderata[code]:
-            desiderata[code]["listTeacher"] = des["enseignantsouhaitee"]
-
-        if "Notes" not in desiderata[code]:
-            desiderata[code]["Notes"] = {"Order":"","Rythm":""}
+class EntityRegistry:
+    """
+    Class assigning dense integer ids to the entities of the model.
+    A name is interned once, at load time : later stages index lists by id (see IdIndexedLists)
+    instead of splitting, normalizing and hashing strings in hot loops.
+
+    self.ids = dictionary with :
+        - key = (string) kind of entity ("teacher", "group", "room", "cursus" or "AA")
+        - value = dictionary with key = (string) name, value = (integer) id
+    self.names = dictionary with :
+        - key = (string) kind of entity
+        - value = (list) names, the id of an entity being its index in the list
+
+    Ids are never removed : they stay valid for the whole process, even when a dataset is reloaded.
+    """
+    KINDS = ("teacher", "group", "room", "cursus", "AA")
+
+    def __init__(self):
+        """
+        Constructor of EntityRegistry class
+        """
+        self.ids = {kind: {} for kind in self.KINDS}
+        self.names = {kind: [] for kind in self.KINDS}
+
+    def getId(self, kind, name):
+        """
+        Method returning the id of an entity, assigning a new id the first time a name is met.
+
+        :param kind: (string) kind of entity
+        :param name: (string) name of the entity
+        :return: (integer) id of the entity
+        """
+        ids = self.ids[kind]
+        if name not in ids:
+            ids[name] = len(self.names[kind])
+            self.names[kind].append(name)
+        return ids[name]
+
+    def getIds(self, kind, names):
+        """
+        Method returning the ids of several entities (see getId).
+
+        :param kind: (string) kind of entity
+        :param names: (iterable) names of the entities
+        :return: (tuple) ids, in the order of "names"
+        """
+        return tuple(self.getId(kind, name) for name in names)
+
+    def getName(self, kind, entityId):
+        """
+        Method returning the name of an entity from its id.
+
+        :param kind: (string) kind of entity
+        :param entityId: (integer) id of the entity
+        :return: (string) name of the entity
+        """
+        return self.names[kind][entityId]
+
+    def size(self, kind):
+        """
+        Method returning the number of entities of a kind (= the first unused id).
+
+        :param kind: (string) kind of entity
+        :return: (integer) number of entities
+        """
+        return len(self.names[kind])
+
+class IdIndexedLists:
+    """
+    Class storing one list per entity, indexed by the id of the entity (see EntityRegistry).
+    It replaces a defaultdict(list) keyed by names in hot loops.
+    The order in which entities are used for the first time is kept, so the conversion to a dictionary (toNameDict)
+    gives the same keys in the same order as the former defaultdict(list).
+    """
+    __slots__ = ("lists", "order")
+
+    def __init__(self, size=0):
+        """
+        Constructor of IdIndexedLists class
+
+        :param size: (integer) expected number of entities (the storage grows if needed)
+        """
+        self.lists = [None] * size
+        self.order = []
+
+    def get(self, entityId):
+        """
+        Method returning the list of an entity, created empty if the entity is used for the first time.
+
+        :param entityId: (integer) id of the entity
+        :return: (list) list of the entity
+        """
+        if entityId >= len(self.lists):
+            self.lists.extend([None] * (entityId + 1 - len(self.lists)))
+        entityList = self.lists[entityId]
+        if entityList is None:
+            entityList = self.lists[entityId] = []
+            self.order.append(entityId)
+        return entityList
+
+    def extend(self, other):
+        """
+        Method appending the lists of another IdIndexedLists, entity by entity, in the order of first use of "other".
+
+        :param other: (IdIndexedLists) lists to append
+        """
+        for entityId in other.order:
+            self.get(entityId).extend(other.lists[entityId])
+
+    def toNameDict(self, registry, kind):
+        """
+        Method converting the lists in a defaultdict(list) keyed by entity names.
+
+        :param registry: (EntityRegistry) registry which assigned the ids
+        :param kind: (string) kind of entity
+        :return: (defaultdict) key = (string) entity name, value = (list) list of the entity
+        """
+        nameDict = defaultdict(list)
+        for entityId in self.order:
+            nameDict[registry.getName(kind, entityId)] = self.lists[entityId]
+        return nameDict
+
+"""
+Process-wide registry shared by all datasets and all stages of the model building (see EntityRegistry).
+"""
+registry = EntityRegistry()
+
+def getDatasetPath(fileDataset):
+    """
+    Function returning the absolute path of a dataset file placed in the /data folder.
+    Scripts are launched from the /model folder, hence the "../data/" prefix.
 
-        if "exoAfterTheo" not in desiderata[code]:
-            desiderata[code]["exoAfterTheo"] = int(des["exoAfterTheo"])
+    :param fileDataset: (string) file name of the dataset
+    :return: (string) absolute path of the dataset
+    """
+    return os.path.abspath(os.path.join("..", "data", fileDataset))
 
+def getContentDigest(content):
+    """
+    Function returning the hash identifying a compiled dataset.
+    The version of the compiled format is part of the hash : changing the format invalidates all compiled files.
 
+    :param content: (bytes) content of the source file
+    :return: (string) hexadecimal digest
+    """
+    return hashlib.sha1(str(COMPILED_FORMAT_VERSION).encode() + content).hexdigest()[:16]
 
+def getCompiledPath(path, digest):
+    """
+    Function returning the path of the compiled file of a source dataset.
 
-    #TFE Sheet
-    if sheet == "TFE":
-        dataset = {"cursus":[],"id":[],"name":[],"quadri":[],"lectureHours":[],"lectureTeachers":[],"lectureRooms":[],"lectureWeekStart":[],"lectureWeekEnd":[],"exerciseHours":[],"exerciseDivisions":[],"exerciseTeachers":[],"exerciseRooms":[],"exerciseSplit":[],"exerciseWeekStart":[],"exerciseWeekEnd":[],"tpHours":[],"tpDuration":[],"tpDivisions":[],"tpTeachers":[],"tpRooms":[],"tpWeekStart":[],"tpWeekEnd":[],"projectHours":[],"projectDuration":[],"projectTeachers":[],"projectWeekStart":[],"projectWeekEnd":[],"TP_special":[],"Remediations":[],"Visits":[],"Order":[],"Rythm":[],"Lec > Ex":[],"Alterné / Bloc":[]}
+    :param path: (string) absolute path of the source dataset
+    :param digest: (string) content hash of the source dataset (see getContentDigest)
+    :return: (string) absolute path of the compiled file
+    """
+    return path + ".compiled-" + digest + ".npz"
 
-        for AA in data["aas"]:
-            # Cursus
-            cursus = ""
-            for cohorte in AA["cohortes"]:
-                if cohorte["cohorteName"] == "BA IC (B3 - TC)":
-                    cursus += "BA IC (B3 - CHIMIE/SDM),BA IC (B3 - ELEC),BA IC (B3 - IG),BA IC (B3 - MECA),BA IC (B3 - MINES),"
-                else:
-                    cursus += cohorte["cohorteName"] + ","
+def loadDataset(fileDataset):
+    """
+    Function returning the cache entry of a dataset (see _datasetCache), loading the file only if needed.
+    The entry is identified by (path, mtime, size) : if the file has been modified since the last load, it is loaded again.
+    Loading first looks for a compiled file matching the content hash of the source (see compileDataset).
 
-            dataset["cursus"].append(cursus[:-1])
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :return: (dict) cache entry of the dataset
+    """
+    path = getDatasetPath(fileDataset)
+    fileStatus = os.stat(path)
+    key = (path, fileStatus.st_mtime_ns, fileStatus.st_size)
+
+    entry = _datasetCache.get(path)
+    if entry is not None and entry["key"] == key:
+        _datasetCacheStatistics["datasetHits"] += 1
+        return entry
+
+    # the previous snapshot of the file is the version loaded in this process, or else the last compiled file
+    previous = None
+    if entry is not None:
+        previous = (entry["digest"], entry["tables"])
+
+    _datasetCacheStatistics["datasetMisses"] += 1
+    with open(path, "rb") as fh:
+        content = fh.read()
+    digest = getContentDigest(content)
+
+    datasetFormat = "xlsx" if path.endswith(".xlsx") else "json"
+
+    compiledPath = getCompiledPath(path, digest)
+    if os.path.exists(compiledPath):
+        _datasetCacheStatistics["compiledHits"] += 1
+        tables = readCompiledTables(compiledPath)
+    else:
+        _datasetCacheStatistics["compiledMisses"] += 1
+        if datasetFormat == "xlsx":
+            tables = buildTablesFromWorkbook(path)
+        else:
+            tables = buildTables(json.loads(content.decode("utf-8")))
+        if previous is None:
+            previous = readPreviousSnapshot(path)
+        writeCompiledTables(path, digest, tables)
+
+    diff = None
+    if previous is not None:
+        diff = diffTables(previous[1], tables)
+        diff["previousDigest"] = previous[0]
+
+    entry = {"key": key, "digest": digest, "format": datasetFormat, "diff": diff, "tables": tables, "sheets": {}}
+    _datasetCache[path] = entry
+    return entry
+
+def compileDataset(fileDataset):
+    """
+    Function compiling a dataset (if not already done) and returning the path of its compiled file.
+    Calling it once after each export of the backend makes every later model build skip JSON decoding (or workbook parsing).
 
-            # Id/name/quadri/lectureHours/lectureTeachers:
-            dataset["id"].append(AA["code"])
-            dataset["name"].append(AA["name"])
-            dataset["quadri"].append(AA["quadri"])
-            dataset["lectureHours"].append(AA["ht"])
-            dataset["lectureTeachers"].append(",".join([x.split("@")[0].replace("."," ") for x in AA["titulaires"]]))
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :return: (string) absolute path of the compiled file
+    """
+    entry = loadDataset(fileDataset)
+    compiledPath = getCompiledPath(entry["key"][0], entry["digest"])
+    if not os.path.exists(compiledPath):
+        writeCompiledTables(entry["key"][0], entry["digest"], entry["tables"])
+    return compiledPath
 
-            #lectureRooms (to see later)
-            dataset["lectureRooms"].append("")
+def invalidateDatasetCache(fileDataset=None):
+    """
+    Function removing a dataset from the cache (or all datasets if "fileDataset" is None).
+    The next call to loadData/loadCursusData will load the file again (compiled files on disk are kept).
 
-            #lectureWeekStart/lectureWeekEnd
-            if AA["code"] in desiderata:
-                dataset["lectureWeekStart"].append(desiderata[AA["code"]]["WeekStartStop"]["Theorie"][0])
-                dataset["lectureWeekEnd"].append(desiderata[AA["code"]]["WeekStartStop"]["Theorie"][1])
-            else:
-                dataset["lectureWeekStart"].append(1)
-                dataset["lectureWeekEnd"].append(12)
-                print(AA["code"],": No desiderata available")
+    :param fileDataset: (string) file name of the dataset to forget, None to clear the whole cache
+    """
+    if fileDataset is None:
+        _datasetCache.clear()
+    else:
+        _datasetCache.pop(getDatasetPath(fileDataset), None)
 
+def readPreviousSnapshot(path):
+    """
+    Function loading the last compiled file of a source dataset, before it is replaced by the compiled file of the new content.
+    An unreadable compiled file is ignored.
 
+    :param path: (string) absolute path of the source dataset
+    :return: (string, dict) digest and tables of the previous snapshot, None if there is none
+    """
+    for compiledPath in glob.glob(glob.escape(path) + ".compiled-*.npz"):
+        try:
+            return compiledPath[len(path) + len(".compiled-"):-len(".npz")], readCompiledTables(compiledPath)
+        except (OSError, ValueError, KeyError) as error:
+            print("Previous compiled dataset ignored :", error)
+    return None
+
+def getDatasetDiff(fileDataset):
+    """
+    Function returning the changes of a dataset since its previous snapshot (see diffTables).
 
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :return: (dict) diff of the dataset, None if the dataset has no previous snapshot
+    """
+    return loadDataset(fileDataset)["diff"]
 
-            #exerciseHours
-            dataset["exerciseHours"].append(AA["htpe"])
+def getAffectedAAs(fileDataset, digest):
+    """
+    Function returning the AAs to rebuild when something was built from the version "digest" of a dataset.
+    Only the last change is known : a build older than the previous snapshot must be rebuilt entirely.
 
-            #exerciseDivisions/exerciseSplit
-            exodiv = {"V-LANG-151":8,"V-LANG-153":4,"V-LANG-155":4,"V-LANG-152":8,"V-LANG-154":4,"V-LANG-156":4}
-            if AA["code"] in exodiv:
-                dataset["exerciseDivisions"].append(exodiv[AA["code"]])
-                dataset["exerciseSplit"].append(1)
-            else:
-                dataset["exerciseDivisions"].append(1)
-                dataset["exerciseSplit"].append(0)
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :param digest: (string) content hash of the dataset version used by the previous build
+    :return: (set) codes of the AAs to rebuild (empty if nothing changed), None if everything must be rebuilt
+    """
+    entry = loadDataset(fileDataset)
+    if digest == entry["digest"]:
+        return set()
+    if entry["diff"] is not None and digest == entry["diff"]["previousDigest"]:
+        return entry["diff"]["affectedAAs"]
+    return None
+
+def getDatasetCacheStatistics():
+    """
+    Function returning a copy of the hit/miss counters of the dataset cache.
 
-            #exerciseTeachers
-            if AA["code"] in desiderata:
-                dataset["exerciseTeachers"].append(",".join([x.split("@")[0].replace("."," ") for x in desiderata[AA["code"]]["listTeacher"] ]))
-            else:
-                dataset["exerciseTeachers"].append("")
+    :return: (dict) dictionary with keys "datasetHits", "datasetMisses", "sheetHits", "sheetMisses", "compiledHits", "compiledMisses"
+    """
+    return dict(_datasetCacheStatistics)
 
-            # exerciseRooms (to see later)
-            dataset["exerciseRooms"].append("")
+def normalizeColumn(values):
+    """
+    Function giving a column the same typing as a pandas DataFrame column :
+    a numeric column with missing values (None or NaN) or with at least one float becomes a float column with NaN for missing values.
+    Tables built from JSON and tables read from a compiled file are thus identical.
 
-            # exerciseWeekStart/exerciseWeekEnd
-            if AA["code"] in desiderata:
-                dataset["exerciseWeekStart"].append(desiderata[AA["code"]]["WeekStartStop"]["Exercice"][0])
-                dataset["exerciseWeekEnd"].append(desiderata[AA["code"]]["WeekStartStop"]["Exercice"][1])
-            else:
-                dataset["exerciseWeekStart"].append(1)
-                dataset["exerciseWeekEnd"].append(12)
+    :param values: (list) column values
+    :return: (list) normalized column values
+    """
+    present = [v for v in values if not isMissing(v)]
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        if len(present) == len(values) and all(isinstance(v, int) for v in present):
+            return values
+        return [float("nan") if isMissing(v) else float(v) for v in values]
+    return values
+
+def encodeColumn(values, stringIndex):
+    """
+    Function converting a column in a numpy array for the compiled format.
 
-            # tpHours/tpDuration/tpDivisions
-            dataset["tpHours"].append(AA["htps"])
-            dataset["tpDuration"].append(4)
-            dataset["tpDivisions"].append(4)
+    :param values: (list) column values
+    :param stringIndex: (dict) key = string, value = index in the string table. New strings are added to it
+    :return: (string, numpy.ndarray) kind of the column ("int", "float", "str" or "mixed") and encoded values
+    """
+    missingValues = [isMissing(v) for v in values]
+    present = [v for v, missing in zip(values, missingValues) if not missing]
+
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present) or all(isinstance(v, bool) for v in present):
+        if not any(missingValues) and all(isinstance(v, (int, bool)) for v in present):
+            return "int", np.array(values, dtype=np.int64)
+        return "float", np.array([float("nan") if missing else v for v, missing in zip(values, missingValues)], dtype=np.float64)
+
+    if not all(isinstance(v, str) for v in present):
+        mixed = json.dumps([None if missing else v for v, missing in zip(values, missingValues)])
+        return "mixed", np.frombuffer(mixed.encode("utf-8"), dtype=np.uint8)
+
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, (v, missing) in enumerate(zip(values, missingValues)):
+        if missing:
+            codes[i] = -1
+        else:
+            codes[i] = stringIndex.setdefault(str(v), len(stringIndex))
+    return "str", codes
+
+def writeCompiledTables(path, digest, tables):
+    """
+    Function saving tables in the compiled file of a source dataset and removing compiled files of older versions of the source.
+    Failing to write (i.e. read-only /data folder) is not an error : the dataset will simply be compiled again next time.
 
-            # tpTeachers
-            if AA["code"] in desiderata:
-                dataset["tpTeachers"].append(",".join([x.split("@")[0].replace(".", " ") for x in desiderata[AA["code"]]["listTeacher"]]))
-            else:
-                dataset["tpTeachers"].append("")
+    :param path: (string) absolute path of the source dataset
+    :param digest: (string) content hash of the source dataset
+    :param tables: (dict) key = table name, value = (dict) key = column name, value = (list) column values
+    """
+    stringIndex = {}
+    arrays = {}
+    manifest = {"version": COMPILED_FORMAT_VERSION, "source": os.path.basename(path), "digest": digest, "tables": {}}
+    for tableName, columns in tables.items():
+        manifest["tables"][tableName] = []
+        for columnName, values in columns.items():
+            arrayName = "c" + str(len(arrays))
+            kind, arrays[arrayName] = encodeColumn(values, stringIndex)
+            manifest["tables"][tableName].append([columnName, kind, arrayName])
+
+    arrays["strings"] = np.frombuffer("\0".join(stringIndex).encode("utf-8"), dtype=np.uint8)
+    arrays["manifest"] = np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8)
+
+    compiledPath = getCompiledPath(path, digest)
+    try:
+        for oldCompiledPath in glob.glob(glob.escape(path) + ".compiled-*.npz"):
+            os.remove(oldCompiledPath)
+        # writing in a temporary file first, so a concurrent run never reads a half-written archive
+        with open(compiledPath + ".tmp", "wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(compiledPath + ".tmp", compiledPath)
+    except OSError as error:
+        print("Compiled dataset not saved :", error)
+
+def readCompiledTables(compiledPath):
+    """
+    Function loading tables from a compiled file (see writeCompiledTables).
 
-            # tpRooms (to see later)
-            dataset["tpRooms"].append("")
+    :param compiledPath: (string) absolute path of the compiled file
+    :return tables: (dict) key = table name, value = (dict) key = column name, value = (list) column values
+    """
+    with np.load(compiledPath, allow_pickle=False) as archive:
+        manifest = json.loads(archive["manifest"].tobytes().decode("utf-8"))
+        strings = archive["strings"].tobytes().decode("utf-8").split("\0")
+        tables = {}
+        for tableName, columns in manifest["tables"].items():
+            tables[tableName] = {}
+            for columnName, kind, arrayName in columns:
+                values = archive[arrayName]
+                if kind == "str":
+                    tables[tableName][columnName] = [strings[c] if c >= 0 else float("nan") for c in values.tolist()]
+                elif kind == "mixed":
+                    tables[tableName][columnName] = [float("nan") if v is None else v for v in json.loads(values.tobytes().decode("utf-8"))]
+                else:
+                    tables[tableName][columnName] = values.tolist()
+    return tables
+
+"""
+Columns of the "TFE" sheet filled from the desiderata of the backend export (see buildSheet)
+"""
+DESIDERATA_COLUMNS = ["lectureWeekStart", "lectureWeekEnd", "exerciseTeachers", "exerciseWeekStart", "exerciseWeekEnd",
+                      "tpTeachers", "tpWeekStart", "tpWeekEnd", "projectTeachers", "projectWeekStart", "projectWeekEnd",
+                      "Order", "Rythm", "Lec > Ex"]
+
+"""
+Columns of the "TFE" sheet holding teacher names separated with ","
+"""
+TEACHERS_COLUMNS = ["lectureTeachers", "exerciseTeachers", "tpTeachers", "projectTeachers"]
+
+def getRowsById(columns, idColumn):
+    """
+    Function indexing the lines of a table by the value of one column. Missing values are replaced by None, so lines can be compared.
 
-            # tpWeekStart/tpWeekEnd
-            if AA["code"] in desiderata:
-                dataset["tpWeekStart"].append(desiderata[AA["code"]]["WeekStartStop"]["Travaux pratiques"][0])
-                dataset["tpWeekEnd"].append(desiderata[AA["code"]]["WeekStartStop"]["Travaux pratiques"][1])
-            else:
-                dataset["tpWeekStart"].append(1)
-                dataset["tpWeekEnd"].append(12)
+    :param columns: (dict) key = column name, value = (list) column values
+    :param idColumn: (string) column identifying a line
+    :return: (dict) key = identifier, value = (list) lines with this identifier, each line being a dict column name -> value
+    """
+    names = list(columns.keys())
+    rows = {}
+    for values in zip(*columns.values()):
+        row = {name: None if isMissing(value) else value for name, value in zip(names, values)}
+        rows.setdefault(row[idColumn], []).append(row)
+    return rows
+
+def isSameTable(table1, table2):
+    """
+    Function comparing two tables, missing values (NaN) being equal to each other.
 
+    :param table1: (dict) key = column name, value = (list) column values, or None
+    :param table2: (dict) key = column name, value = (list) column values, or None
+    :return: (boolean) True if both tables have the same columns with the same values
+    """
+    if table1 is None or table2 is None or table1.keys() != table2.keys():
+        return table1 is None and table2 is None
+    return all([None if isMissing(v) else v for v in table1[c]] == [None if isMissing(v) else v for v in table2[c]] for c in table1)
 
+def getTeachers(tables):
+    """
+    Function returning all teacher names of a dataset ("TFE" sheet and unavailabilities of the "Teachers" sheet).
 
+    :param tables: (dict) tables of the dataset
+    :return: (set) teacher names
+    """
+    teachers = set()
+    for column in TEACHERS_COLUMNS:
+        for value in tables.get("TFE", {}).get(column, []):
+            if isinstance(value, str):
+                teachers.update(t for t in value.split(",") if t != "")
+    teachers.update(t for t in tables.get("Teachers", {}).get("teacher", []) if isinstance(t, str))
+    return teachers
+
+def diffTables(oldTables, newTables):
+    """
+    Function computing the structural changes between two snapshots of a dataset (tables as built by loadDataset).
+    The diff is a dictionary with :
+        - "AAs" = dictionary with "added" and "removed" (list of AA codes) and "changed" (dict key = AA code, value = list of changed columns)
+        - "desiderata" = (list) codes of the AAs whose desiderata changed (columns of DESIDERATA_COLUMNS)
+        - "groups" = dictionary with "added", "removed" and "changed" (number of students) : lists of group names
+        - "teachers" = dictionary with "added" and "removed" : lists of teacher names
+        - "sheets" = (list) other tables whose content changed (i.e. "Cursus", "Teachers", "Breaks", "Weeks")
+        - "affectedAAs" = (set) codes of the AAs whose interval variables and constraints must be rebuilt :
+            added or changed AAs and AAs followed by a cursus whose groups changed
+
+    :param oldTables: (dict) tables of the previous snapshot
+    :param newTables: (dict) tables of the current snapshot
+    :return diff: (dict) diff described above
+    """
+    emptyTFE = {"id": [], "cursus": []}
+    oldAAs = getRowsById(oldTables.get("TFE", emptyTFE), "id")
+    newAAs = getRowsById(newTables.get("TFE", emptyTFE), "id")
+    changedAAs = {}
+    for AA in newAAs.keys() & oldAAs.keys():
+        if newAAs[AA] != oldAAs[AA]:
+            columns = set(newAAs[AA][0].keys()) | set(oldAAs[AA][0].keys())
+            changedAAs[AA] = sorted(c for c in columns
+                                    if [row.get(c) for row in newAAs[AA]] != [row.get(c) for row in oldAAs[AA]])
+
+    emptyGroups = {"cursus": [], "group": [], "numberOfStudents": []}
+    oldGroups = getRowsById(oldTables.get("Groups", emptyGroups), "group")
+    newGroups = getRowsById(newTables.get("Groups", emptyGroups), "group")
+    changedGroups = [g for g in newGroups.keys() & oldGroups.keys() if newGroups[g] != oldGroups[g]]
+    addedGroups = [g for g in newGroups if g not in oldGroups]
+    removedGroups = [g for g in oldGroups if g not in newGroups]
+    changedCursus = {row["cursus"] for g in changedGroups + addedGroups for row in newGroups[g]} | \
+                    {row["cursus"] for g in changedGroups + removedGroups for row in oldGroups[g]}
+
+    oldTeachers = getTeachers(oldTables)
+    newTeachers = getTeachers(newTables)
+
+    affectedAAs = set(changedAAs) | {AA for AA in newAAs if AA not in oldAAs}
+    for AA, rows in newAAs.items():
+        if any(cursus in changedCursus for row in rows if isinstance(row["cursus"], str) for cursus in row["cursus"].split(",")):
+            affectedAAs.add(AA)
+
+    return {
+        "AAs": {"added": [AA for AA in newAAs if AA not in oldAAs],
+                "removed": [AA for AA in oldAAs if AA not in newAAs],
+                "changed": changedAAs},
+        "desiderata": [AA for AA, columns in changedAAs.items() if any(c in DESIDERATA_COLUMNS for c in columns)],
+        "groups": {"added": addedGroups, "removed": removedGroups, "changed": changedGroups},
+        "teachers": {"added": sorted(newTeachers - oldTeachers), "removed": sorted(oldTeachers - newTeachers)},
+        "sheets": [table for table in sorted(oldTables.keys() | newTables.keys())
+                   if table not in ("TFE", "Groups") and not isSameTable(oldTables.get(table), newTables.get(table))],
+        "affectedAAs": affectedAAs
+    }
+
+def buildTables(data):
+    """
+    Function building all tables of a parsed JSON dataset :
+        - the backend export (dict) gives the sheets "TFE", "Cursus", "Teachers", "Breaks", "Charleroi", "CharleroiFixed" and "Groups"
+        - the week separation (list of weeks) gives the table "Weeks"
 
-            # projectHours/projectDuration
-            dataset["projectHours"].append(0)
-            dataset["projectDuration"].append(4)
+    :param data: (dict or list) parsed JSON dataset
+    :return tables: (dict) key = table name, value = (dict) key = column name, value = (list) column values
+    """
+    if isinstance(data, list):
+        tables = {"Weeks": buildWeeksTable(data)}
+    else:
+        desiderata = DesiderataIndex(data)
+        tables = {sheet: buildSheet(data, desiderata, sheet) for sheet in ["TFE", "Cursus", "Teachers", "Breaks", "Charleroi", "CharleroiFixed"]}
+
+        tables["Groups"] = {"cursus": [], "group": [], "numberOfStudents": []}
+        for group in data["groupes"]:
+            tables["Groups"]["cursus"].append(group["cohorteName"])
+            tables["Groups"]["group"].append(group["name"])
+            tables["Groups"]["numberOfStudents"].append(group["numberOfStudents"])
+
+    return {tableName: {columnName: normalizeColumn(values) for columnName, values in columns.items()} for tableName, columns in tables.items()}
+
+"""
+Sheets read from the datasetXXX.xlsx workbooks (missing sheets are skipped)
+"""
+WORKBOOK_SHEETS = ["TFE", "Cursus", "Teachers", "Breaks", "Charleroi", "CharleroiFixed", "Groups"]
+
+def buildTablesFromWorkbook(path):
+    """
+    Function building the tables of a datasetXXX.xlsx workbook, with the same sheet names as the backend export.
+    The workbook is opened in read-only mode : rows are streamed one by one and never held as cells in memory.
+    Formulas are replaced by the value computed by Excel at the last save.
+    Columns are typed as pandas.read_excel would do : trailing empty lines and unnamed empty columns are dropped,
+    missing cells are NaN and numeric columns with missing cells are float columns.
+    The "Groups" sheet of a workbook (cursus, numberGroups, totalStudents) is expanded in one line per group (see buildGroupsTable).
+
+    :param path: (string) absolute path of the workbook
+    :return tables: (dict) key = table name, value = (dict) key = column name, value = (list) column values
+    """
+    tables = {}
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in WORKBOOK_SHEETS:
+            if sheet not in workbook.sheetnames:
+                continue
+            rows = workbook[sheet].iter_rows(values_only=True)
+            header = next(rows, ())
+            values = [[] for c in header]
+            numberOfRows = 0
+            for row in rows:
+                if all(v is None for v in row):
+                    # empty lines are only kept if a non-empty line follows (see below)
+                    for c in range(len(header)):
+                        values[c].append(float("nan"))
+                    continue
+                for c in range(len(header)):
+                    v = row[c] if c < len(row) else None
+                    values[c].append(float("nan") if v is None else v)
+                numberOfRows = len(values[0])
+
+            columns = {}
+            for c, name in enumerate(header):
+                column = values[c][:numberOfRows]
+                if name is None:
+                    if all(isMissing(v) for v in column):
+                        continue
+                    name = "Unnamed: " + str(c)
+                columns[str(name)] = column
+            tables[sheet] = columns
+    finally:
+        workbook.close()
 
-            # projectTeachers/projectWeekStart/projectWeekEnd
-            if AA["code"] in desiderata:
-                dataset["projectTeachers"].append(",".join([x.split("@")[0].replace(".", " ") for x in desiderata[AA["code"]]["listTeacher"]]))
-                dataset["projectWeekStart"].append(desiderata[AA["code"]]["WeekStartStop"]["Projet"][0])
-                dataset["projectWeekEnd"].append(desiderata[AA["code"]]["WeekStartStop"]["Projet"][1])
-            else:
-                dataset["projectTeachers"].append("")
-                dataset["projectWeekStart"].append(1)
-                dataset["projectWeekEnd"].append(12)
+    if "Groups" in tables:
+        tables["Groups"] = buildGroupsTable(tables["Groups"])
 
+    return {tableName: {columnName: normalizeColumn(values) for columnName, values in columns.items()} for tableName, columns in tables.items()}
 
+def buildGroupsTable(columns):
+    """
+    Function expanding the "Groups" sheet of a workbook in one line per group, as in the backend export.
+    Group names are generated from the cursus name (i.e. BA1_A, BA1_B, ... or BA3_CHIM when the cursus has a single group)
+    and students are spread off equally between groups, the first groups getting the remaining students.
+    For example, the "BA3_MECA,3,32" line will result in :
+        - BA3_MECA_A,11
+        - BA3_MECA_B,11
+        - BA3_MECA_C,10
 
+    :param columns: (dict) columns "cursus", "numberGroups" and "totalStudents" of the sheet
+    :return table: (dict) key = column name ("cursus", "group", "numberOfStudents"), value = (list) column values
+    """
+    table = {"cursus": [], "group": [], "numberOfStudents": []}
+    for cursus, numberGroups, totalStudents in zip(columns["cursus"], columns["numberGroups"], columns["totalStudents"]):
+        if isMissing(cursus):
+            continue
+        numberGroups = int(numberGroups)
+        quotient, remainder = divmod(int(totalStudents), numberGroups)
+        for g in range(numberGroups):
+            table["cursus"].append(cursus)
+            table["group"].append(cursus + "_" + string.ascii_uppercase[g] if numberGroups > 1 else cursus)
+            table["numberOfStudents"].append(quotient + (1 if g < remainder else 0))
+    return table
+
+def buildWeeksTable(data):
+    """
+    Function flattening the week separation (see loadDataFromJSON) in a table with one line per lesson :
+        - week = (integer) week index (from 0)
+        - subject = (string) "AA code:lesson type"
+        - prof = (string) teachers ids separated with ","
+        - group = (string) groups separated with ","
+
+    :param data: (list) parsed JSON week separation
+    :return table: (dict) key = column name, value = (list) column values
+    """
+    table = {"week": [], "subject": [], "prof": [], "group": []}
+    for week in data:
+        for nameSemaine, lessons in week.items():
+            for lesson in lessons:
+                table["week"].append(int(nameSemaine.split()[1]))
+                table["subject"].append(lesson["subject"])
+                table["prof"].append(",".join(str(p) for p in lesson["prof"]))
+                table["group"].append(",".join(str(g) for g in lesson["group"]))
+    return table
+
+def loadWeeks(fileDataset):
+    """
+    Function returning all weeks of a week separation (i.e. weekseparation.json), indexed by week.
+    The file is read once (see loadDataset) and the index is built once : asking for several weeks costs a single pass.
+    Each lesson is a dictionary with :
+        - "subject" = (string) "AA code:lesson type" as written in the file
+        - "id" = (string) AA code
+        - "type" = (string) lesson type ("theory", "theory_exercise", "mixed", "exercise", "TP" or "project")
+        - "teachers" = (list) teachers ids (integers, as in the file)
+        - "groups" = (list) group names as in the file (see GROUP_CONVERSION for their names in the model)
+        - "cursus" = (list) distinct cursus names converted with CURSUS_CONVERSION (unknown groups are ignored)
+
+    :param fileDataset: (string) file name of the week separation. The file must be placed in the /data folder
+    :return weeks: (dict) dictionary with :
+        - key = (integer) week index (from 0)
+        - value = (list) lessons of the week, in the order of the file
+    """
+    entry = loadDataset(fileDataset)
+    if "weeks" in entry:
+        return entry["weeks"]
+
+    weeks = {}
+    table = entry["tables"]["Weeks"]
+    for week, subject, prof, group in zip(table["week"], table["subject"], table["prof"], table["group"]):
+        listOfGroups = group.split(",") if group != "" else []
+        IdAA, lessonType = subject.split(":")
+        weeks.setdefault(week, []).append({
+            "subject": subject,
+            "id": IdAA,
+            "type": lessonType,
+            "teachers": [int(p) for p in prof.split(",")] if prof != "" else [],
+            "groups": listOfGroups,
+            # dict.fromkeys removes duplicates while keeping the order of the groups
+            "cursus": list(dict.fromkeys(CURSUS_CONVERSION[g] for g in listOfGroups if g in CURSUS_CONVERSION))
+        })
+
+    entry["weeks"] = weeks
+    return weeks
+
+class DesiderataIndex:
+    """
+    Class indexing the "desideratas" list of the JSON dataset, built once per dataset (see buildTables).
+    Every lookup of the "TFE" sheet is a dictionary access : the sheet is filled column by column (see buildSheet)
+    instead of testing and normalizing the desiderata of every AA once per column.
+
+    self.weekBounds = dictionary with key = (AA code, lesson type), value = (tuple) (first week, last week)
+    self.teachers = dictionary with key = (AA code, lesson type), value = (tuple) normalized teacher names
+    self.AATeachers = dictionary with key = AA code, value = (string) normalized teacher names of the first desiderata, joined with ","
+    self.exoAfterTheo = dictionary with key = AA code, value = (integer) exoAfterTheo of the first desiderata
+
+    Layout :
+        - the week bounds of a lesson type are ("semaine_debut", "semaine_fin") of its desiderata, a first week set to None stays None
+        - the last week is 12 (DEFAULT_WEEK_BOUNDS) when "semaine_fin" is missing or None, and both bounds are DEFAULT_WEEK_BOUNDS for a lesson type without desiderata
+        - a desiderata of the same AA and lesson type given later replaces the week bounds and teachers of the previous one
+        - the teachers of the exercises, tp and projects of an AA (AATeachers) and its exoAfterTheo are the ones of its first desiderata, whatever its type
+        - "Order" and "Rythm" are not read from the desideratas : buildSheet writes "" in these columns for every AA
+    """
+    __slots__ = ("weekBounds", "teachers", "AATeachers", "exoAfterTheo")
+
+    LESSON_TYPES = ("Theorie", "Exercice", "Travaux pratiques", "Projet")
+    DEFAULT_WEEK_BOUNDS = (1, 12)
+
+    def __init__(self, data):
+        """
+        Constructor of DesiderataIndex class
+
+        :param data: (dict) parsed JSON dataset
+        """
+        self.weekBounds = {}
+        self.teachers = {}
+        self.AATeachers = {}
+        self.exoAfterTheo = {}
+
+        for des in data["desideratas"]:
+            code = des["AAID"]["code"]
+            lessonType = des["desiderataTypeID"]["type"]
+            teachers = tuple(normalizeTeacherName(x) for x in des["enseignantsouhaitee"])
+            weekEnd = des.get("semaine_fin")
+
+            self.weekBounds[(code, lessonType)] = (des["semaine_debut"], self.DEFAULT_WEEK_BOUNDS[1] if weekEnd is None else weekEnd)
+            self.teachers[(code, lessonType)] = teachers
+            if code not in self.AATeachers:
+                self.AATeachers[code] = ",".join(teachers)
+                self.exoAfterTheo[code] = int(des["exoAfterTheo"])
+
+    def __contains__(self, code):
+        """
+        Method testing if an AA has at least one desiderata.
+
+        :param code: (string) AA code
+        :return: (boolean) True if the AA has a desiderata
+        """
+        return code in self.AATeachers
+
+    def getWeekBounds(self, code, lessonType):
+        """
+        Method returning the week bounds of a lesson type of an AA.
+
+        :param code: (string) AA code
+        :param lessonType: (string) lesson type (see LESSON_TYPES)
+        :return: (tuple) (first week, last week), DEFAULT_WEEK_BOUNDS without desiderata
+        """
+        return self.weekBounds.get((code, lessonType), self.DEFAULT_WEEK_BOUNDS)
+
+    def getTeachers(self, code, lessonType=None):
+        """
+        Method returning the teachers wished for an AA.
+
+        :param code: (string) AA code
+        :param lessonType: (string) lesson type (see LESSON_TYPES). None gives the teachers used in the "TFE" sheet
+        :return: (string or tuple) names joined with "," ("" without desiderata) if lessonType is None,
+            (tuple) names of the desiderata of this type otherwise (empty without desiderata)
+        """
+        if lessonType is None:
+            return self.AATeachers.get(code, "")
+        return self.teachers.get((code, lessonType), ())
+
+    def getExoAfterTheo(self, code):
+        """
+        Method returning the "Lec > Ex" value of an AA.
+
+        :param code: (string) AA code
+        :return: (integer) exoAfterTheo of the first desiderata, 1 without desiderata
+        """
+        return self.exoAfterTheo.get(code, 1)
 
 
+def loadData(fileDataset,quadri,sheet):
+    """
+    Function loading from an .xlsx file the data contained in the sheet specified by the parameter "sheet".
+    Only the quadrimester specified by the parameter "quadri" will be loaded.
 
-            dataset["TP_special"].append(0)
-            dataset["Remediations"].append(AA["hr"])
-            dataset["Visits"].append(0)
-            if AA["code"] in desiderata:
-                dataset["Order"].append(desiderata[AA["code"]]["Notes"]["Order"])
-                dataset["Rythm"].append(desiderata[AA["code"]]["Notes"]["Rythm"])
-                dataset["Lec > Ex"].append(desiderata[AA["code"]]["exoAfterTheo"])
-            else:
-                dataset["Order"].append("")
-                dataset["Rythm"].append("")
-                dataset["Lec > Ex"].append(1)
+    The file is parsed once per process (see loadDataset) and each (quadri, sheet) view is built once.
+    The returned DataFrame is shared between callers and must not be modified in place.
 
-            dataset["Alterné / Bloc"].append("non")
+    :param fileDataset: (string) file's name of the .xlsx file to load. The file must be placed in the /data folder
+    :param quadri: (string) quadrimester from which the data is loaded. Must be "Q1" or "Q2"
+    :param sheet: (string) sheet name from which the data is loaded.
+    :return dataset: (pandas.DataFrame) DataFrame containing data.
+    """
+    entry = loadDataset(fileDataset)
+    if (quadri, sheet) in entry["sheets"]:
+        _datasetCacheStatistics["sheetHits"] += 1
+        return entry["sheets"][(quadri, sheet)]
+
+    _datasetCacheStatistics["sheetMisses"] += 1
+    dataset = pd.DataFrame(data=loadTable(fileDataset, quadri, sheet))
+    entry["sheets"][(quadri, sheet)] = dataset
+    return dataset
 
+def loadTable(fileDataset, quadri, sheet):
+    """
+    Function returning the columns of the sheet specified by the parameter "sheet", without building any pandas object.
+    Sheets of a workbook are restricted to the lines of the quadrimester "quadri" (the backend export is not filtered).
+    The returned dictionary is shared between callers and must not be modified in place.
 
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :param quadri: (string) quadrimester from which the data is loaded. Must be "Q1" or "Q2"
+    :param sheet: (string) sheet name from which the data is loaded.
+    :return: (dict) dictionary with key = column name, value = (list) column values
+    """
+    entry = loadDataset(fileDataset)
+    table = entry["tables"][sheet]
+    if entry["format"] != "xlsx" or "quadri" not in table:
+        return table
+
+    views = entry.setdefault("quadriTables", {})
+    if (quadri, sheet) not in views:
+        keep = [q == quadri for q in table["quadri"]]
+        views[(quadri, sheet)] = {name: [v for v, k in zip(values, keep) if k] for name, values in table.items()}
+    return views[(quadri, sheet)]
+
+# columns of the "TFE" sheet, in the order of the workbook
+TFE_COLUMNS = ["cursus", "id", "name", "quadri", "lectureHours", "lectureTeachers", "lectureRooms", "lectureWeekStart", "lectureWeekEnd",
+               "exerciseHours", "exerciseDivisions", "exerciseTeachers", "exerciseRooms", "exerciseSplit", "exerciseWeekStart", "exerciseWeekEnd",
+               "tpHours", "tpDuration", "tpDivisions", "tpTeachers", "tpRooms", "tpWeekStart", "tpWeekEnd",
+               "projectHours", "projectDuration", "projectTeachers", "projectWeekStart", "projectWeekEnd",
+               "TP_special", "Remediations", "Visits", "Order", "Rythm", "Lec > Ex", "Alterné / Bloc"]
+# cursus of the "BA IC (B3 - TC)" cohort
+TC_CURSUS = "BA IC (B3 - CHIMIE/SDM),BA IC (B3 - ELEC),BA IC (B3 - IG),BA IC (B3 - MECA),BA IC (B3 - MINES)"
+# number of exercise divisions of the AAs whose exercises are split
+EXERCISE_DIVISIONS = {"V-LANG-151":8,"V-LANG-153":4,"V-LANG-155":4,"V-LANG-152":8,"V-LANG-154":4,"V-LANG-156":4}
+
+def buildSheet(data, desiderata, sheet):
+    """
+    Function building the columns of the sheet specified by the parameter "sheet" from the parsed JSON dataset.
 
+    :param data: (dict) parsed JSON dataset
+    :param desiderata: (DesiderataIndex) desiderata of the dataset
+    :param sheet: (string) sheet name from which the data is loaded.
+    :return dataset: (dict) dictionary with key = column name, value = (list) column values
+    """
+    dataset = {}
 
+    #TFE Sheet
+    if sheet == "TFE":
+        AAs = data["aas"]
+        codes = [AA["code"] for AA in AAs]
+        for code in codes:
+            if code not in desiderata:
+                print(code,": No desiderata available")
+
+        # Cursus
+        dataset["cursus"] = [",".join(TC_CURSUS if cohorte["cohorteName"] == "BA IC (B3 - TC)" else cohorte["cohorteName"] for cohorte in AA["cohortes"])
+                             for AA in AAs]
+
+        # Id/name/quadri/lectureHours/lectureTeachers:
+        dataset["id"] = codes
+        dataset["name"] = [AA["name"] for AA in AAs]
+        dataset["quadri"] = [AA["quadri"] for AA in AAs]
+        dataset["lectureHours"] = [AA["ht"] for AA in AAs]
+        dataset["lectureTeachers"] = [",".join([normalizeTeacherName(x) for x in AA["titulaires"]]) for AA in AAs]
+
+        #lectureRooms (to see later)
+        dataset["lectureRooms"] = [""] * len(AAs)
+
+        #lectureWeekStart/lectureWeekEnd
+        bounds = [desiderata.getWeekBounds(code, "Theorie") for code in codes]
+        dataset["lectureWeekStart"] = [b[0] for b in bounds]
+        dataset["lectureWeekEnd"] = [b[1] for b in bounds]
+
+        #exerciseHours
+        dataset["exerciseHours"] = [AA["htpe"] for AA in AAs]
+
+        #exerciseDivisions/exerciseSplit
+        dataset["exerciseDivisions"] = [EXERCISE_DIVISIONS.get(code, 1) for code in codes]
+        dataset["exerciseSplit"] = [int(code in EXERCISE_DIVISIONS) for code in codes]
+
+        #exerciseTeachers
+        teachers = [desiderata.getTeachers(code) for code in codes]
+        dataset["exerciseTeachers"] = teachers
+
+        # exerciseRooms (to see later)
+        dataset["exerciseRooms"] = [""] * len(AAs)
+
+        # exerciseWeekStart/exerciseWeekEnd
+        bounds = [desiderata.getWeekBounds(code, "Exercice") for code in codes]
+        dataset["exerciseWeekStart"] = [b[0] for b in bounds]
+        dataset["exerciseWeekEnd"] = [b[1] for b in bounds]
+
+        # tpHours/tpDuration/tpDivisions
+        dataset["tpHours"] = [AA["htps"] for AA in AAs]
+        dataset["tpDuration"] = [4] * len(AAs)
+        dataset["tpDivisions"] = [4] * len(AAs)
+
+        # tpTeachers
+        dataset["tpTeachers"] = list(teachers)
+
+        # tpRooms (to see later)
+        dataset["tpRooms"] = [""] * len(AAs)
+
+        # tpWeekStart/tpWeekEnd
+        bounds = [desiderata.getWeekBounds(code, "Travaux pratiques") for code in codes]
+        dataset["tpWeekStart"] = [b[0] for b in bounds]
+        dataset["tpWeekEnd"] = [b[1] for b in bounds]
+
+        # projectHours/projectDuration
+        dataset["projectHours"] = [0] * len(AAs)
+        dataset["projectDuration"] = [4] * len(AAs)
+
+        # projectTeachers/projectWeekStart/projectWeekEnd
+        dataset["projectTeachers"] = list(teachers)
+        bounds = [desiderata.getWeekBounds(code, "Projet") for code in codes]
+        dataset["projectWeekStart"] = [b[0] for b in bounds]
+        dataset["projectWeekEnd"] = [b[1] for b in bounds]
+
+        dataset["TP_special"] = [0] * len(AAs)
+        dataset["Remediations"] = [AA["hr"] for AA in AAs]
+        dataset["Visits"] = [0] * len(AAs)
+        # notes are not exported by the backend yet
+        dataset["Order"] = [""] * len(AAs)
+        dataset["Rythm"] = [""] * len(AAs)
+        dataset["Lec > Ex"] = [desiderata.getExoAfterTheo(code) for code in codes]
+
+        dataset["Alterné / Bloc"] = ["non"] * len(AAs)
+
+        # same column order as the workbook
+        dataset = {column: dataset[column] for column in TFE_COLUMNS}
 
     #Cursus Sheet
     elif sheet == "Cursus":
@@ -209,24 +1014,18 @@ def loadData(fileDataset,quadri,sheet):
 
 
 
-    dataset = pd.DataFrame(data=dataset)
-    #print(dataset)
-
     return dataset
 
 def loadCursusData(fileDataset):
     """
-    Function loading from an .xlsx file the data relative to cursus in the sheet "Groups"
+    Function loading the data relative to cursus in the sheet "Groups" (see loadDataset)
     and generating a dictionary with the number of students per group.
     Each line of this sheet has :
         - cursus = (string) cursus name
-        - numberGroups = (integer) number of groups in the cursus
-        - totalStudents = (integer) estimated total number of students in the cursus
-    The number of students per group is simply computed by spreading all the students off equally between groups.
-    For example, the "BA3_MECA,3,32" line will result in :
-        - BA3_MECA_A,16
-        - BA3_MECA_B,16
-        - BA3_MECA_C,15
+        - group = (string) group name
+        - numberOfStudents = (integer) number of students in the group
+    The groups of a cursus are kept in the order of the sheet, with their number of students as given.
+    For example, the lines "BA3_MECA,BA3_MECA_A,25" and "BA3_MECA,BA3_MECA_B,25" result in {"BA3_MECA": {"BA3_MECA_A": 25, "BA3_MECA_B": 25}}
 
     :param fileDataset: (string) file name of the .xlsx file to load. The file must be placed in the /data folder and have a "Groups" sheet with characteristics cited above
     :return cursusData: (dict) dictionary with :
@@ -237,146 +1036,446 @@ def loadCursusData(fileDataset):
     """
     cursusData = {}
 
-    with open( "../data/"+ fileDataset, encoding='utf-8') as fh:
-        data = json.load(fh)
+    groups = loadDataset(fileDataset)["tables"]["Groups"]
 
-    for group in data["groupes"]:
-        if group["cohorteName"] not in cursusData:
-            cursusData[group["cohorteName"]] = {}
-        cursusData[group["cohorteName"]][group["name"]] = group["numberOfStudents"]
+    for cursus, group, numberOfStudents in zip(groups["cursus"], groups["group"], groups["numberOfStudents"]):
+        if cursus not in cursusData:
+            cursusData[cursus] = {}
+        cursusData[cursus][group] = numberOfStudents
 
     return cursusData
 
+def loadGroupIdsOfCursus(fileDataset):
+    """
+    Function returning the ids (see EntityRegistry) of the groups of each cursus, built once per dataset from the "Groups" table.
+    The groups of a cursus are in the same order as in loadCursusData.
+
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :return: (dict) key = (integer) cursus id, value = (list) group ids of the cursus
+    """
+    entry = loadDataset(fileDataset)
+    if "groupIdsOfCursus" not in entry:
+        groups = entry["tables"]["Groups"]
+        groupIdsOfCursus = {}
+        for cursus, group in zip(groups["cursus"], groups["group"]):
+            groupIdsOfCursus.setdefault(registry.getId("cursus", cursus), []).append(registry.getId("group", group))
+        entry["groupIdsOfCursus"] = groupIdsOfCursus
+    return entry["groupIdsOfCursus"]
+
+
+def toFloatArray(values):
+    """
+    Function converting a column in a float numpy array, values which are not numbers being NaN.
+
+    :param values: (list) column values
+    :return: (numpy.ndarray) float64 values
+    """
+    return np.array([v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values], dtype=np.float64)
+
+"""
+Lesson types checked by validateDataset : prefix of the columns in the "TFE" sheet, number of divisions column (None if the lesson is given once)
+"""
+VALIDATED_LESSONS = [("lecture", None), ("exercise", "exerciseDivisions"), ("tp", "tpDivisions"), ("project", None)]
+
+def validateDataset(constants):
+    """
+    Function checking the dataset of a model before any interval variable is created.
+    Every problem is reported at once, instead of a KeyError in generateIntervalVariables or an infeasible model after solving.
+    All AAs are checked column by column with numpy (no loop over the lines of the "TFE" sheet for bounds).
+
+    Errors (the model cannot be built or is infeasible) :
+        - a cursus of an AA is not a key of constants["cursus"]
+        - a cursus of a selected AA has no group in the "Groups" sheet (see loadCursusData)
+        - a lesson has a missing or non positive number of divisions
+        - a lesson has no week to be placed in : weekStart > weekEnd, weekStart > constants["weeks"] or weekEnd < 1
+        - a lesson has exactly one missing week bound (spreadIntervalVariablesOverSegments cannot convert it to segments, see countSpreadScenarios in lessons.py)
+        - an exercise is split (exerciseSplit != 0) but has no teacher or no room
+    Warnings (the model can be built but is probably not the expected one) :
+        - a lesson has both week bounds missing (the lesson is not restricted to weeks, see spreadIntervalVariablesOverSegments)
+        - a lesson has week bounds partly outside 1...constants["weeks"]
+        - an empty teacher name in a list of teachers (all these lessons share the same "" teacher and cannot overlap)
+        - a group without student in the "Groups" sheet
+
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables in variables.py)
+    :return problems: (dict) dictionary with :
+        - "errors" = (list) messages of the errors
+        - "warnings" = (list) messages of the warnings
+    """
+    problems = {"errors": [], "warnings": []}
+    table = loadTable(constants["fileDataset"], constants["quadri"], "TFE")
+    cursusData = loadCursusData(constants["fileDataset"])
+    ids = np.array([str(AA) for AA in table["id"]], dtype=object)
+
+    # cursus : the column is exploded in (line, cursus) pairs
+    listsOfCursus = [c.split(",") if isinstance(c, str) else [] for c in table["cursus"]]
+    lines = np.repeat(np.arange(len(ids)), [len(l) for l in listsOfCursus])
+    cursus = np.array([c for l in listsOfCursus for c in l], dtype=object)
+    known = np.isin(cursus, list(constants["cursus"].keys()))
+    for line, c in zip(lines[~known], cursus[~known]):
+        problems["errors"].append(ids[line] + " : cursus '" + c + "' is not in constants[\"cursus\"]")
+    selectedCursus = np.isin(cursus, [c for c, isSelected in constants["cursus"].items() if isSelected is True])
+    selected = np.zeros(len(ids), dtype=bool)
+    selected[lines[selectedCursus]] = True
+    withoutGroups = selected[lines] & ~np.isin(cursus, list(cursusData.keys()))
+    for line, c in zip(lines[withoutGroups], cursus[withoutGroups]):
+        problems["errors"].append(ids[line] + " : cursus '" + c + "' has no group in the \"Groups\" sheet")
+
+    # lessons : only the lessons of selected AAs are checked
+    for lesson, divisionsColumn in VALIDATED_LESSONS:
+        hasLesson = selected & ~np.isnan(toFloatArray(table.get(lesson + "Hours", [np.nan] * len(ids))))
+        if divisionsColumn is not None:
+            divisions = toFloatArray(table.get(divisionsColumn, [np.nan] * len(ids)))
+            with np.errstate(invalid="ignore"):
+                invalid = hasLesson & ~(divisions >= 1)
+            for line in np.flatnonzero(invalid):
+                problems["errors"].append(ids[line] + " : " + lesson + " has an invalid number of divisions (" + str(table[divisionsColumn][line]) + ")")
+
+        weekStart = toFloatArray(table.get(lesson + "WeekStart", [np.nan] * len(ids)))
+        weekEnd = toFloatArray(table.get(lesson + "WeekEnd", [np.nan] * len(ids)))
+        bothMissing = hasLesson & np.isnan(weekStart) & np.isnan(weekEnd)
+        oneMissing = hasLesson & (np.isnan(weekStart) != np.isnan(weekEnd))
+        with np.errstate(invalid="ignore"):
+            noWeek = hasLesson & ((weekStart > weekEnd) | (weekStart > constants["weeks"]) | (weekEnd < 1))
+            outside = hasLesson & ~noWeek & ((weekStart < 1) | (weekEnd > constants["weeks"]))
+        for line in np.flatnonzero(noWeek):
+            problems["errors"].append(ids[line] + " : " + lesson + " has no week to be placed in (weeks " + formatWeekBound(table[lesson + "WeekStart"][line])
+                                      + " to " + formatWeekBound(table[lesson + "WeekEnd"][line]) + ")")
+        for line in np.flatnonzero(oneMissing):
+            problems["errors"].append(ids[line] + " : " + lesson + " has only one week bound (weeks " + formatWeekBound(table[lesson + "WeekStart"][line])
+                                      + " to " + formatWeekBound(table[lesson + "WeekEnd"][line]) + ")")
+        for line in np.flatnonzero(bothMissing):
+            problems["warnings"].append(ids[line] + " : " + lesson + " has no week bound")
+        for line in np.flatnonzero(outside):
+            problems["warnings"].append(ids[line] + " : " + lesson + " weeks " + formatWeekBound(table[lesson + "WeekStart"][line]) + " to "
+                                        + formatWeekBound(table[lesson + "WeekEnd"][line]) + " are not within 1..." + str(constants["weeks"]))
+
+    # split exercises need teachers and rooms to split
+    hasExercise = selected & ~np.isnan(toFloatArray(table.get("exerciseHours", [np.nan] * len(ids))))
+    split = hasExercise & (np.nan_to_num(toFloatArray(table.get("exerciseSplit", [np.nan] * len(ids)))) != 0)
+    for column in ["exerciseTeachers", "exerciseRooms"]:
+        empty = np.array([not isinstance(v, str) for v in table.get(column, [np.nan] * len(ids))], dtype=bool)
+        for line in np.flatnonzero(split & empty):
+            problems["errors"].append(ids[line] + " : exercise is split but " + column + " is empty")
+
+    # teachers
+    for column in TEACHERS_COLUMNS:
+        emptyName = np.array([isinstance(v, str) and "" in v.split(",") for v in table.get(column, [np.nan] * len(ids))], dtype=bool)
+        for line in np.flatnonzero(selected & emptyName):
+            problems["warnings"].append(ids[line] + " : empty teacher name in " + column + " ('" + table[column][line] + "')")
+
+    # groups
+    groups = loadDataset(constants["fileDataset"])["tables"]["Groups"]
+    numberOfStudents = toFloatArray(groups["numberOfStudents"])
+    with np.errstate(invalid="ignore"):
+        empty = ~(numberOfStudents > 0)
+    for line in np.flatnonzero(empty):
+        problems["warnings"].append("group " + str(groups["group"][line]) + " has no student")
+
+    return problems
+
+def checkDataset(constants):
+    """
+    Function checking the dataset of a model before building it (see validateDataset) :
+    all errors and warnings are printed at once, then the script is stopped if there is any error.
+
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables in variables.py)
+    """
+    problems = validateDataset(constants)
+    for warning in problems["warnings"]:
+        print("Warning :", warning)
+    for error in problems["errors"]:
+        print("Error :", error)
+    if problems["errors"]:
+        raise ValueError(str(len(problems["errors"])) + " error(s) in the dataset " + constants["fileDataset"])
+
+def formatWeekBound(value):
+    """
+    Function writing a week bound of the "TFE" sheet in a message : an integral number is written as an integer (i.e. 12 instead of 12.0).
+
+    :param value: week bound as read in the sheet (number, nan or any other value)
+    :return: (string) week bound
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
 
 def loadDataFromJSON(fileDataset, numSemaine):
-    with open(fileDataset, encoding='utf-8') as fh:
-        data = json.load(fh)
+    return pd.DataFrame(data=loadRowsFromJSON(fileDataset, numSemaine))
 
+def loadRowsFromJSON(fileDataset, numSemaine):
     AllData = []
 
-    nameSemaine = "Semaine " + str(numSemaine)
-    for d1 in data:
-        if nameSemaine in d1:
-            for d in d1[nameSemaine]:
-                # ---------------conversion des données en qqc de lisible pour nous et le code---------------------------#
-                subject = d["subject"].split(':')
-                prof = d["prof"]
-                group = d["group"]
-
-                # subject reprend l'id et le type de cours, on remettra comme il faut le cours après
-                ID = subject[0]
-                typeCursus = subject[1]
-
-                # Les teachers sont ressencé comme une liste d'id. Pour éviter les problèmes, on retransforme tout en string.
-                # Les id devraient pas posé de problème, on s'en fout un peu de leur nom en soit, juste on peut pas appliquer de desiderata
-                teachers = ""
-                for p in prof:
-                    teachers = teachers + "," + str(p)
-                teachers = teachers[1:]
-
-                # Cursus pose pas mal de problème au vue de la division en groupe. En plus ils reprennent les master et les archi.
-                # Ca pose pas de problème en soit pour archi et master, au contraire, mais pour l'instant on mettra ça de coté.
-                # Par contre il faut remettre les group comme étant des cursus, on fait nous même la division en groupe.
-                setCursus = set()
-                for g in group:
-                    g = str(g).replace('-', '_')
-
-                    if "BAB1" in g:
-                        g = "BA1"
-                    elif "BAB2" in g:
-                        g = "BA2"
-                    elif "BAB3_CHIM" in g:
-                        g = "BA3_CHIM"
-                    elif "BAB3_ELEC" in g:
-                        g = "BA3_ELEC"
-                    elif "BAB3_IG" in g:
-                        g = "BA3_IG"
-                    elif "BAB3_MECA" in g:
-                        g = "BA3_MECA"
-                    elif "BAB3_MIN" in g:
-                        g = "BA3_MIN"
-                    else:
-                        # print(g) #debug
-                        continue
-                    setCursus.add(g)
-
-                if len(setCursus) > 0:
-                    # Même chose que ce qu'on faisait avec teacher
-                    cursus = ""
-                    for c in setCursus:
-                        cursus = cursus + "," + str(c)
-                    cursus = cursus[1:]
-
-                    # Deux possibilité ici, soit on s'en blc qu'un id soit plusieurs fois dans AllData, soit on s'en fout pas xD
-                    # Dans un premier temps, on peut dire qu'on s'en fout, mais sur le long terme surement qu'on devra s'en soucier.
-                    # Il me semble que dans la fonciton objective de thomas, les heures d'exos doivent être après la théorie dans une même semaine.
-                    # Faire le dico avec toutes les clés pour éviter des erreurs dans le code de thomas, le reste sera hard codé tkt
-                    dic = {
-                        "cursus": cursus,
-                        "id": ID,
-                        "name": "",
-                        "quadri": "",
-                        "lectureHours": float('nan'),
-                        "lectureTeachers": float('nan'),
-                        "lectureRooms": float('nan'),
-                        "lectureWeekStart": float('nan'),
-                        "lectureWeekEnd": float('nan'),
-                        "exerciseHours": float('nan'),
-                        "exerciseDivisions": float('nan'),
-                        "exerciseTeachers": float('nan'),
-                        "exerciseRooms": float('nan'),
-                        "exerciseSplit": float('nan'),
-                        "exerciseWeekStart": float('nan'),
-                        "exerciseWeekEnd": float('nan'),
-                        "tpHours": float('nan'),
-                        "tpDuration": float('nan'),
-                        "tpDivisions": float('nan'),
-                        "tpTeachers": float('nan'),
-                        "tpRooms": float('nan'),
-                        "tpWeekStart": float('nan'),
-                        "tpWeekEnd": float('nan'),
-                        "projectHours": float('nan'),
-                        "projectDuration": float('nan'),
-                        "projectTeachers": float('nan'),
-                        "projectWeekStart": float('nan'),
-                        "projectWeekEnd": float('nan'),
-                        "TP_special": float('nan'),
-                        "Remediations": float('nan'),
-                        "Visits": float('nan'),
-                        "Order": float('nan'),
-                        "Rythm": float('nan')
-                    }
-
-                    # on fill le nombre d'heure dans les endroits où y'a un cours, on mets des teachers et des rooms
-                    if subject == "theory" or subject == "theory_exercise" or subject == "mixed":
-                        dic["lectureHours"] = 2
-                        dic["lectureTeachers"] = teachers
-                        # L'algo va surement buguer si on assigne pas de locaux
-                        dic["lectureRooms"] = cursus
-
-                        dic["lectureWeekStart"] = numSemaine + 1
-                        dic["lectureWeekEnd"] = numSemaine + 1
-                    elif subject == "exercise":
-                        dic["exerciseHours"] = 2
-                        dic["exerciseTeachers"] = teachers
-                        # L'algo va surement buguer si on assigne pas de locaux
-                        dic["exerciseRooms"] = cursus
-
-                        dic["exerciseWeekStart"] = numSemaine + 1
-                        dic["exerciseWeekEnd"] = numSemaine + 1
-                    elif subject == "TP":
-                        dic["tpHours"] = 4
-                        dic["tpTeachers"] = teachers
-                        # L'algo va surement buguer si on assigne pas de locaux
-                        dic["tpRooms"] = cursus
-
-                        dic["tpWeekStart"] = numSemaine + 1
-                        dic["tpWeekEnd"] = numSemaine + 1
-                    elif subject == "project":
-                        dic["projectHours"] = 4
-                        dic["projectTeachers"] = teachers
-
-                        dic["projectWeekStart"] = numSemaine + 1
-                        dic["projectWeekEnd"] = numSemaine + 1
-                    AllData.append(dic)
-    return pd.DataFrame(data=AllData)
+    # all weeks are indexed once (see loadWeeks), only the lessons of the requested week are read
+    for lesson in loadWeeks(fileDataset).get(numSemaine, []):
+        # ---------------conversion des données en qqc de lisible pour nous et le code---------------------------#
+        subject = lesson["subject"].split(':')
+
+        # subject reprend l'id et le type de cours, on remettra comme il faut le cours après
+        ID = lesson["id"]
+        typeCursus = lesson["type"]
+
+        # Les teachers sont ressencé comme une liste d'id. Pour éviter les problèmes, on retransforme tout en string.
+        # Les id devraient pas posé de problème, on s'en fout un peu de leur nom en soit, juste on peut pas appliquer de desiderata
+        teachers = ",".join(str(p) for p in lesson["teachers"])
+
+        # Cursus pose pas mal de problème au vue de la division en groupe. En plus ils reprennent les master et les archi.
+        # Ca pose pas de problème en soit pour archi et master, au contraire, mais pour l'instant on mettra ça de coté.
+        # Par contre il faut remettre les group comme étant des cursus, on fait nous même la division en groupe.
+        setCursus = [c for c in lesson["cursus"] if c in BACHELOR_CURSUS]
+
+        if len(setCursus) > 0:
+            # Même chose que ce qu'on faisait avec teacher
+            cursus = ""
+            for c in setCursus:
+                cursus = cursus + "," + str(c)
+            cursus = cursus[1:]
+
+            # Deux possibilité ici, soit on s'en blc qu'un id soit plusieurs fois dans AllData, soit on s'en fout pas xD
+            # Dans un premier temps, on peut dire qu'on s'en fout, mais sur le long terme surement qu'on devra s'en soucier.
+            # Il me semble que dans la fonciton objective de thomas, les heures d'exos doivent être après la théorie dans une même semaine.
+            # Faire le dico avec toutes les clés pour éviter des erreurs dans le code de thomas, le reste sera hard codé tkt
+            dic = {
+                "cursus": cursus,
+                "id": ID,
+                "name": "",
+                "quadri": "",
+                "lectureHours": float('nan'),
+                "lectureTeachers": float('nan'),
+                "lectureRooms": float('nan'),
+                "lectureWeekStart": float('nan'),
+                "lectureWeekEnd": float('nan'),
+                "exerciseHours": float('nan'),
+                "exerciseDivisions": float('nan'),
+                "exerciseTeachers": float('nan'),
+                "exerciseRooms": float('nan'),
+                "exerciseSplit": float('nan'),
+                "exerciseWeekStart": float('nan'),
+                "exerciseWeekEnd": float('nan'),
+                "tpHours": float('nan'),
+                "tpDuration": float('nan'),
+                "tpDivisions": float('nan'),
+                "tpTeachers": float('nan'),
+                "tpRooms": float('nan'),
+                "tpWeekStart": float('nan'),
+                "tpWeekEnd": float('nan'),
+                "projectHours": float('nan'),
+                "projectDuration": float('nan'),
+                "projectTeachers": float('nan'),
+                "projectWeekStart": float('nan'),
+                "projectWeekEnd": float('nan'),
+                "TP_special": float('nan'),
+                "Remediations": float('nan'),
+                "Visits": float('nan'),
+                "Order": float('nan'),
+                "Rythm": float('nan')
+            }
+
+            # on fill le nombre d'heure dans les endroits où y'a un cours, on mets des teachers et des rooms
+            if subject == "theory" or subject == "theory_exercise" or subject == "mixed":
+                dic["lectureHours"] = 2
+                dic["lectureTeachers"] = teachers
+                # L'algo va surement buguer si on assigne pas de locaux
+                dic["lectureRooms"] = cursus
+
+                dic["lectureWeekStart"] = numSemaine + 1
+                dic["lectureWeekEnd"] = numSemaine + 1
+            elif subject == "exercise":
+                dic["exerciseHours"] = 2
+                dic["exerciseTeachers"] = teachers
+                # L'algo va surement buguer si on assigne pas de locaux
+                dic["exerciseRooms"] = cursus
+
+                dic["exerciseWeekStart"] = numSemaine + 1
+                dic["exerciseWeekEnd"] = numSemaine + 1
+            elif subject == "TP":
+                dic["tpHours"] = 4
+                dic["tpTeachers"] = teachers
+                # L'algo va surement buguer si on assigne pas de locaux
+                dic["tpRooms"] = cursus
+
+                dic["tpWeekStart"] = numSemaine + 1
+                dic["tpWeekEnd"] = numSemaine + 1
+            elif subject == "project":
+                dic["projectHours"] = 4
+                dic["projectTeachers"] = teachers
+
+                dic["projectWeekStart"] = numSemaine + 1
+                dic["projectWeekEnd"] = numSemaine + 1
+            AllData.append(dic)
+    return AllData
+
+class AARecord:
+    """
+    Class storing the data of one AA (one line of the "TFE" sheet), already typed and split.
+    Variable builders iterate these records instead of the rows of a DataFrame :
+    there is no pd.isna check and no str.split(",") left to do while building the model.
+
+    Conventions (identical to the former DataFrame rows) :
+        - cursus, *Teachers, *Rooms = (tuple) names, split once with "," (an empty cell gives ("",), a missing cell gives ())
+        - *Hours = number of hours, or None if the cell is missing (the AA has no such lesson)
+        - *WeekStart, *WeekEnd, *Divisions, *Duration = integer values (missing values are NaN).
+          Workbooks give floats for numeric columns with missing cells and sometimes numbers typed as text : both are converted to integers
+        - exerciseSplit = (integer) 0 when the cell is missing or not an integer
+        - exoAfterTheo = value of the "Lec > Ex" column, None if the dataset has no such column
+        - AAId, cursusIds, *TeacherIds, *RoomIds = (integer or tuple) ids of the entities (see EntityRegistry), in the order of the names
+    """
+    __slots__ = ("id", "name", "quadri", "cursus",
+                 "lectureHours", "lectureTeachers", "lectureRooms", "lectureWeekStart", "lectureWeekEnd",
+                 "exerciseHours", "exerciseDivisions", "exerciseTeachers", "exerciseRooms", "exerciseSplit", "exerciseWeekStart", "exerciseWeekEnd",
+                 "tpHours", "tpDuration", "tpDivisions", "tpTeachers", "tpRooms", "tpWeekStart", "tpWeekEnd",
+                 "projectHours", "projectDuration", "projectTeachers", "projectWeekStart", "projectWeekEnd",
+                 "exoAfterTheo",
+                 "AAId", "cursusIds", "lectureTeacherIds", "lectureRoomIds", "exerciseTeacherIds", "exerciseRoomIds",
+                 "tpTeacherIds", "tpRoomIds", "projectTeacherIds")
+
+    # columns holding a list of names separated with ","
+    LIST_COLUMNS = ("cursus", "lectureTeachers", "lectureRooms", "exerciseTeachers", "exerciseRooms", "tpTeachers", "tpRooms", "projectTeachers")
+    # columns holding a number of hours, None when missing
+    HOURS_COLUMNS = ("lectureHours", "exerciseHours", "tpHours", "projectHours")
+    # columns holding an integer (weeks, numbers of divisions, durations in slots)
+    INTEGER_COLUMNS = ("lectureWeekStart", "lectureWeekEnd", "exerciseDivisions", "exerciseSplit", "exerciseWeekStart", "exerciseWeekEnd",
+                       "tpDuration", "tpDivisions", "tpWeekStart", "tpWeekEnd", "projectDuration", "projectWeekStart", "projectWeekEnd")
+    # id fields : key = field, value = (kind of entity, list column holding the names)
+    ID_FIELDS = {"cursusIds": ("cursus", "cursus"),
+                 "lectureTeacherIds": ("teacher", "lectureTeachers"), "lectureRoomIds": ("room", "lectureRooms"),
+                 "exerciseTeacherIds": ("teacher", "exerciseTeachers"), "exerciseRoomIds": ("room", "exerciseRooms"),
+                 "tpTeacherIds": ("teacher", "tpTeachers"), "tpRoomIds": ("room", "tpRooms"),
+                 "projectTeacherIds": ("teacher", "projectTeachers")}
+
+    def __init__(self, row):
+        """
+        Constructor of AARecord class
+
+        :param row: (dict) key = column name of the "TFE" sheet, value = cell value
+        """
+        for field in self.__slots__:
+            value = row.get(field, float("nan"))
+            if field in self.INTEGER_COLUMNS:
+                value = toInteger(value)
+            if field in self.LIST_COLUMNS:
+                value = tuple(value.split(",")) if isinstance(value, str) else ()
+            elif field in self.HOURS_COLUMNS:
+                value = None if isMissing(value) else value
+            elif field == "exerciseSplit":
+                value = value if isinstance(value, int) else 0
+            elif field == "exoAfterTheo":
+                value = row.get("Lec > Ex")
+            elif field == "AAId":
+                value = registry.getId("AA", self.id)
+            elif field in self.ID_FIELDS:
+                kind, column = self.ID_FIELDS[field]
+                value = registry.getIds(kind, getattr(self, column))
+            setattr(self, field, value)
+
+    def __repr__(self):
+        return "AARecord(" + str(self.id) + ")"
+
+def toInteger(value):
+    """
+    Function converting a cell value holding an integer (i.e. 2.0 or "2") to an int. Other values are returned unchanged.
+
+    :param value: cell value
+    :return: (integer) converted value, or the value itself
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return value
+
+def isMissing(value):
+    """
+    Function testing if a cell value is missing (None or NaN), without pandas.
+
+    :param value: cell value
+    :return: (boolean) True if the value is missing
+    """
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def buildAARecords(columns):
+    """
+    Function converting the columns of a "TFE" sheet in a list of AARecord.
+
+    :param columns: (dict) key = column name, value = (list) column values
+    :return: (list) one AARecord per line, in the order of the sheet
+    """
+    names = list(columns.keys())
+    return [AARecord(dict(zip(names, values))) for values in zip(*columns.values())]
+
+def loadAARecords(fileDataset, quadri):
+    """
+    Function returning the AA records (see AARecord) of the "TFE" sheet of a dataset.
+    Records are built once per dataset and quadrimester and shared between callers.
+
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :param quadri: (string) quadrimester from which the data is loaded. Must be "Q1" or "Q2"
+    :return: (list) list of AARecord
+    """
+    entry = loadDataset(fileDataset)
+    records = entry.setdefault("records", {})
+    if quadri not in records:
+        records[quadri] = buildAARecords(loadTable(fileDataset, quadri, "TFE"))
+    return records[quadri]
+
+def loadAAIndex(fileDataset, quadri):
+    """
+    Function returning the inverted index of the AA records of a dataset (see loadAARecords), built once per dataset and quadrimester.
+    The index is a dictionary with :
+        - "cursus" = dictionary with key = (string) cursus name, value = (list) positions of the records followed by this cursus
+        - "teacher" = dictionary with key = (string) teacher name, value = (list) positions of the records taught by this teacher (any lesson type)
+        - "room" = dictionary with key = (string) room name, value = (list) positions of the records using this room (any lesson type)
+    Positions are indexes in the list returned by loadAARecords, in increasing order.
+
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :param quadri: (string) quadrimester from which the data is loaded. Must be "Q1" or "Q2"
+    :return: (dict) index described above
+    """
+    entry = loadDataset(fileDataset)
+    indexes = entry.setdefault("AAIndex", {})
+    if quadri not in indexes:
+        index = {"cursus": {}, "teacher": {}, "room": {}}
+        for position, record in enumerate(loadAARecords(fileDataset, quadri)):
+            for kind, names in [("cursus", record.cursus),
+                                ("teacher", record.lectureTeachers + record.exerciseTeachers + record.tpTeachers + record.projectTeachers),
+                                ("room", record.lectureRooms + record.exerciseRooms + record.tpRooms)]:
+                # dict.fromkeys : a record is listed once per name, even if the name appears in several lesson types
+                for name in dict.fromkeys(names):
+                    index[kind].setdefault(name, []).append(position)
+        indexes[quadri] = index
+    return indexes[quadri]
+
+def selectAARecords(fileDataset, quadri, cursus, teachers=None, rooms=None):
+    """
+    Function returning the AA records followed by at least one cursus of "cursus", without going through the other records (see loadAAIndex).
+    The selection can be restricted further to the records of some teachers and/or rooms, i.e. to build a small part of the model while debugging.
+    Records are returned in the order of the dataset.
+
+    :param fileDataset: (string) file name of the dataset. The file must be placed in the /data folder
+    :param quadri: (string) quadrimester from which the data is loaded. Must be "Q1" or "Q2"
+    :param cursus: (iterable) names of the selected cursus
+    :param teachers: (iterable) names of the selected teachers, None to keep the records of all teachers
+    :param rooms: (iterable) names of the selected rooms, None to keep the records of all rooms
+    :return: (list) list of AARecord
+    """
+    records = loadAARecords(fileDataset, quadri)
+    index = loadAAIndex(fileDataset, quadri)
+    positions = {position for name in cursus for position in index["cursus"].get(name, [])}
+    if teachers is not None:
+        positions &= {position for name in teachers for position in index["teacher"].get(name, [])}
+    if rooms is not None:
+        positions &= {position for name in rooms for position in index["room"].get(name, [])}
+    return [records[position] for position in sorted(positions)]
+
+def loadAARecordsFromJSON(fileDataset, numSemaine):
+    """
+    Function returning the AA records (see AARecord) of one week of a week separation (see loadDataFromJSON).
+
+    :param fileDataset: (string) file name of the week separation. The file must be placed in the /data folder
+    :param numSemaine: (integer) week index (from 0)
+    :return: (list) list of AARecord
+    """
+    rows = loadRowsFromJSON(fileDataset, numSemaine)
+    if len(rows) == 0:
+        return []
+    # rows are turned into normalized columns first, to type them exactly like the former DataFrame
+    return buildAARecords({name: normalizeColumn([row[name] for row in rows]) for name in rows[0]})
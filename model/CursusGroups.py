@@ -1,5 +1,176 @@
 import data.io as TFEdata
-import docplex.cp.model as cp
+import json
+import math
+import os
+
+"""
+Balanced divisions generated automatically (see generateBalancedDivisions), shared by all CursusGroups objects and saved in the /data folder :
+a configuration is solved once, then read from the file by the next builds and the next runs.
+
+_balancedDivisions = dictionary with :
+    - key = (string) canonical configuration (see getBalancedDivisionsKey)
+    - value = dictionary with :
+        - key = (string) group name
+        - value = (integer) division index for this group
+It is None until BALANCED_DIVISIONS_FILE is read (see loadBalancedDivisions).
+"""
+BALANCED_DIVISIONS_FILE = "balancedDivisions.json"
+_balancedDivisions = None
+
+def getBalancedDivisionsKey(listOfGroupsWithCapacity, numberDivisions):
+    """
+    Function building the canonical configuration of a division subproblem.
+    The subproblem only depends on the number of students of each group and on the number of divisions :
+    the groups are sorted, so the same groups listed in another order (i.e. cursus in another order) give the same key.
+
+    :param listOfGroupsWithCapacity: (dict) key = group name, value = (integer) number of students in the group
+    :param numberDivisions: (integer) number of divisions
+    :return: (string) canonical configuration
+    """
+    return json.dumps([numberDivisions, sorted([group, numberOfStudents] for group, numberOfStudents in listOfGroupsWithCapacity.items())])
+
+def loadBalancedDivisions():
+    """
+    Function returning the balanced divisions already solved, read from BALANCED_DIVISIONS_FILE the first time.
+
+    :return: (dict) balanced divisions (see _balancedDivisions)
+    """
+    global _balancedDivisions
+    if _balancedDivisions is None:
+        path = TFEdata.getDatasetPath(BALANCED_DIVISIONS_FILE)
+        _balancedDivisions = {}
+        if os.path.exists(path):
+            with open(path) as fh:
+                _balancedDivisions = json.load(fh)
+    return _balancedDivisions
+
+def saveBalancedDivisions():
+    """
+    Function writing the balanced divisions already solved in BALANCED_DIVISIONS_FILE.
+    The file is replaced at once, so a run stopped while writing does not leave a truncated file.
+    """
+    path = TFEdata.getDatasetPath(BALANCED_DIVISIONS_FILE)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(loadBalancedDivisions(), fh, indent=1)
+    os.replace(path + ".tmp", path)
+
+"""
+Largest number of groups for which the division subproblem is solved by solveBalancedDivisions.
+Beyond, the subproblem is solved by CP Optimizer (see solveBalancedDivisionsWithCP).
+"""
+MAX_EXACT_GROUPS = 16
+
+def getDivisionsDeviation(listOfGroupsWithCapacity, divisionOfGroups, numberDivisions):
+    """
+    Function computing the objective of the division subproblem : sum_d{abs(sum_g{(vg==d)*nSg}-expectedMean)} (see generateBalancedDivisions)
+
+    :param listOfGroupsWithCapacity: (dict) key = group name, value = (integer) number of students in the group
+    :param divisionOfGroups: (dict) key = group name, value = (integer) division index for this group
+    :param numberDivisions: (integer) number of divisions
+    :return: (float) sum of the absolute deviations of the divisions from the expected mean
+    """
+    studentsOfDivisions = [0] * numberDivisions
+    for group, numberOfStudents in listOfGroupsWithCapacity.items():
+        studentsOfDivisions[divisionOfGroups[group]] += numberOfStudents
+    expectedMean = sum(studentsOfDivisions) / numberDivisions
+    return sum(abs(students - expectedMean) for students in studentsOfDivisions)
+
+def solveBalancedDivisions(listOfGroupsWithCapacity, numberDivisions):
+    """
+    Function solving the division subproblem (see generateBalancedDivisions) exactly, without CP Optimizer.
+
+    The divisions sum to D * expectedMean, so the objective is twice the sum of the excesses over the mean : sum_d{max(0, sum_g{(vg==d)*nSg}-expectedMean)}.
+    An excess can only grow when a group is added, so a branch and bound placing the largest groups first
+    stops a branch as soon as its excess reaches the best objective found.
+    Divisions with the same number of students are interchangeable : a group is tried in only one of them.
+    Computations are done on integers (numbers of students multiplied by D).
+
+    :param listOfGroupsWithCapacity: (dict) key = group name, value = (integer) number of students in the group
+    :param numberDivisions: (integer) number of divisions
+    :return: (dict) dictionary with :
+        - key = (string) group name, in the order of "listOfGroupsWithCapacity"
+        - value = (integer) division index for this group (divisions are numbered in the order of their first group)
+    """
+    groups = sorted(listOfGroupsWithCapacity, key=lambda group: listOfGroupsWithCapacity[group], reverse=True)
+    # scaled = number of students multiplied by D, so that the expected mean is the integer total
+    scaledSizes = [listOfGroupsWithCapacity[group] * numberDivisions for group in groups]
+    total = sum(listOfGroupsWithCapacity.values())
+
+    loads = [0] * numberDivisions
+    assignment = [0] * len(groups)
+    best = {"excess": math.inf, "assignment": None}
+
+    def branch(groupIndex, excess):
+        if excess >= best["excess"]:
+            return
+        if groupIndex == len(groups):
+            best["excess"] = excess
+            best["assignment"] = list(assignment)
+            return
+        triedLoads = set()
+        # the least loaded divisions first, to find a good solution early
+        for d in sorted(range(numberDivisions), key=loads.__getitem__):
+            if loads[d] in triedLoads:
+                continue
+            triedLoads.add(loads[d])
+            newLoad = loads[d] + scaledSizes[groupIndex]
+            addedExcess = max(0, newLoad - total) - max(0, loads[d] - total)
+            loads[d] = newLoad
+            assignment[groupIndex] = d
+            branch(groupIndex + 1, excess + addedExcess)
+            loads[d] -= scaledSizes[groupIndex]
+
+    branch(0, 0)
+
+    # divisions are renumbered in the order of their first group in "listOfGroupsWithCapacity"
+    divisionOfGroups = dict(zip(groups, best["assignment"]))
+    divisionIndexes = {}
+    for group in listOfGroupsWithCapacity:
+        divisionIndexes.setdefault(divisionOfGroups[group], len(divisionIndexes))
+    return {group: divisionIndexes[divisionOfGroups[group]] for group in listOfGroupsWithCapacity}
+
+def solveBalancedDivisionsWithCP(listOfGroupsWithCapacity, numberDivisions):
+    """
+    Function solving the division subproblem (see generateBalancedDivisions) with CP Optimizer.
+
+    :param listOfGroupsWithCapacity: (dict) key = group name, value = (integer) number of students in the group
+    :param numberDivisions: (integer) number of divisions
+    :return: (dict) dictionary with :
+        - key = (string) group name, in the order of "listOfGroupsWithCapacity"
+        - value = (integer) division index for this group
+    """
+    # docplex is only needed to solve the subproblem : groups and known divisions can be used without it (see /model/lessons.py)
+    import docplex.cp.model as cp
+
+    expectedMean = 0
+
+    # the d_th item of "divisions" is equal to sum_g{(vg==d)*nSg}
+    divisions = [0 for d in range(numberDivisions)]
+
+    # building each vg variable, sum_g{(vg==d)*nSg} and expectedMean
+    for group,numberOfStudents in listOfGroupsWithCapacity.items():
+        expectedMean += numberOfStudents
+
+        # creating vg variable, domain = 0...D-1 and name = group name
+        groupVariable = cp.integer_var(min=0,max=numberDivisions-1,name=group)
+
+        # building each term of sum_g{(vg==d)*nSg}, all divisions in parallel
+        for d in range(numberDivisions):
+            divisions[d] += (groupVariable == d)*numberOfStudents
+    expectedMean /= numberDivisions
+
+    # the subproblem has no constraint, except the variable domains
+    subModel = cp.CpoModel()
+    # the objective function is simply added to the model
+    subModel.add(cp.minimize(cp.sum(cp.abs(div-expectedMean) for div in divisions)))
+    # the subproblem is solved with LogVerbosity='Quiet' to disable logs
+    solution = subModel.solve(LogVerbosity='Quiet')
+    # the solution is an object :
+    # - solution.get_all_var_solutions() returns a list of all variables with their value
+    # - s.get_name() returns the variable name of "s" => group name
+    # - s.get_value() returns the variable value of "s" => division index of this group
+    divisionOfGroups = {s.get_name(): s.get_value() for s in solution.get_all_var_solutions()}
+    return {group: divisionOfGroups[group] for group in listOfGroupsWithCapacity}
 
 class CursusGroups:
     """
@@ -34,6 +205,7 @@ class CursusGroups:
     The data in self.knownDivisions can be updated with new configurations if necessary.
     An unknown configuration encountered in the "generateBalancedDivisions" method will lead to an automatic repartition based on the number of students in each group
     Such divisions may be suboptimal and need some modifications.
+    An automatic repartition is solved once per configuration and number of students, then kept in /data/balancedDivisions.json (see _balancedDivisions).
     """
     def __init__(self, fileDataset):
         """
@@ -177,6 +349,10 @@ class CursusGroups:
                             with d = division, g = group, vg = variable of group g, nSg = number of students of group g.
                             For a particular solution, the expression (vg==d)*nSg is equal to nSg if group g belongs to division d, 0 otherwise.
 
+        The subproblem is solved exactly in Python (see solveBalancedDivisions) when there are at most MAX_EXACT_GROUPS groups,
+        by CP Optimizer otherwise (see solveBalancedDivisionsWithCP).
+        A repartition generated automatically is kept (see _balancedDivisions) : the subproblem of a configuration is solved only once, even across runs.
+
         The "isGroupAuto" boolean defines the way divisions are generated :
             - isGroupAuto == True : divisions are generated automatically
             - isGroupAuto == False : if the configuration (defined by groups and number of divisions) is present in self.knownDivisions, then the manual way is chosen.
@@ -202,34 +378,20 @@ class CursusGroups:
 
         # if the number of divisions is not equal to 1 (non trivial case), the subproblem is built then solved
         if numberDivisions != 1:
-            expectedMean = 0
-
-            # the d_th item of "divisions" is equal to sum_g{(vg==d)*nSg}
-            divisions = [0 for d in range(numberDivisions)]
-
-            # building each vg variable, sum_g{(vg==d)*nSg} and expectedMean
-            for group,numberOfStudents in listOfGroupsWithCapacity.items():
-                expectedMean += numberOfStudents
-
-                # creating vg variable, domain = 0...D-1 and name = group name
-                groupVariable = cp.integer_var(min=0,max=numberDivisions-1,name=group)
-
-                # building each term of sum_g{(vg==d)*nSg}, all divisions in parallel
-                for d in range(numberDivisions):
-                    divisions[d] += (groupVariable == d)*numberOfStudents
-            expectedMean /= numberDivisions
-
-            # the subproblem has no constraint, except the variable domains
-            subModel = cp.CpoModel()
-            # the objective function is simply added to the model
-            subModel.add(cp.minimize(cp.sum(cp.abs(div-expectedMean) for div in divisions)))
-            # the subproblem is solved with LogVerbosity='Quiet' to disable logs
-            solution = subModel.solve(LogVerbosity='Quiet')
-            # the solution is an object :
-            # - solution.get_all_var_solutions() returns a list of all variables with their value
-            # - s.get_name() returns the variable name of "s" => group name
-            # - s.get_value() returns the variable value of "s" => division index of this group
-            return {s.get_name(): s.get_value() for s in solution.get_all_var_solutions()}
+            balancedDivisions = loadBalancedDivisions()
+            balancedDivisionsKey = getBalancedDivisionsKey(listOfGroupsWithCapacity, numberDivisions)
+            if balancedDivisionsKey in balancedDivisions:
+                # the groups are returned in the order of "listOfCursus", as a new solution would be
+                return {group: balancedDivisions[balancedDivisionsKey][group] for group in listOfGroupsWithCapacity}
+
+            # small configurations (all the configurations of the datasets) are solved exactly in Python,
+            # larger ones by CP Optimizer
+            if len(listOfGroupsWithCapacity) <= MAX_EXACT_GROUPS:
+                balancedDivisions[balancedDivisionsKey] = solveBalancedDivisions(listOfGroupsWithCapacity, numberDivisions)
+            else:
+                balancedDivisions[balancedDivisionsKey] = solveBalancedDivisionsWithCP(listOfGroupsWithCapacity, numberDivisions)
+            saveBalancedDivisions()
+            return balancedDivisions[balancedDivisionsKey]
 
         # if there is only one division (all groups belong to the same division),
         # the solution is trivial and all division indexes are equal to "0" for all groups
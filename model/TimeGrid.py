@@ -0,0 +1,132 @@
+import math
+import numpy as np
+
+"""
+Time grids built by getTimeGrid, shared by all modules : a time grid only depends on the 4 constants describing the calendar of the model.
+
+_timeGrids = dictionary with :
+    - key = (tuple) (weeks, days, slots, segmentSize)
+    - value = (TimeGrid) time grid of these constants
+"""
+_timeGrids = {}
+
+def getTimeGrid(constants):
+    """
+    Function returning the time grid of the constants of a model, built once per calendar.
+
+    :param constants: (dict) constants of the model, with at least the keys "weeks", "days", "slots" and "segmentSize"
+    :return: (TimeGrid) shared time grid
+    """
+    key = (constants["weeks"], constants["days"], constants["slots"], constants["segmentSize"])
+    timeGrid = _timeGrids.get(key)
+    if timeGrid is None:
+        timeGrid = _timeGrids[key] = TimeGrid(*key)
+    return timeGrid
+
+class TimeGrid:
+    """
+    Class describing the slots of a model and converting dates of the dataset to slots.
+    A segment of "segmentSize" real weeks is modeled by one week of "days" days of "slots" slots :
+    the slot index i of an interval variable belongs to the segment i // slotsPerSegment, the day i // slots and the slot of the day i % slots.
+
+    Lookup tables (NumPy arrays indexed by the slot index, of size totalSlots) :
+        - segmentOfSlot : segment of the slot
+        - dayOfSlot : day of the slot, from the first day of the model
+        - slotInDay : slot of the day (0...slots-1)
+    The grid is shared (see getTimeGrid) : the tables must never be modified.
+    """
+    __slots__ = ("weeks", "days", "slots", "segmentSize", "slotsPerSegment", "numberOfSegments", "totalDays", "totalSlots",
+                 "segmentOfSlot", "dayOfSlot", "slotInDay")
+
+    def __init__(self, weeks, days, slots, segmentSize):
+        """
+        Constructor of TimeGrid class
+
+        :param weeks: (integer) number of real weeks
+        :param days: (integer) number of days per week
+        :param slots: (integer) number of slots per day
+        :param segmentSize: (integer) number of real weeks in a segment
+        """
+        self.weeks = weeks
+        self.days = days
+        self.slots = slots
+        self.segmentSize = segmentSize
+        self.slotsPerSegment = days * slots
+        self.numberOfSegments = int(weeks / segmentSize)
+        self.totalDays = int(weeks * days / segmentSize)
+        self.totalSlots = int(weeks * days * slots / segmentSize)
+
+        slotIndexes = np.arange(self.totalSlots)
+        self.segmentOfSlot = slotIndexes // self.slotsPerSegment
+        self.dayOfSlot = slotIndexes // slots
+        self.slotInDay = slotIndexes % slots
+
+    def getSegmentStart(self, segment):
+        """
+        Method returning the first slot of a segment (or the slot after the last segment if segment == numberOfSegments).
+
+        :param segment: (integer) segment index
+        :return: (integer) slot index
+        """
+        return segment * self.slotsPerSegment
+
+    def getModelSegmentBounds(self, weekBounds):
+        """
+        Method returning the segments covered by real week bounds : the first segment and the segment after the last one.
+        i.e. weeks 4 to 9 with segments of 3 weeks give the segments (1, 3)
+
+        :param weekBounds: (tuple) (first week, last week), both in 1...weeks
+        :return: (tuple) (first segment, last segment + 1)
+        """
+        return (math.floor((weekBounds[0] - 1) / self.segmentSize), math.ceil(weekBounds[1] / self.segmentSize))
+
+    def getSlotIndexes(self, weeks, days, slots):
+        """
+        Method converting dates of the dataset to slot indexes of the model, all at once.
+        The segment of a week is truncated toward 0 : weeks outside 1...weeks (dates of the dataset are not restricted) give slots outside the model,
+        the weeks 2-segmentSize...0 being in the first segment.
+
+        :param weeks: (array-like) real weeks (starting from 1)
+        :param days: (array-like) days of the week (starting from 1)
+        :param slots: (array-like) slots of the day (starting from 1)
+        :return: (numpy.ndarray) slot indexes (integers)
+        """
+        segments = np.trunc((np.asarray(weeks, dtype=np.int64) - 1) / self.segmentSize).astype(np.int64)
+        return segments * self.slotsPerSegment \
+               + (np.asarray(days, dtype=np.int64) - 1) * self.slots + np.asarray(slots, dtype=np.int64) - 1
+
+    def getUnavailabilities(self, dataset):
+        """
+        Method converting the rows of an unavailability sheet ("Cursus", "Teachers", "Breaks") to intervals of slots.
+        The end of an unavailability is the slot after its last slot.
+
+        :param dataset: (pandas.DataFrame) sheet with the columns weekStart, dayStart, slotStart, weekEnd, dayEnd, slotEnd
+        :return: (list) (start, end) slots of each row, in the order of the rows
+        """
+        if len(dataset) == 0:
+            return []
+        starts = self.getSlotIndexes(dataset["weekStart"], dataset["dayStart"], dataset["slotStart"])
+        ends = self.getSlotIndexes(dataset["weekEnd"], dataset["dayEnd"], dataset["slotEnd"]) + 1
+        return list(zip(starts.tolist(), ends.tolist()))
+
+    def getMask(self, intervals):
+        """
+        Method converting intervals of slots to a mask of the slots of the model (slots outside the model are ignored).
+
+        :param intervals: (iterable) (start, end) slots of each interval, end excluded
+        :return: (numpy.ndarray) boolean array of size totalSlots, True for the slots of at least one interval
+        """
+        mask = np.zeros(self.totalSlots, dtype=bool)
+        for start, end in intervals:
+            mask[max(start, 0):max(min(end, self.totalSlots), 0)] = True
+        return mask
+
+    def getMaskIntervals(self, mask):
+        """
+        Method converting a mask of the slots of the model to intervals of consecutive slots (see getMask).
+
+        :param mask: (numpy.ndarray) boolean array of size totalSlots
+        :return: (list) (start, end) slots of each interval of True values, end excluded, in increasing order
+        """
+        changes = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+        return list(zip(changes[::2].tolist(), changes[1::2].tolist()))
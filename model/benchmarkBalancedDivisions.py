@@ -0,0 +1,65 @@
+import CursusGroups as TFEcursusGroups
+import data.io as TFEdata
+import time
+
+"""
+This script compares the two solvers of the division subproblem (see generateBalancedDivisions in /model/CursusGroups.py) :
+    - solveBalancedDivisions : exact solver in Python, used by default
+    - solveBalancedDivisionsWithCP : CP Optimizer, used for configurations with more than MAX_EXACT_GROUPS groups
+Each configuration (cursus of an AA and number of exercise/TP divisions) of the dataset is solved once by each solver,
+the computation time and the objective (sum of the absolute deviations from the expected mean) are displayed.
+The cache of balanced divisions (see _balancedDivisions) is not used : both solvers are always called.
+"""
+
+fileDataset = "input.json"
+cursusGroups = TFEcursusGroups.CursusGroups(fileDataset)
+
+# configurations = key (tuple of cursus, number of divisions), in the order of the dataset
+configurations = {}
+for quadri in ("Q1", "Q2"):
+    for rowAA in TFEdata.loadAARecords(fileDataset, quadri):
+        for field in ("exerciseDivisions", "tpDivisions"):
+            numberDivisions = getattr(rowAA, field)
+            # one division is trivial, and AAs of unknown cursus can not be divided
+            if isinstance(numberDivisions, int) and numberDivisions > 1 and all(cursus in cursusGroups.cursusData for cursus in rowAA.cursus):
+                configurations[(tuple(rowAA.cursus), numberDivisions)] = None
+
+print("Configurations : ", len(configurations))
+print("{:>6} {:>9} {:>12} {:>12} {:>12} {:>12}".format("groups", "divisions", "exact (ms)", "exact obj.", "CP (ms)", "CP obj."))
+
+totalTimes = {"exact": 0, "CP": 0}
+isCPAvailable = True
+differences = 0
+for listOfCursus, numberDivisions in configurations:
+    listOfGroupsWithCapacity = cursusGroups.getGroupsWithCapacity(list(listOfCursus))
+
+    begin = time.perf_counter()
+    divisionOfGroups = TFEcursusGroups.solveBalancedDivisions(listOfGroupsWithCapacity, numberDivisions)
+    exactTime = time.perf_counter() - begin
+    totalTimes["exact"] += exactTime
+    exactObjective = TFEcursusGroups.getDivisionsDeviation(listOfGroupsWithCapacity, divisionOfGroups, numberDivisions)
+
+    CPTime = CPObjective = None
+    if isCPAvailable:
+        begin = time.perf_counter()
+        try:
+            divisionOfGroups = TFEcursusGroups.solveBalancedDivisionsWithCP(listOfGroupsWithCapacity, numberDivisions)
+        # i.e. docplex or the CP Optimizer executable is not installed
+        except Exception as error:
+            print("CP Optimizer unavailable : ", error)
+            isCPAvailable = False
+        else:
+            CPTime = time.perf_counter() - begin
+            totalTimes["CP"] += CPTime
+            CPObjective = TFEcursusGroups.getDivisionsDeviation(listOfGroupsWithCapacity, divisionOfGroups, numberDivisions)
+            if abs(CPObjective - exactObjective) > 1e-6:
+                differences += 1
+
+    print("{:>6} {:>9} {:>12.3f} {:>12.1f} {:>12} {:>12}".format(
+        len(listOfGroupsWithCapacity), numberDivisions, exactTime * 1000, exactObjective,
+        "-" if CPTime is None else "{:.3f}".format(CPTime * 1000), "-" if CPObjective is None else "{:.1f}".format(CPObjective)))
+
+print("Total exact solver (ms) : {:.3f}".format(totalTimes["exact"] * 1000))
+if isCPAvailable:
+    print("Total CP Optimizer (ms) : {:.3f}".format(totalTimes["CP"] * 1000))
+    print("Configurations with different objectives : ", differences)
@@ -0,0 +1,73 @@
+import variables as TFEvariables
+import constraints as TFEconstraints
+import docplex.cp.model as cp
+import time
+
+"""
+This script compares the two encodings of the floating sequences (see addScenarios in /model/constraints.py) :
+    - scenarios (default) : one logical_or of logical_and per placement of the floating sequences
+    - offsets ("offsetEncoding" set to True) : one integer offset per floating sequence selecting the bounds of its interval variables
+For each encoding and size of segment, the same model is built (constraints of runModel4Segments.py and lecturesBeforeConstraint),
+then the time of spreadIntervalVariablesOverSegments and lecturesBeforeConstraint, the size of the model and the time to the first solution are displayed.
+"""
+
+cursus = ["BA1", "BA2", "BA3_CHIM", "BA3_ELEC", "BA3_IG", "BA3_MECA", "BA3_MIN"]
+timeLimit = 60
+
+print("{:>8} {:>10} {:>12} {:>12} {:>12} {:>14}".format("segment", "encoding", "build (ms)", "expressions", "CPO (chars)", "1st sol. (s)"))
+
+isCPAvailable = True
+for segmentSize in (3, 1):
+    for encoding in ("scenarios", "offsets"):
+        constants = {
+            "weeks": 12,
+            "days": 5,
+            "slots": 4,
+            "segmentSize": segmentSize,
+            "roundUp": True,
+            "cursus": {name: True for name in cursus},
+            "quadri": "Q1",
+            "fileDataset": "datasetFinal.xlsx",
+            "folderResults": "benchmarkScenarioEncodings",
+            "groupAuto": False,
+            "offsetEncoding": encoding == "offsets"
+        }
+        model = cp.CpoModel()
+        lecturesDict, exercisesDict, tpsDict, projectsDict, \
+        groupsIntervalVariables, teachersIntervalVariables, roomsIntervalVariables, \
+        cursusGroups, AAset = TFEvariables.generateIntervalVariables(constants)
+
+        TFEconstraints.cursusUnavailabilityConstraint(model, cursusGroups, groupsIntervalVariables, constants)
+        TFEconstraints.teachersUnavailabilityConstraint(model, teachersIntervalVariables, constants)
+        TFEconstraints.longIntervalVariablesIntegrity(model, tpsDict, constants)
+        TFEconstraints.longIntervalVariablesIntegrity(model, projectsDict, constants)
+        TFEconstraints.notOverlappingConstraint(model, groupsIntervalVariables)
+        TFEconstraints.notOverlappingConstraint(model, teachersIntervalVariables)
+        TFEconstraints.notOverlappingConstraint(model, roomsIntervalVariables)
+        TFEconstraints.multipliedVariablesInSameSegmentConstraint(model, exercisesDict, constants)
+        TFEconstraints.multipliedVariablesInSameSegmentConstraint(model, tpsDict, constants)
+
+        # only these constraints depend on the encoding
+        begin = time.perf_counter()
+        for lessonDict in (lecturesDict, exercisesDict, tpsDict, projectsDict):
+            TFEconstraints.spreadIntervalVariablesOverSegments(model, lessonDict, constants)
+        TFEconstraints.lecturesBeforeConstraint(model, lecturesDict, [exercisesDict, tpsDict], AAset, constants)
+        buildTime = time.perf_counter() - begin
+
+        sizeCPO = len(model.get_cpo_string())
+
+        solutionTime = None
+        if isCPAvailable:
+            begin = time.perf_counter()
+            try:
+                solution = model.solve(SolutionLimit=1, TimeLimit=timeLimit, LogVerbosity="Quiet")
+            # i.e. the CP Optimizer executable is not installed
+            except Exception as error:
+                print("CP Optimizer unavailable : ", error)
+                isCPAvailable = False
+            else:
+                solutionTime = time.perf_counter() - begin if solution else None
+
+        print("{:>8} {:>10} {:>12.1f} {:>12} {:>12} {:>14}".format(
+            segmentSize, encoding, buildTime * 1000, len(model.get_all_expressions()), sizeCPO,
+            "-" if solutionTime is None else "{:.2f}".format(solutionTime)))
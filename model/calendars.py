@@ -0,0 +1,123 @@
+import docplex.cp.model as cp
+import TimeGrid as TFEtimeGrid
+
+"""
+Calendar functions of the model (forbid_start/forbid_extent step functions and penalty segmented functions).
+A function only depends on the number of slots of the model and on its pattern : it is built once and the same object is returned to every caller.
+A function shared by several expressions is written once in the CPO model, whatever the number of constraints and models using it.
+
+_calendarFunctions = dictionary with :
+    - key = (tuple) (kind of function, total number of slots, pattern)
+    - value = (CpoStepFunction or CpoSegmentedFunction) function
+Functions of the registry are shared : they must never be modified (i.e. with set_value).
+
+_calendarStatistics = dictionary with the number of functions built ("built") and returned from the registry ("shared")
+"""
+_calendarFunctions = {}
+_calendarStatistics = {"built": 0, "shared": 0}
+
+def getTotalSlots(constants):
+    """
+    Function returning the number of slots of the model (all segments).
+
+    :param constants: (dict) constants of the model
+    :return: (integer) number of slots
+    """
+    return TFEtimeGrid.getTimeGrid(constants).totalSlots
+
+def getCalendarFunction(key, buildFunction):
+    """
+    Function returning the function of the registry with this key, built with "buildFunction" if it does not exist yet.
+
+    :param key: (tuple) key of the function (see _calendarFunctions)
+    :param buildFunction: (function) function without parameter returning the CpoStepFunction or CpoSegmentedFunction
+    :return: (CpoStepFunction or CpoSegmentedFunction) shared function
+    """
+    calendarFunction = _calendarFunctions.get(key)
+    if calendarFunction is None:
+        calendarFunction = _calendarFunctions[key] = buildFunction()
+        _calendarStatistics["built"] += 1
+    else:
+        _calendarStatistics["shared"] += 1
+    return calendarFunction
+
+def getCalendarStatistics():
+    """
+    Function returning a copy of the counters of the registry.
+
+    :return: (dict) dictionary with keys "built", "shared" and "functions" (number of functions in the registry)
+    """
+    return dict(_calendarStatistics, functions=len(_calendarFunctions))
+
+def getPeriodicStepFunction(constants, values):
+    """
+    Function returning the step function repeating "values" over all slots of the model : the value of slot i is values[i % len(values)].
+    i.e. values = (1, 0) allows starts on the first and third slots of a day only (long interval variables).
+
+    :param constants: (dict) constants of the model
+    :param values: (tuple) values of the slots of one period
+    :return: (CpoStepFunction) shared step function
+    """
+    totalSlots = getTotalSlots(constants)
+
+    def buildFunction():
+        # a step is only needed where the value changes (the value before the first step is 0)
+        steps = []
+        previousValue = 0
+        for i in range(totalSlots):
+            value = values[i % len(values)]
+            if value != previousValue or i == 0:
+                steps.append((i, value))
+                previousValue = value
+        return cp.CpoStepFunction(steps=steps)
+
+    return getCalendarFunction(("periodicStep", totalSlots, tuple(values)), buildFunction)
+
+def getPeriodicSegmentedFunction(constants, values, horizon=None):
+    """
+    Function returning the segmented function repeating "values" over the slots 0...horizon-1 : the value on [i, i+1) is values[i % len(values)], 0 elsewhere.
+    i.e. values = (0, 0, 0, 1) penalizes the last slot of each day.
+
+    :param constants: (dict) constants of the model
+    :param values: (tuple) values of the slots of one period
+    :param horizon: (integer) number of slots on which the values are set, the number of slots of the model if None
+    :return: (CpoSegmentedFunction) shared segmented function
+    """
+    totalSlots = getTotalSlots(constants)
+    if horizon is None:
+        horizon = totalSlots
+
+    def buildFunction():
+        segmentedFunction = cp.CpoSegmentedFunction()
+        # consecutive slots with the same value are set at once
+        start = 0
+        for i in range(1, horizon + 1):
+            if i == horizon or values[i % len(values)] != values[start % len(values)]:
+                if values[start % len(values)] != 0:
+                    segmentedFunction.set_value(start, i, values[start % len(values)])
+                start = i
+        return segmentedFunction
+
+    return getCalendarFunction(("periodicSegmented", totalSlots, tuple(values), horizon), buildFunction)
+
+def getUnavailabilityFunction(constants, unavailabilities):
+    """
+    Function returning the step function of unavailabilities used with forbid_extent : 0 during the unavailabilities, 100 on other slots of the model.
+    Entities (groups, teachers, ...) with the same unavailabilities share the same function.
+
+    :param constants: (dict) constants of the model
+    :param unavailabilities: (iterable) (start, end) slots of each unavailability, end excluded
+    :return: (CpoStepFunction) shared step function
+    """
+    totalSlots = getTotalSlots(constants)
+    # the order of the unavailabilities does not change the function : they all set the value 0
+    pattern = tuple(sorted(set(unavailabilities)))
+
+    def buildFunction():
+        unavailabilityFunction = cp.CpoStepFunction()
+        unavailabilityFunction.set_value(0, totalSlots, 100)
+        for startValue, endValue in pattern:
+            unavailabilityFunction.set_value(startValue, endValue, 0)
+        return unavailabilityFunction
+
+    return getCalendarFunction(("unavailability", totalSlots, pattern), buildFunction)
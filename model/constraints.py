@@ -1,215 +1,659 @@
 import math
 import data.io as TFEdata
 import variables as TFEvariables
+import calendars as TFEcalendars
+import TimeGrid as TFEtimeGrid
+import lessons as TFElessons
 import docplex.cp.model as cp
 import itertools
+import collections
+import numpy as np
 
-def longIntervalVariablesIntegrity(model, lessonDict, constants):
-    firstOrThirdSlotOnlyFunction = cp.CpoStepFunction(steps=[(i,1 if i%2 == 0 else 0) for i in range(int(constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"]))])
+"""
+Constraints built per AA by the constraint families (see iterateAAs), kept so that a new build only rebuilds the constraints of new or changed AAs.
+An AA whose interval variables are reused (see _builtAAs in variables.py) is the same dictionary in the new lessonDict : its constraints are the same expressions.
+
+_builtAAConstraints = dictionary with :
+    - key = (tuple) name of the constraint family, constants and parameters used
+    - value = dictionary with key = id of the AA dictionary, value = (tuple) (AA dictionary, list of expressions added for this AA)
+"""
+_builtAAConstraints = {}
+
+"""
+forbid_extent added by the unavailability constraints (see addUnavailabilities) to the last model receiving unavailabilities.
+An interval variable has at most one forbid_extent in this model, combining all its unavailabilities (groups, teachers, breaks).
+
+_unavailabilityConstraints = dictionary with :
+    - "model" : (CpoModel) model receiving the constraints
+    - "variables" : (dict) key = id of the interval variable, value = (tuple) (interval variable, frozenset of its patterns, its forbid_extent or None)
+    - "requested" : (integer) number of (interval variable, entity) unavailabilities requested
+    - "constraints" : (integer) number of forbid_extent in the model
+"""
+_unavailabilityConstraints = {"model": None, "variables": {}, "requested": 0, "constraints": 0}
+
+"""
+no_overlap added by notOverlappingConstraint to the last model receiving no_overlap constraints.
+A no_overlap on a set of interval variables is implied by a no_overlap on any superset : a resource (group, teacher, room) whose interval variables
+are the same as, or a subset of, the interval variables of another resource does not add a constraint.
+
+_noOverlapConstraints = dictionary with :
+    - "model" : (CpoModel) model receiving the constraints
+    - "sets" : (dict) key = (frozenset) ids of the interval variables of a no_overlap, value = (CpoExpr) its no_overlap
+    - "setsOfVariables" : (dict) key = id of an interval variable, value = (set) keys of "sets" containing this interval variable
+    - "requested" : (integer) number of resources given to notOverlappingConstraint
+    - "requestedVariables" : (integer) total number of interval variables of these resources
+    - "split" : (integer) number of resources whose interval variables are split by segment (see splitIntervalVariablesBySegment)
+    - "duplicates" : (integer) number of sets (interval variables of a resource or of a split) equal to the set of a no_overlap of the model
+    - "dominated" : (integer) number of sets which are a strict subset of the set of a no_overlap of the model
+    - "trivial" : (integer) number of sets with less than 2 interval variables
+"""
+_noOverlapConstraints = {"model": None, "sets": {}, "setsOfVariables": {},
+                         "requested": 0, "requestedVariables": 0, "split": 0, "duplicates": 0, "dominated": 0, "trivial": 0}
+
+"""
+Offsets of the floating sequences used by the offset encoding of the scenarios (see addScenarios), shared by all constraints on the same floating sequence.
+The offset of a floating sequence is the number of segments between the first segment of the AA and the segment of its first lesson.
+Interval variables are reused between builds (see _builtAAs in variables.py) : their offsets are reused too.
+
+_floatingSequenceOffsets = dictionary with :
+    - key = id of the first interval variable of the floating sequence
+    - value = (tuple) (first interval variable, number of offsets, CpoIntVar offset)
+"""
+_floatingSequenceOffsets = {}
+
+"""
+Operations whose operands can be exchanged without changing the expression (see getCanonicalForm) :
+    - COMMUTATIVE_OPERATIONS : operations with 2 operands
+    - SET_OPERATIONS : operations on an array, the order of the elements of the array does not matter
+Other operations are compared operand by operand : an unknown operation can only hide a symmetry, never create one.
+"""
+COMMUTATIVE_OPERATIONS = {"equal", "diff", "plus", "times", "max", "min", "||", "&&"}
+SET_OPERATIONS = {"noOverlap", "sum", "max", "min", "or", "and"}
+
+"""
+Counters of the last call to breakSymmetries.
+
+_symmetryStatistics = dictionary with :
+    - "lessonClasses" : (integer) number of classes of at least 2 interchangeable lessons of a division (or of all divisions at once)
+    - "divisionClasses" : (integer) number of classes of at least 2 interchangeable divisions of an AA
+    - "constraints" : (integer) number of ordering constraints added
+"""
+_symmetryStatistics = {"lessonClasses": 0, "divisionClasses": 0, "constraints": 0}
+
+"""
+Static precedences read by propagatePrecedences : a precedence X(a) + delay <= Y(b) (or ==) between the start/end of two interval variables.
+PRECEDENCE_OPERATIONS = dictionary with :
+    - key = CPO name of the constraint
+    - value = (tuple) (point of the first interval variable, point of the second interval variable, True for an equality)
+COMPARISON_OPERATIONS = dictionary with key = CPO name of the comparison, value = (tuple) (True if the operands are swapped, margin added to the left operand, True for an equality)
+i.e. start_of(a) > end_of(b) is end_of(b) + 1 <= start_of(a)
+"""
+PRECEDENCE_OPERATIONS = {"endBeforeStart": ("end", "start", False), "startBeforeStart": ("start", "start", False),
+                         "endBeforeEnd": ("end", "end", False), "startBeforeEnd": ("start", "end", False),
+                         "endAtStart": ("end", "start", True), "startAtStart": ("start", "start", True),
+                         "endAtEnd": ("end", "end", True), "startAtEnd": ("start", "end", True)}
+COMPARISON_OPERATIONS = {"lessOrEqual": (False, 0, False), "less": (False, 1, False),
+                         "greaterOrEqual": (True, 0, False), "greater": (True, 1, False), "equal": (False, 0, True)}
+
+"""
+Result of the last call to propagatePrecedences.
+
+_precedenceStatistics = dictionary with :
+    - "variables" : (integer) number of interval variables in at least one static precedence or bound
+    - "precedences" : (integer) number of arcs s_b >= s_a + weight of the precedence graph (an equality gives 2 arcs)
+    - "bounds" : (integer) number of constant bounds on the start of an interval variable
+    - "passes" : (integer) number of passes over the arcs until no window changes
+    - "tightened" : (integer) number of interval variables whose window is reduced by the precedences
+    - "constraints" : (integer) number of start_of bounds added to the model
+    - "removedStarts" : (integer) total number of start values removed from the windows by the precedences
+    - "infeasible" : (list) offending chains (see getInfeasibleChain), empty if the windows are consistent
+"""
+_precedenceStatistics = {"variables": 0, "precedences": 0, "bounds": 0, "passes": 0, "tightened": 0, "constraints": 0, "removedStarts": 0, "infeasible": []}
+
+class AAConstraintsRecorder:
+    """
+    Class adding expressions to a model while recording them, used in place of the model when the constraints of one AA are built (see iterateAAs)
+    """
+    __slots__ = ("model", "expressions")
+
+    def __init__(self, model):
+        """
+        Constructor of AAConstraintsRecorder class
+
+        :param model: (CpoModel) model receiving the expressions
+        """
+        self.model = model
+        self.expressions = []
+
+    def add(self, expression):
+        """
+        Method adding an expression to the model and recording it
+
+        :param expression: (CpoExpr) expression to add
+        """
+        self.expressions.append(expression)
+        self.model.add(expression)
+
+def iterateAAs(model, lessonDict, family, constants, *parameters):
+    """
+    Generator iterating over the AAs of a lessonDict for a constraint family.
+    The constraints of an AA already built with the same interval variables (same AA dictionary) and the same constants are added again to the model
+    and the AA is not yielded. Other AAs are yielded with an AAConstraintsRecorder which must be used instead of the model to add their constraints.
+
+    :param model: (CpoModel) model receiving the constraints
+    :param lessonDict: (dict) lessonDict (see variables.py)
+    :param family: (string) name of the constraint family
+    :param constants: (dict) constants of the model, None if the family does not use them (only numbers, strings and booleans are compared)
+    :param parameters: other parameters of the family (must be hashable)
+    :return: generator of (AA, AAmodel) with AA = value of lessonDict, AAmodel = AAConstraintsRecorder
+    """
+    constantsKey = tuple(sorted((k, v) for k, v in (constants or {}).items() if isinstance(v, (int, float, str, bool))))
+    key = (family, constantsKey) + parameters
+    previousConstraints = _builtAAConstraints.get(key, {})
+    constraints = {}
     for AA in lessonDict.values():
+        builtConstraints = previousConstraints.get(id(AA))
+        if builtConstraints is not None and builtConstraints[0] is AA:
+            for expression in builtConstraints[1]:
+                model.add(expression)
+        else:
+            AAmodel = AAConstraintsRecorder(model)
+            yield AA, AAmodel
+            builtConstraints = (AA, AAmodel.expressions)
+        constraints[id(AA)] = builtConstraints
+    _builtAAConstraints[key] = constraints
+
+def longIntervalVariablesIntegrity(model, lessonDict, constants):
+    firstOrThirdSlotOnlyFunction = TFEcalendars.getPeriodicStepFunction(constants, (1, 0))
+    for AA, AAmodel in iterateAAs(model, lessonDict, "longIntervalVariablesIntegrity", constants):
         for variablesOfDivision in AA["divisions"]:
             for intervalVariable in variablesOfDivision:
-                model.add(cp.forbid_start(interval=intervalVariable,function=firstOrThirdSlotOnlyFunction))
+                AAmodel.add(cp.forbid_start(interval=intervalVariable,function=firstOrThirdSlotOnlyFunction))
 
 def morningSlotConstraint(model, lessonDict, constants, cursusWhitelist=None):
-    morningOnlyFunction = cp.CpoStepFunction(steps=[(i,1 if i%4 < 2 else 0) for i in range(int(constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"]))])
-    for AA in lessonDict.values():
+    morningOnlyFunction = TFEcalendars.getPeriodicStepFunction(constants, (1, 1, 0, 0))
+    for AA, AAmodel in iterateAAs(model, lessonDict, "morningSlotConstraint", constants, None if cursusWhitelist is None else tuple(cursusWhitelist)):
         if cursusWhitelist is not None and not any(cursus in AA["cursus"] for cursus in cursusWhitelist):
             continue
         for variablesOfDivision in AA["divisions"]:
             for intervalVariable in variablesOfDivision:
-                model.add(cp.forbid_start(interval=intervalVariable,function=morningOnlyFunction))
+                AAmodel.add(cp.forbid_start(interval=intervalVariable,function=morningOnlyFunction))
 
-def notOverlappingConstraint(model, entityIntervalVariables):
+def splitIntervalVariablesBySegment(intervalVariables, timeGrid):
+    """
+    Function splitting the interval variables of a resource into smaller lists, according to their domains :
+        - one list per segment with at least one interval variable confined to it : these interval variables and the floating ones which can reach the segment
+        - one list of the floating interval variables (spanning several segments), if any
+    Two interval variables overlapping share a segment : the no_overlap of the lists are equivalent to the no_overlap of all interval variables.
+
+    :param intervalVariables: (list) interval variables of a resource
+    :param timeGrid: (TimeGrid) time grid of the model
+    :return: (list) lists of interval variables, or [intervalVariables] if no interval variable is confined to one segment
+    """
+    segmentsOfVariables = []
+    for intervalVariable in intervalVariables:
+        firstSlot, lastSlot = getIntervalVariableExtent(intervalVariable, timeGrid)
+        segmentsOfVariables.append(range(int(timeGrid.segmentOfSlot[firstSlot]), int(timeGrid.segmentOfSlot[max(lastSlot - 1, firstSlot)]) + 1))
+    pinnedSegments = sorted({segments[0] for segments in segmentsOfVariables if len(segments) == 1})
+    if not pinnedSegments:
+        return [intervalVariables]
+    listsOfVariables = [[intervalVariable for intervalVariable, segments in zip(intervalVariables, segmentsOfVariables) if segment in segments]
+                        for segment in pinnedSegments]
+    floatingVariables = [intervalVariable for intervalVariable, segments in zip(intervalVariables, segmentsOfVariables) if len(segments) > 1]
+    if floatingVariables:
+        listsOfVariables.append(floatingVariables)
+    return listsOfVariables
+
+def notOverlappingConstraint(model, entityIntervalVariables, constants=None):
+    """
+    Function adding one no_overlap per resource, except for resources whose interval variables are already constrained (see _noOverlapConstraints) :
+    a resource with the same interval variables as a no_overlap of the model or with a subset of them adds nothing,
+    and a no_overlap of the model on a subset of the interval variables of a new resource is replaced by the no_overlap of the new resource.
+    Resources of the previous calls on the same model are taken into account (i.e. a teacher following all the lessons of a group).
+    With "constants["segmentNoOverlap"]" set to True, the no_overlap of a resource is split by segment (see splitIntervalVariablesBySegment) :
+    only interval variables whose domains are confined to one segment are split (see getLessonDomains in /model/lessons.py with "foldDomains").
+
+    :param model: (CpoModel) model receiving the constraints
+    :param entityIntervalVariables: (dict) key = resource name, value = (list) interval variables of the resource
+    :param constants: (dict) constants of the model, None to never split the no_overlap
+    """
+    global _noOverlapConstraints
+    if _noOverlapConstraints["model"] is not model:
+        _noOverlapConstraints = {"model": model, "sets": {}, "setsOfVariables": {},
+                                 "requested": 0, "requestedVariables": 0, "split": 0, "duplicates": 0, "dominated": 0, "trivial": 0}
+    sets = _noOverlapConstraints["sets"]
+    setsOfVariables = _noOverlapConstraints["setsOfVariables"]
+
+    listsOfVariables = []
     for intervalVariables in entityIntervalVariables.values():
-        model.add(cp.no_overlap(intervalVariables))
+        _noOverlapConstraints["requested"] += 1
+        _noOverlapConstraints["requestedVariables"] += len(intervalVariables)
+        if constants is not None and constants.get("segmentNoOverlap") and len(intervalVariables) > 1:
+            splitLists = splitIntervalVariablesBySegment(intervalVariables, TFEtimeGrid.getTimeGrid(constants))
+            if len(splitLists) > 1:
+                _noOverlapConstraints["split"] += 1
+            listsOfVariables.extend(splitLists)
+        else:
+            listsOfVariables.append(intervalVariables)
+
+    replacedExpressions = []
+    newExpressions = []
+    # larger sets first : a set of this call can only be dominated by a set already constrained
+    for intervalVariables in sorted(listsOfVariables, key=len, reverse=True):
+        key = frozenset(id(intervalVariable) for intervalVariable in intervalVariables)
+        if len(key) < 2:
+            _noOverlapConstraints["trivial"] += 1
+            continue
+        if key in sets:
+            _noOverlapConstraints["duplicates"] += 1
+            continue
+        # a superset contains every interval variable of the set, in particular the one in the fewest sets
+        rarestVariable = min(key, key=lambda variableId: len(setsOfVariables.get(variableId, ())))
+        if any(key < otherKey for otherKey in setsOfVariables.get(rarestVariable, ())):
+            _noOverlapConstraints["dominated"] += 1
+            continue
+
+        dominatedKeys = {otherKey for variableId in key for otherKey in setsOfVariables.get(variableId, ()) if otherKey < key}
+        for otherKey in dominatedKeys:
+            replacedExpressions.append(sets.pop(otherKey))
+            for variableId in otherKey:
+                setsOfVariables[variableId].discard(otherKey)
+            _noOverlapConstraints["dominated"] += 1
+
+        expression = cp.no_overlap(intervalVariables)
+        sets[key] = expression
+        for variableId in key:
+            setsOfVariables.setdefault(variableId, set()).add(key)
+        newExpressions.append(expression)
+
+    if replacedExpressions:
+        # expressions of the previous calls only : expressions of this call are never replaced
+        model.remove(replacedExpressions)
+    for expression in newExpressions:
+        model.add(expression)
+
+def getNoOverlapStatistics():
+    """
+    Function returning the counters of the no_overlap of the last model receiving no_overlap constraints (see notOverlappingConstraint).
+
+    :return: (dict) dictionary with :
+        - "requested" : (integer) number of no_overlap without collapsing (one per resource)
+        - "constraints" : (integer) number of no_overlap in the model
+        - "split" : (integer) number of resources split by segment
+        - "duplicates", "dominated", "trivial" : (integer) number of sets without no_overlap for each reason (see _noOverlapConstraints)
+        - "requestedVariables" : (integer) total size of the no_overlap without collapsing
+        - "variables" : (integer) total size of the no_overlap in the model
+    """
+    return {"requested": _noOverlapConstraints["requested"], "constraints": len(_noOverlapConstraints["sets"]),
+            "split": _noOverlapConstraints["split"], "duplicates": _noOverlapConstraints["duplicates"], "dominated": _noOverlapConstraints["dominated"], "trivial": _noOverlapConstraints["trivial"],
+            "requestedVariables": _noOverlapConstraints["requestedVariables"], "variables": sum(len(key) for key in _noOverlapConstraints["sets"])}
 
 def multipliedVariablesInSameSegmentConstraint(model, lessonDict, constants):
-    for AA in lessonDict.values():
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
+    for AA, AAmodel in iterateAAs(model, lessonDict, "multipliedVariablesInSameSegmentConstraint", constants):
         numberOfDivisions = len(AA["divisions"])
         numberOfLessons = len(AA["divisions"][0])
         if numberOfDivisions != 1:
             for j in range(numberOfLessons):
                 multipliedVariables = [AA["divisions"][i][j] for i in range(numberOfDivisions)]
+                if constants.get("linearSynchronization"):
+                    # the segment of the first division is the anchor of the lesson : one constraint per other division
+                    anchor = cp.trunc(cp.start_of(multipliedVariables[0]) / timeGrid.slotsPerSegment)
+                    for intervalVariable in multipliedVariables[1:]:
+                        AAmodel.add(cp.trunc(cp.start_of(intervalVariable) / timeGrid.slotsPerSegment) == anchor)
+                    continue
                 for intervalVariable1,intervalVariable2 in itertools.combinations(multipliedVariables,2):
-                    model.add(cp.trunc(cp.start_of(intervalVariable1) / (constants["days"] * constants["slots"])) ==
-                              cp.trunc(cp.start_of(intervalVariable2) / (constants["days"] * constants["slots"])))
+                    AAmodel.add(cp.trunc(cp.start_of(intervalVariable1) / timeGrid.slotsPerSegment) ==
+                                cp.trunc(cp.start_of(intervalVariable2) / timeGrid.slotsPerSegment))
 
 def maxGapBetweenMultipliedVariables(model, lessonDict, constants):
-    for AA in lessonDict.values():
+    for AA, AAmodel in iterateAAs(model, lessonDict, "maxGapBetweenMultipliedVariables", constants):
         numberOfDivisions = len(AA["divisions"])
         numberOfLessons = len(AA["divisions"][0])
         if numberOfDivisions != 1:
             for j in range(numberOfLessons):
                 multipliedVariables = [AA["divisions"][i][j] for i in range(numberOfDivisions)]
+                if constants.get("linearSynchronization"):
+                    # the largest gap between two divisions is between the last start and the first end (same constraint if gap >= 0)
+                    AAmodel.add(constants["gap"] >= cp.max([cp.start_of(intervalVariable) for intervalVariable in multipliedVariables])
+                                                    - cp.min([cp.end_of(intervalVariable) for intervalVariable in multipliedVariables]))
+                    continue
                 for intervalVariable1,intervalVariable2 in itertools.combinations(multipliedVariables,2):
-                    model.add(constants["gap"] >= cp.max(cp.start_of(intervalVariable1) - cp.end_of(intervalVariable2),
-                                                         cp.start_of(intervalVariable2) - cp.end_of(intervalVariable1)))
+                    AAmodel.add(constants["gap"] >= cp.max(cp.start_of(intervalVariable1) - cp.end_of(intervalVariable2),
+                                                           cp.start_of(intervalVariable2) - cp.end_of(intervalVariable1)))
 
-def cursusUnavailabilityConstraint(model, cursusGroups, groupsIntervalVariables, constants):
+def getCursusUnavailabilities(cursusGroups, constants):
     datasetCursusUnavailabilities = TFEdata.loadData(constants["fileDataset"],constants["quadri"], "Cursus")
-    unavailabilityFunctions = {}
+    unavailabilities = {}
 
-    for rowCursusUnavailabilities in datasetCursusUnavailabilities.itertuples():
+    # (start, end) slots of each row, computed for all rows at once
+    slotsOfRows = TFEtimeGrid.getTimeGrid(constants).getUnavailabilities(datasetCursusUnavailabilities)
+    for rowCursusUnavailabilities, (startValue, endValue) in zip(datasetCursusUnavailabilities.itertuples(), slotsOfRows):
         listOfGroups = cursusGroups.getGroups([rowCursusUnavailabilities.cursus])
-        startValue = math.trunc((rowCursusUnavailabilities.weekStart - 1)
-                                / constants["segmentSize"]) * constants["days"] * constants["slots"] \
-                     + (rowCursusUnavailabilities.dayStart - 1) * constants["slots"] \
-                     + rowCursusUnavailabilities.slotStart - 1
-        endValue = math.trunc((rowCursusUnavailabilities.weekEnd - 1)
-                              / constants["segmentSize"]) * constants["days"] * constants["slots"] \
-                   + (rowCursusUnavailabilities.dayEnd - 1) * constants["slots"] \
-                   + rowCursusUnavailabilities.slotEnd
         for group in listOfGroups:
-            if group not in unavailabilityFunctions:
-                unavailabilityFunctions[group] = cp.CpoStepFunction()
-                unavailabilityFunctions[group].set_value(0, int(constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"]), 100)
-            unavailabilityFunctions[group].set_value(startValue,endValue,0)
+            unavailabilities.setdefault(group, []).append((startValue, endValue))
+    return unavailabilities
 
-    for group,unavailabilityFunction in unavailabilityFunctions.items():
-        if group in groupsIntervalVariables:
-            for intervalVariable in groupsIntervalVariables[group]:
-                model.add(cp.forbid_extent(intervalVariable,unavailabilityFunction))
-
-def teachersUnavailabilityConstraint(model, teachersIntervalVariables, constants):
+def getTeachersUnavailabilities(constants):
     datasetTeachersUnavailabilities = TFEdata.loadData(constants["fileDataset"],constants["quadri"], "Teachers")
-    unavailabilityFunctions = {}
-
-    for rowTeacherUnavailabilities in datasetTeachersUnavailabilities.itertuples():
-        startValue = math.trunc((rowTeacherUnavailabilities.weekStart - 1)
-                                / constants["segmentSize"]) * constants["days"] * constants["slots"] \
-                     + (rowTeacherUnavailabilities.dayStart - 1) * constants["slots"] \
-                     + rowTeacherUnavailabilities.slotStart - 1
-        endValue = math.trunc((rowTeacherUnavailabilities.weekEnd - 1)
-                              / constants["segmentSize"]) * constants["days"] * constants["slots"] \
-                   + (rowTeacherUnavailabilities.dayEnd - 1) * constants["slots"] \
-                   + rowTeacherUnavailabilities.slotEnd
-        if rowTeacherUnavailabilities.teacher not in unavailabilityFunctions:
-            unavailabilityFunctions[rowTeacherUnavailabilities.teacher] = cp.CpoStepFunction()
-            unavailabilityFunctions[rowTeacherUnavailabilities.teacher].set_value(0, int(constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"]), 100)
-        unavailabilityFunctions[rowTeacherUnavailabilities.teacher].set_value(startValue, endValue, 0)
-
-    for teacher, unavailabilityFunction in unavailabilityFunctions.items():
-        if teacher in teachersIntervalVariables:
-            for intervalVariable in teachersIntervalVariables[teacher]:
-                model.add(cp.forbid_extent(intervalVariable, unavailabilityFunction))
+    unavailabilities = {}
 
-def daysOffUnavailabilityConstraint(model, lessonDict, constants):
+    slotsOfRows = TFEtimeGrid.getTimeGrid(constants).getUnavailabilities(datasetTeachersUnavailabilities)
+    for rowTeacherUnavailabilities, (startValue, endValue) in zip(datasetTeachersUnavailabilities.itertuples(), slotsOfRows):
+        unavailabilities.setdefault(rowTeacherUnavailabilities.teacher, []).append((startValue, endValue))
+    return unavailabilities
+
+def getDaysOffUnavailabilities(constants):
     datasetDaysOff = TFEdata.loadData(constants["fileDataset"],constants["quadri"], "Breaks")
-    unavailabilityFunction = cp.CpoStepFunction()
-    unavailabilityFunction.set_value(0, int(constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"]), 100)
-
-    for rowDayOff in datasetDaysOff.itertuples():
-        startValue = math.trunc((rowDayOff.weekStart - 1) / constants["segmentSize"]) * constants["days"] * constants["slots"] \
-                     + (rowDayOff.dayStart - 1) * constants["slots"] \
-                     + rowDayOff.slotStart - 1
-        endValue = math.trunc((rowDayOff.weekEnd - 1) / constants["segmentSize"]) * constants["days"] * constants["slots"] \
-                   + (rowDayOff.dayEnd - 1) * constants["slots"] \
-                   + rowDayOff.slotEnd
-        unavailabilityFunction.set_value(startValue, endValue, 0)
+    return TFEtimeGrid.getTimeGrid(constants).getUnavailabilities(datasetDaysOff)
 
-    for AA in lessonDict.values():
-        for variablesOfDivision in AA["divisions"]:
-            for intervalVariable in variablesOfDivision:
-                model.add(cp.forbid_extent(intervalVariable,unavailabilityFunction))
+def getIntervalVariableExtent(intervalVariable, timeGrid):
+    """
+    Function returning the slots an interval variable can occupy according to its domain : from its first start to its last end.
+
+    :param intervalVariable: (CpoIntervalVar) interval variable
+    :param timeGrid: (TimeGrid) time grid of the model
+    :return: (tuple) (first slot, last slot + 1), clipped to the slots of the model
+    """
+    firstSlot = max(intervalVariable.get_start()[0], 0)
+    lastSlot = min(intervalVariable.get_end()[1], intervalVariable.get_start()[1] + intervalVariable.get_size()[1], timeGrid.totalSlots)
+    return firstSlot, lastSlot
+
+def addUnavailabilities(model, patternsOfVariables, constants):
+    """
+    Function adding unavailabilities to interval variables with at most one forbid_extent per interval variable in the model (see _unavailabilityConstraints).
+    The unavailabilities already added to an interval variable are merged with the new ones : its previous forbid_extent is replaced by one combined function.
+    Identical unavailabilities (same pattern) are merged once, and interval variables with the same set of patterns share the same combined function.
+    No constraint is added if the combined unavailabilities are outside the slots the interval variable can occupy (its domain).
+
+    :param model: (CpoModel) model receiving the constraints
+    :param patternsOfVariables: (iterable) (interval variable, pattern) with pattern = (tuple) sorted (start, end) slots of the unavailabilities of one entity
+    :param constants: (dict) constants of the model
+    """
+    global _unavailabilityConstraints
+    if _unavailabilityConstraints["model"] is not model:
+        _unavailabilityConstraints = {"model": model, "variables": {}, "requested": 0, "constraints": 0}
+    constraintsOfVariables = _unavailabilityConstraints["variables"]
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
+
+    # new patterns of each interval variable
+    newPatternsOfVariables = {}
+    for intervalVariable, pattern in patternsOfVariables:
+        newPatternsOfVariables.setdefault(id(intervalVariable), (intervalVariable, set()))[1].add(pattern)
+        _unavailabilityConstraints["requested"] += 1
+
+    # combinedMasks[set of patterns] = mask of the slots of the model in at least one of the patterns
+    combinedMasks = {}
+    replacedExpressions = []
+    newExpressions = []
+    for variableId, (intervalVariable, newPatterns) in newPatternsOfVariables.items():
+        patterns, expression = constraintsOfVariables.get(variableId, (None, frozenset(), None))[1:]
+        if newPatterns <= patterns:
+            continue
+        patterns = patterns | newPatterns
+        if patterns not in combinedMasks:
+            combinedMasks[patterns] = timeGrid.getMask(interval for pattern in patterns for interval in pattern)
+        mask = combinedMasks[patterns]
+
+        firstSlot, lastSlot = getIntervalVariableExtent(intervalVariable, timeGrid)
+        if expression is not None:
+            replacedExpressions.append(expression)
+            _unavailabilityConstraints["constraints"] -= 1
+            expression = None
+        if mask[firstSlot:lastSlot].any():
+            expression = cp.forbid_extent(intervalVariable, TFEcalendars.getUnavailabilityFunction(constants, timeGrid.getMaskIntervals(mask)))
+            newExpressions.append(expression)
+            _unavailabilityConstraints["constraints"] += 1
+        constraintsOfVariables[variableId] = (intervalVariable, patterns, expression)
+
+    if replacedExpressions:
+        model.remove(replacedExpressions)
+    for expression in newExpressions:
+        model.add(expression)
+
+def getUnavailabilityStatistics():
+    """
+    Function returning the counters of the unavailabilities of the last model receiving unavailabilities (see addUnavailabilities).
+
+    :return: (dict) dictionary with :
+        - "requested" : (integer) number of forbid_extent the unavailability constraints would add without merging (one per interval variable and entity)
+        - "constraints" : (integer) number of forbid_extent in the model
+        - "eliminated" : (integer) number of forbid_extent avoided by merging
+    """
+    return {"requested": _unavailabilityConstraints["requested"], "constraints": _unavailabilityConstraints["constraints"],
+            "eliminated": _unavailabilityConstraints["requested"] - _unavailabilityConstraints["constraints"]}
+
+def cursusUnavailabilityConstraint(model, cursusGroups, groupsIntervalVariables, constants):
+    # the unavailabilities of all groups of an interval variable are merged (see addUnavailabilities)
+    addUnavailabilities(model, ((intervalVariable, tuple(sorted(set(unavailabilitiesOfGroup))))
+                                for group, unavailabilitiesOfGroup in getCursusUnavailabilities(cursusGroups, constants).items() if group in groupsIntervalVariables
+                                for intervalVariable in groupsIntervalVariables[group]), constants)
+
+def teachersUnavailabilityConstraint(model, teachersIntervalVariables, constants):
+    addUnavailabilities(model, ((intervalVariable, tuple(sorted(set(unavailabilitiesOfTeacher))))
+                                for teacher, unavailabilitiesOfTeacher in getTeachersUnavailabilities(constants).items() if teacher in teachersIntervalVariables
+                                for intervalVariable in teachersIntervalVariables[teacher]), constants)
+
+def daysOffUnavailabilityConstraint(model, lessonDict, constants):
+    pattern = tuple(sorted(set(getDaysOffUnavailabilities(constants))))
+    addUnavailabilities(model, ((intervalVariable, pattern) for AA in lessonDict.values()
+                                for variablesOfDivision in AA["divisions"] for intervalVariable in variablesOfDivision), constants)
 
 def orderingIntervalVariablesConstraint(model, lessonDict):
-    for AA in lessonDict.values():
+    for AA, AAmodel in iterateAAs(model, lessonDict, "orderingIntervalVariablesConstraint", None):
         for variablesOfDivision in AA["divisions"]:
             for i in range(len(variablesOfDivision)-1):
-                model.add(cp.end_before_start(variablesOfDivision[i],variablesOfDivision[i+1]))
+                AAmodel.add(cp.end_before_start(variablesOfDivision[i],variablesOfDivision[i+1]))
 
 def segmentBoundsConstraint(model, lessonDict, constants):
-    for AA in lessonDict.values():
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
+    for AA, AAmodel in iterateAAs(model, lessonDict, "segmentBoundsConstraint", constants):
+        # the segment bounds may already be the domains of the interval variables (see getLessonDomains in /model/lessons.py)
+        if TFElessons.hasFoldedDomains(AA["weekBounds"], constants):
+            continue
         for variablesOfDivision in AA["divisions"]:
-            modelSegmentBounds = (math.floor((AA["weekBounds"][0]-1) / constants["segmentSize"]),
-                               math.ceil(AA["weekBounds"][1] / constants["segmentSize"]))
+            modelSegmentBounds = timeGrid.getModelSegmentBounds(AA["weekBounds"])
             if modelSegmentBounds[0] != 0:
                 for intervalVariable in variablesOfDivision:
-                    model.add(cp.start_of(intervalVariable) >= modelSegmentBounds[0] * constants["days"] * constants["slots"])
+                    AAmodel.add(cp.start_of(intervalVariable) >= timeGrid.getSegmentStart(modelSegmentBounds[0]))
             if modelSegmentBounds[1] != constants["weeks"]/constants["segmentSize"]:
                 for intervalVariable in variablesOfDivision:
-                    model.add(cp.end_of(intervalVariable) <= modelSegmentBounds[1] * constants["days"] * constants["slots"])
+                    AAmodel.add(cp.end_of(intervalVariable) <= timeGrid.getSegmentStart(modelSegmentBounds[1]))
+
+
+def getFloatingSequenceOffset(floatingVariables, numberOfOffsets):
+    """
+    Function returning the offset of a floating sequence (see _floatingSequenceOffsets), created the first time.
+
+    :param floatingVariables: (list) interval variables of the floating sequence
+    :param numberOfOffsets: (integer) number of positions of the floating sequence in the segments of its AA
+    :return: (CpoIntVar) integer variable with the values 0...numberOfOffsets-1
+    """
+    firstVariable = floatingVariables[0]
+    offset = _floatingSequenceOffsets.get(id(firstVariable))
+    if offset is None or offset[0] is not firstVariable or offset[1] != numberOfOffsets:
+        offset = _floatingSequenceOffsets[id(firstVariable)] = (firstVariable, numberOfOffsets,
+                                                                 cp.integer_var(0, numberOfOffsets - 1, name=firstVariable.get_name() + "_offset"))
+    return offset[2]
+
+def getConditionExpression(condition):
+    """
+    Function returning the expression of a condition of a scenario (see addScenarios).
+
+    :param condition: (tuple) ("start", intervalVariable, slot), ("end", intervalVariable, slot) or ("after", intervalVariable, previousIntervalVariable)
+    :return: (CpoExpr) start_of(intervalVariable) >= slot, end_of(intervalVariable) <= slot or end_of(previousIntervalVariable) <= start_of(intervalVariable)
+    """
+    kind, intervalVariable, value = condition
+    if kind == "start":
+        return cp.start_of(intervalVariable) >= value
+    if kind == "end":
+        return cp.end_of(intervalVariable) <= value
+    return cp.end_of(value) <= cp.start_of(intervalVariable)
 
+def getIndexedValue(values, offsets, index):
+    """
+    Function returning the expression of the values of the scenarios indexed by the offsets (see addScenarios) :
+    a constant if all values are equal, an arithmetic expression of the offsets if the values are linear in the offsets, an element expression otherwise.
+
+    :param values: (list) value (integer or CpoExpr) of each scenario
+    :param offsets: (list) (CpoIntVar offset, number of offsets) of each floating sequence
+    :param index: (CpoExpr) index of the scenario
+    :return: (integer or CpoExpr) value of the scenario chosen by the offsets
+    """
+    if all(isinstance(value, int) for value in values):
+        if all(value == values[0] for value in values):
+            return values[0]
+        # value of scenario = values[0] + sum of step * offset : the step of an offset is the difference between its values 1 and 0
+        steps = []
+        radix = 1
+        for offset, numberOfOffsets in reversed(offsets):
+            steps.insert(0, values[radix] - values[0] if numberOfOffsets > 1 else 0)
+            radix *= numberOfOffsets
+        digits = [[]]
+        for offset, numberOfOffsets in offsets:
+            digits = [digit + [value] for digit in digits for value in range(numberOfOffsets)]
+        if all(values[k] == values[0] + sum(step * digit for step, digit in zip(steps, digits[k])) for k in range(len(values))):
+            terms = [step * offset for step, (offset, numberOfOffsets) in zip(steps, offsets) if step != 0]
+            expression = sum(terms[1:], terms[0])
+            return expression if values[0] == 0 else values[0] + expression
+    return cp.element(values, index)
+
+def addScenarios(model, scenarios, offsets, constants):
+    """
+    Function adding the constraint "one of the scenarios holds" on the positions of floating sequences.
+    A scenario is a list of conditions (see getConditionExpression) for one position of each floating sequence,
+    the index of a scenario is given by the offsets of the floating sequences : index = (...(offset0 * numberOfOffsets1 + offset1) * ...).
+    By default, the scenarios are a logical_or of one logical_and per scenario.
+    With "constants["offsetEncoding"]" set to True, the offsets select the conditions :
+    each interval variable has one bound per kind of condition, indexed by the offsets (see getIndexedValue).
+
+    :param model: (CpoModel or AAConstraintsRecorder) model receiving the constraints
+    :param scenarios: (list) conditions of each scenario in the order of their index, None for a scenario which is not allowed
+    :param offsets: (list) (CpoIntVar offset, number of offsets) of each floating sequence (see getFloatingSequenceOffset)
+    :param constants: (dict) constants of the model
+    """
+    if not constants.get("offsetEncoding"):
+        model.add(cp.logical_or([cp.logical_and([getConditionExpression(condition) for condition in scenario]) for scenario in scenarios if scenario is not None]))
+        return
+
+    index = offsets[0][0]
+    for offset, numberOfOffsets in offsets[1:]:
+        index = index * numberOfOffsets + offset
+    allowedScenarios = [k for k, scenario in enumerate(scenarios) if scenario is not None]
+    if len(allowedScenarios) != len(scenarios):
+        model.add(cp.allowed_assignments(index, allowedScenarios))
+    # a scenario which is not allowed has the conditions of the first allowed scenario (its values are never used)
+    scenarios = [scenario if scenario is not None else scenarios[allowedScenarios[0]] for scenario in scenarios]
+
+    # bounds of each interval variable in each scenario : latest start, earliest end, previous interval variables
+    totalSlots = TFEtimeGrid.getTimeGrid(constants).totalSlots
+    boundsOfVariables = {}
+    for k, scenario in enumerate(scenarios):
+        for kind, intervalVariable, value in scenario:
+            bounds = boundsOfVariables.setdefault(id(intervalVariable),
+                                                  (intervalVariable, [0] * len(scenarios), [totalSlots] * len(scenarios), [[] for _ in scenarios]))
+            if kind == "start":
+                bounds[1][k] = max(bounds[1][k], value)
+            elif kind == "end":
+                bounds[2][k] = min(bounds[2][k], value)
+            else:
+                bounds[3][k].append(value)
+
+    for intervalVariable, startBounds, endBounds, previousVariables in boundsOfVariables.values():
+        startBound = getIndexedValue(startBounds, offsets, index)
+        if not (isinstance(startBound, int) and startBound == 0):
+            model.add(cp.start_of(intervalVariable) >= startBound)
+        endBound = getIndexedValue(endBounds, offsets, index)
+        if not (isinstance(endBound, int) and endBound == totalSlots):
+            model.add(cp.end_of(intervalVariable) <= endBound)
+        for r in range(max(len(previous) for previous in previousVariables)):
+            previousOfScenarios = [previous[r] if r < len(previous) else None for previous in previousVariables]
+            if all(previous is previousOfScenarios[0] for previous in previousOfScenarios):
+                model.add(cp.end_before_start(previousOfScenarios[0], intervalVariable))
+            else:
+                model.add(cp.start_of(intervalVariable) >= cp.element([0 if previous is None else cp.end_of(previous) for previous in previousOfScenarios], index))
 
 def spreadIntervalVariablesOverSegments(model, lessonDict, constants):
-    totalNumberOfSegments = int(constants["weeks"] / constants["segmentSize"])
-    for AA in lessonDict.values():
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
+    totalNumberOfSegments = timeGrid.numberOfSegments
+    for AA, AAmodel in iterateAAs(model, lessonDict, "spreadIntervalVariablesOverSegments", constants):
+        # the segment of each lesson may already be in its domain (see getLessonDomains in /model/lessons.py)
+        isFolded = TFElessons.hasFoldedDomains(AA["weekBounds"], constants)
         for variablesOfDivision in AA["divisions"]:
             if not isinstance(AA["weekBounds"][0],int) and not isinstance(AA["weekBounds"][1],int):
                 continue
-            modelSegmentBounds = (math.floor((AA["weekBounds"][0] - 1) / constants["segmentSize"]),
-                                      math.ceil(AA["weekBounds"][1] / constants["segmentSize"]))
+            modelSegmentBounds = timeGrid.getModelSegmentBounds(AA["weekBounds"])
             sizeOfFullSequence = modelSegmentBounds[1]-modelSegmentBounds[0]
             numberOfFullSequences = math.trunc(len(variablesOfDivision)/sizeOfFullSequence)
             sizeOfFloatingSequence = int(len(variablesOfDivision)%sizeOfFullSequence)
             for i in range(numberOfFullSequences):
                 for j in range(sizeOfFullSequence):
-                    model.add(cp.start_of(variablesOfDivision[i * sizeOfFullSequence + j])
-                              >= (modelSegmentBounds[0] + j) * constants["days"] * constants["slots"])
-                    model.add(cp.end_of(variablesOfDivision[i * sizeOfFullSequence + j])
-                              <= (modelSegmentBounds[0] + j + 1) * constants["days"] * constants["slots"])
+                    if not isFolded:
+                        AAmodel.add(cp.start_of(variablesOfDivision[i * sizeOfFullSequence + j])
+                                    >= timeGrid.getSegmentStart(modelSegmentBounds[0] + j))
+                        AAmodel.add(cp.end_of(variablesOfDivision[i * sizeOfFullSequence + j])
+                                    <= timeGrid.getSegmentStart(modelSegmentBounds[0] + j + 1))
                     if i != numberOfFullSequences - 1:
-                        model.add(cp.end_before_start(variablesOfDivision[i * sizeOfFullSequence + j],
-                                                      variablesOfDivision[(i + 1) * sizeOfFullSequence + j]))
+                        AAmodel.add(cp.end_before_start(variablesOfDivision[i * sizeOfFullSequence + j],
+                                                        variablesOfDivision[(i + 1) * sizeOfFullSequence + j]))
 
             for i in range(sizeOfFloatingSequence):
                 if i != sizeOfFloatingSequence-1:
-                    model.add(cp.trunc(cp.start_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+i])
-                                       / (constants["days"] * constants["slots"]))
-                              == cp.trunc(cp.start_of(variablesOfDivision[numberOfFullSequences * sizeOfFullSequence + i + 1])
-                                          / (constants["days"] * constants["slots"])) - 1)
-                if modelSegmentBounds[0] != 0:
-                    model.add(cp.start_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+i])
-                              >= modelSegmentBounds[0] * constants["days"] * constants["slots"])
-                if modelSegmentBounds[1] != totalNumberOfSegments:
-                    model.add(cp.end_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+i])
-                              <= modelSegmentBounds[1] * constants["days"] * constants["slots"])
+                    AAmodel.add(cp.trunc(cp.start_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+i])
+                                         / timeGrid.slotsPerSegment)
+                                == cp.trunc(cp.start_of(variablesOfDivision[numberOfFullSequences * sizeOfFullSequence + i + 1])
+                                            / timeGrid.slotsPerSegment) - 1)
+                if modelSegmentBounds[0] != 0 and not isFolded:
+                    AAmodel.add(cp.start_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+i])
+                                >= timeGrid.getSegmentStart(modelSegmentBounds[0]))
+                if modelSegmentBounds[1] != totalNumberOfSegments and not isFolded:
+                    AAmodel.add(cp.end_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+i])
+                                <= timeGrid.getSegmentStart(modelSegmentBounds[1]))
             if sizeOfFloatingSequence != 0 and numberOfFullSequences != 0:
                 numberOfScenarios = sizeOfFullSequence - sizeOfFloatingSequence + 1
                 scenarios = []
                 for i in range(numberOfScenarios):
-                    constraintsOfScenario = []
+                    conditionsOfScenario = []
                     for j in range(sizeOfFloatingSequence):
-                        constraintsOfScenario.append((cp.end_of(variablesOfDivision[(numberOfFullSequences-1)*sizeOfFullSequence+i+j])
-                                                      <= cp.start_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+j])))
-                        constraintsOfScenario.append((cp.start_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+j])
-                                                      >= (modelSegmentBounds[0]+i+j) * constants["days"] * constants["slots"]))
-                        constraintsOfScenario.append((cp.end_of(variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+j])
-                                                      <= (modelSegmentBounds[0]+i+j+1) * constants["days"] * constants["slots"]))
-                    scenarios.append(cp.logical_and(constraintsOfScenario))
-                model.add(cp.logical_or(scenarios))
+                        conditionsOfScenario.append(("after", variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+j],
+                                                     variablesOfDivision[(numberOfFullSequences-1)*sizeOfFullSequence+i+j]))
+                        conditionsOfScenario.append(("start", variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+j],
+                                                     timeGrid.getSegmentStart(modelSegmentBounds[0]+i+j)))
+                        conditionsOfScenario.append(("end", variablesOfDivision[numberOfFullSequences*sizeOfFullSequence+j],
+                                                     timeGrid.getSegmentStart(modelSegmentBounds[0]+i+j+1)))
+                    scenarios.append(conditionsOfScenario)
+                floatingVariables = variablesOfDivision[numberOfFullSequences*sizeOfFullSequence:]
+                addScenarios(AAmodel, scenarios, [(getFloatingSequenceOffset(floatingVariables, numberOfScenarios), numberOfScenarios)], constants)
 
 def strictRegularityConstraint(model, lessonDict, constants):
-    for AA in lessonDict.values():
+    for AA, AAmodel in iterateAAs(model, lessonDict, "strictRegularityConstraint", constants):
         for variablesOfDivision in AA["divisions"]:
             sequences = TFEvariables.splitVariablesInSequences(variablesOfDivision, constants["fullSequenceSize"])
             for variablesOfSequence in sequences:
                 for i in range(len(variablesOfSequence)-1):
-                    model.add(cp.start_at_start(variablesOfSequence[i], variablesOfSequence[i + 1], delay=20))
+                    AAmodel.add(cp.start_at_start(variablesOfSequence[i], variablesOfSequence[i + 1], delay=20))
 
 def breakSymmetryBetweenFullSequences(model, lessonDict, constants):
-    for AA in lessonDict.values():
+    for AA, AAmodel in iterateAAs(model, lessonDict, "breakSymmetryBetweenFullSequences", constants):
         for variablesOfDivision in AA["divisions"]:
             sequences = TFEvariables.splitVariablesInSequences(variablesOfDivision, constants["fullSequenceSize"])
             fullSequences = [spread for spread in sequences if len(spread) == constants["fullSequenceSize"]]
             for i in range(len(fullSequences)-1):
                 for j in range(len(fullSequences[0])):
-                    model.add(cp.end_before_start(fullSequences[i][j],fullSequences[i+1][j]))
+                    AAmodel.add(cp.end_before_start(fullSequences[i][j],fullSequences[i+1][j]))
 
 def lecturesBeforeConstraint(model, lecturesDict, listOfAfterLessonsDict, AAset, constants):
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
     for idAA in AAset:
         if idAA in lecturesDict and isinstance(lecturesDict[idAA]["weekBounds"][0],int) and isinstance(lecturesDict[idAA]["weekBounds"][1],int):
-            modelWeekBoundsLecture = (math.floor((lecturesDict[idAA]["weekBounds"][0] - 1) / constants["segmentSize"]),
-                                      math.ceil(lecturesDict[idAA]["weekBounds"][1] / constants["segmentSize"]))
+            modelWeekBoundsLecture = timeGrid.getModelSegmentBounds(lecturesDict[idAA]["weekBounds"])
             sizeOfFullSequenceLecture = modelWeekBoundsLecture[1] - modelWeekBoundsLecture[0]
             for variablesOfDivisionLecture in lecturesDict[idAA]["divisions"]:
                 numberOfFullSequencesLecture = math.trunc(len(variablesOfDivisionLecture) / sizeOfFullSequenceLecture)
                 sizeOfFloatingSequenceLecture = int(len(variablesOfDivisionLecture) % sizeOfFullSequenceLecture)
                 for afterLessonDict in listOfAfterLessonsDict:
                     if idAA in afterLessonDict:
-                        modelWeekBoundsAfterLesson = (math.floor((afterLessonDict[idAA]["weekBounds"][0] - 1) / constants["segmentSize"]),
-                                                      math.ceil(afterLessonDict[idAA]["weekBounds"][1] / constants["segmentSize"]))
+                        modelWeekBoundsAfterLesson = timeGrid.getModelSegmentBounds(afterLessonDict[idAA]["weekBounds"])
                         sizeOfFullSequenceAfterLesson = modelWeekBoundsAfterLesson[1] - modelWeekBoundsAfterLesson[0]
                         if (modelWeekBoundsLecture[0] >= modelWeekBoundsAfterLesson[1]
                                 or modelWeekBoundsAfterLesson[0] >= modelWeekBoundsLecture[1]):
@@ -234,17 +678,21 @@ def lecturesBeforeConstraint(model, lecturesDict, listOfAfterLessonsDict, AAset,
                                                                          if lectureIndex + modelWeekBoundsLecture[0] == afterLessonIndex + modelWeekBoundsAfterLesson[0] + i])
                                         scenarios = []
                                         for overlap in overlapPossibilities:
-                                            constraintsOfScenario = []
+                                            conditionsOfScenario = []
                                             if len(overlap) != 0:
                                                 for lectureIndex,afterLessonIndex in overlap:
-                                                    constraintsOfScenario.append((cp.end_of(variablesOfDivisionLecture[(numberOfFullSequencesLecture-1)*sizeOfFullSequenceLecture+lectureIndex])
-                                                                                  <= cp.start_of(variablesOfDivisionAfterLesson[afterLessonIndex])))
-                                                    constraintsOfScenario.append((cp.end_of(variablesOfDivisionAfterLesson[afterLessonIndex])
-                                                                                  <= (lectureIndex + 1 + modelWeekBoundsLecture[0]) * constants["days"] * constants["slots"]))
-                                                    constraintsOfScenario.append((cp.start_of(variablesOfDivisionAfterLesson[afterLessonIndex])
-                                                                                  >= (lectureIndex + modelWeekBoundsLecture[0]) * constants["days"] * constants["slots"]))
-                                                scenarios.append(cp.logical_and(constraintsOfScenario))
-                                        model.add(cp.logical_or(scenarios))
+                                                    conditionsOfScenario.append(("after", variablesOfDivisionAfterLesson[afterLessonIndex],
+                                                                                 variablesOfDivisionLecture[(numberOfFullSequencesLecture-1)*sizeOfFullSequenceLecture+lectureIndex]))
+                                                    conditionsOfScenario.append(("end", variablesOfDivisionAfterLesson[afterLessonIndex],
+                                                                                 timeGrid.getSegmentStart(lectureIndex + 1 + modelWeekBoundsLecture[0])))
+                                                    conditionsOfScenario.append(("start", variablesOfDivisionAfterLesson[afterLessonIndex],
+                                                                                 timeGrid.getSegmentStart(lectureIndex + modelWeekBoundsLecture[0])))
+                                                scenarios.append(conditionsOfScenario)
+                                            else:
+                                                # the floating after lessons must overlap the lectures
+                                                scenarios.append(None)
+                                        addScenarios(model, scenarios, [(getFloatingSequenceOffset(variablesOfDivisionAfterLesson, numberOfScenariosAfterLesson),
+                                                                         numberOfScenariosAfterLesson)], constants)
 
                                 else:
                                     if sizeOfFloatingSequenceAfterLesson == 0 or numberOfFullSequencesAfterLesson != 0:
@@ -255,17 +703,22 @@ def lecturesBeforeConstraint(model, lecturesDict, listOfAfterLessonsDict, AAset,
                                                                          if lectureIndex + modelWeekBoundsLecture[0] + i == afterLessonIndex + modelWeekBoundsAfterLesson[0]])
                                         scenarios = []
                                         for overlap in overlapPossibilities:
-                                            constraintsOfScenario = []
+                                            conditionsOfScenario = []
                                             if len(overlap) != 0:
                                                 for lectureIndex, afterLessonIndex in overlap:
-                                                    constraintsOfScenario.append((cp.end_of(variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex])
-                                                                                  <= cp.start_of(variablesOfDivisionAfterLesson[afterLessonIndex])))
-                                                    constraintsOfScenario.append((cp.end_of(variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex])
-                                                                                  <= (afterLessonIndex+1+modelWeekBoundsAfterLesson[0]) * constants["days"] * constants["slots"]))
-                                                    constraintsOfScenario.append((cp.start_of(variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex])
-                                                                                  >= (afterLessonIndex+modelWeekBoundsAfterLesson[0]) * constants["days"] * constants["slots"]))
-                                                scenarios.append(cp.logical_and(constraintsOfScenario))
-                                        model.add(cp.logical_or(scenarios))
+                                                    conditionsOfScenario.append(("after", variablesOfDivisionAfterLesson[afterLessonIndex],
+                                                                                 variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex]))
+                                                    conditionsOfScenario.append(("end", variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex],
+                                                                                 timeGrid.getSegmentStart(afterLessonIndex+1+modelWeekBoundsAfterLesson[0])))
+                                                    conditionsOfScenario.append(("start", variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex],
+                                                                                 timeGrid.getSegmentStart(afterLessonIndex+modelWeekBoundsAfterLesson[0])))
+                                                scenarios.append(conditionsOfScenario)
+                                            else:
+                                                # the floating lectures must overlap the after lessons
+                                                scenarios.append(None)
+                                        floatingVariablesLecture = variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture:]
+                                        addScenarios(model, scenarios, [(getFloatingSequenceOffset(floatingVariablesLecture, numberOfScenariosLecture),
+                                                                         numberOfScenariosLecture)], constants)
                                         if numberOfFullSequencesLecture != 0:
                                             for i in range(segmentsIntersection[0], segmentsIntersection[1]):
                                                 model.add(cp.end_before_start(variablesOfDivisionLecture[(numberOfFullSequencesLecture - 1) * sizeOfFullSequenceLecture + i - modelWeekBoundsLecture[0]],
@@ -281,30 +734,496 @@ def lecturesBeforeConstraint(model, lecturesDict, listOfAfterLessonsDict, AAset,
                                                 overlapPossibilities[(i+modelWeekBoundsLecture[0],j+modelWeekBoundsAfterLesson[0])] = possibilities
                                         scenarios = []
                                         for segmentsKey,overlap in overlapPossibilities.items():
-                                            constraintsOfScenario = []
+                                            conditionsOfScenario = []
                                             for lectureIndex,afterLessonIndex in overlap:
-                                                constraintsOfScenario.append((cp.end_of(variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex])
-                                                                              <= cp.start_of(variablesOfDivisionAfterLesson[afterLessonIndex])))
+                                                conditionsOfScenario.append(("after", variablesOfDivisionAfterLesson[afterLessonIndex],
+                                                                             variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + lectureIndex]))
                                             for i in range(sizeOfFloatingSequenceLecture):
-                                                constraintsOfScenario.append((cp.end_of(variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + i])
-                                                                              <= (segmentsKey[0] + i + 1) * constants["days"] * constants["slots"]))
-                                                constraintsOfScenario.append((cp.start_of(variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + i])
-                                                                              >= (segmentsKey[0] + i) * constants["days"] * constants["slots"]))
+                                                conditionsOfScenario.append(("end", variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + i],
+                                                                             timeGrid.getSegmentStart(segmentsKey[0] + i + 1)))
+                                                conditionsOfScenario.append(("start", variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture + i],
+                                                                             timeGrid.getSegmentStart(segmentsKey[0] + i)))
                                             for i in range(sizeOfFloatingSequenceAfterLesson):
-                                                constraintsOfScenario.append((cp.end_of(variablesOfDivisionAfterLesson[i])
-                                                                              <= (segmentsKey[1] + i + 1) * constants["days"] * constants["slots"]))
-                                                constraintsOfScenario.append((cp.start_of(variablesOfDivisionAfterLesson[i])
-                                                                              >= (segmentsKey[1] + i) * constants["days"] * constants["slots"]))
+                                                conditionsOfScenario.append(("end", variablesOfDivisionAfterLesson[i], timeGrid.getSegmentStart(segmentsKey[1] + i + 1)))
+                                                conditionsOfScenario.append(("start", variablesOfDivisionAfterLesson[i], timeGrid.getSegmentStart(segmentsKey[1] + i)))
                                                 if numberOfFullSequencesLecture != 0 and i + segmentsKey[1] in range(segmentsIntersection[0],segmentsIntersection[1]):
-                                                    constraintsOfScenario.append((cp.end_of(variablesOfDivisionLecture[(numberOfFullSequencesLecture - 1) * sizeOfFullSequenceLecture + i + segmentsKey[1] - modelWeekBoundsLecture[0]])
-                                                                                  <= cp.start_of(variablesOfDivisionAfterLesson[i])))
-                                            scenarios.append(cp.logical_and(constraintsOfScenario))
-                                        model.add(cp.logical_or(scenarios))
+                                                    conditionsOfScenario.append(("after", variablesOfDivisionAfterLesson[i],
+                                                                                 variablesOfDivisionLecture[(numberOfFullSequencesLecture - 1) * sizeOfFullSequenceLecture + i + segmentsKey[1] - modelWeekBoundsLecture[0]]))
+                                            scenarios.append(conditionsOfScenario)
+                                        # scenarios are indexed by (offset of the lectures, offset of the after lessons)
+                                        floatingVariablesLecture = variablesOfDivisionLecture[numberOfFullSequencesLecture * sizeOfFullSequenceLecture:]
+                                        addScenarios(model, scenarios, [(getFloatingSequenceOffset(floatingVariablesLecture, numberOfScenariosLecture), numberOfScenariosLecture),
+                                                                        (getFloatingSequenceOffset(variablesOfDivisionAfterLesson, numberOfScenariosAfterLesson), numberOfScenariosAfterLesson)],
+                                                     constants)
+
+
+def getCanonicalForm(expression, canonicalForms):
+    """
+    Function returning a hashable form of an expression, and the ids of its variables.
+    Operands of commutative operations and elements of arrays of set operations are sorted (see COMMUTATIVE_OPERATIONS and SET_OPERATIONS) :
+    two expressions with the same form are the same constraint.
+
+    :param expression: (CpoExpr or value) expression
+    :param canonicalForms: (dict) key = id of an expression, value = (tuple) (expression, form, frozenset of ids of its variables), completed by this function
+                           (see getPermutedForm for the keys (id of an array, "elements"))
+    :return: (tuple) (form, frozenset of ids of the variables of the expression)
+    """
+    canonicalForm = canonicalForms.get(id(expression))
+    if canonicalForm is not None and canonicalForm[0] is expression:
+        return canonicalForm[1], canonicalForm[2]
+    if isinstance(expression, cp.CpoVariable):
+        form, variableIds = ("variable", id(expression)), frozenset((id(expression),))
+    elif isinstance(expression, cp.CpoFunctionCall) or (isinstance(expression, cp.CpoValue) and expression.children):
+        operands = [getCanonicalForm(child, canonicalForms) for child in expression.children]
+        form = buildCanonicalForm(expression, [operandForm for operandForm, operandIds in operands])
+        variableIds = frozenset().union(*(operandIds for operandForm, operandIds in operands))
+    elif isinstance(expression, cp.CpoValue) and isinstance(expression.value, (int, float, str, bool)):
+        form, variableIds = ("value", expression.value), frozenset()
+    else:
+        # i.e. a calendar function, shared by all expressions using it (see calendars.py), or an array of constants
+        form, variableIds = ("object", repr(expression.value) if isinstance(expression, cp.CpoValue) else id(expression)), frozenset()
+    canonicalForms[id(expression)] = (expression, form, variableIds)
+    return form, variableIds
+
+def buildCanonicalForm(expression, operandForms):
+    """
+    Function returning the form of an operation or of an array from the forms of its operands (see getCanonicalForm).
+
+    :param expression: (CpoFunctionCall or CpoValue) operation or array
+    :param operandForms: (list) forms of the children of the expression
+    :return: (tuple) form
+    """
+    if isinstance(expression, cp.CpoValue):
+        return ("array",) + tuple(operandForms)
+    operation = expression.operation.cpo_name
+    if operation in SET_OPERATIONS:
+        operandForms = [("array",) + tuple(sorted(operandForm[1:], key=repr)) if operandForm[0] == "array" else operandForm for operandForm in operandForms]
+    if operation in COMMUTATIVE_OPERATIONS and len(operandForms) == 2:
+        operandForms = sorted(operandForms, key=repr)
+    return (operation,) + tuple(operandForms)
+
+def getPermutedForm(expression, permutation, canonicalForms):
+    """
+    Function returning the form of an expression in which the variables are replaced by their images by a permutation (see getCanonicalForm).
+
+    :param expression: (CpoExpr or value) expression
+    :param permutation: (dict) key = id of a variable, value = id of its image (variables not in the dictionary are unchanged)
+    :param canonicalForms: (dict) forms of the expressions without permutation (see getCanonicalForm),
+                           and key = (id of an array, "elements"), value = (dict) key = id of a variable, value = (dict) elements of the array with this variable
+    :return: (tuple) form
+    """
+    form, variableIds = getCanonicalForm(expression, canonicalForms)
+    if variableIds.isdisjoint(permutation):
+        return form
+    if isinstance(expression, cp.CpoVariable):
+        return ("variable", permutation[id(expression)])
+    if isinstance(expression, cp.CpoFunctionCall) and expression.operation.cpo_name in SET_OPERATIONS:
+        # the form is unchanged if the permutation only exchanges elements of its arrays (i.e. two interval variables of the same no_overlap)
+        for child in expression.children:
+            if getCanonicalForm(child, canonicalForms)[1].isdisjoint(permutation):
+                continue
+            if not (isinstance(child, cp.CpoValue) and child.children):
+                break
+            # elements of the array with each variable, built once per array
+            elementsOfVariables = canonicalForms.get((id(child), "elements"))
+            if elementsOfVariables is None:
+                elementsOfVariables = canonicalForms[(id(child), "elements")] = {}
+                for element in child.children:
+                    for variableId in getCanonicalForm(element, canonicalForms)[1]:
+                        elementsOfVariables.setdefault(variableId, {})[id(element)] = element
+            touchedElements = list({id(element): element for variableId in permutation
+                                    for element in elementsOfVariables.get(variableId, {}).values()}.values())
+            if collections.Counter(getCanonicalForm(element, canonicalForms)[0] for element in touchedElements) != \
+                    collections.Counter(getPermutedForm(element, permutation, canonicalForms) for element in touchedElements):
+                break
+        else:
+            return form
+    return buildCanonicalForm(expression, [getPermutedForm(child, permutation, canonicalForms) for child in expression.children])
+
+def breakSymmetries(model, listOfLessonDicts, listOfEntityIntervalVariables, constants):
+    """
+    Function detecting interchangeable lessons and divisions in a model and adding ordering constraints between them.
+    Must be called once the model is complete (constraints and objective) : a constraint added later may not be symmetric.
+    Candidates have the same domains and, except for divisions, the same resources (see listOfEntityIntervalVariables) :
+        - lessons of the same division of an AA
+        - divisions of an AA, lesson by lesson (each division has its own groups : exchanging them also exchanges their no_overlap)
+        - lessons of an AA with the same index in all divisions, exchanged in all divisions at once (only if the AA has no other symmetry)
+    A candidate permutation is a symmetry if it maps every expression of the model on an expression of the model (see getPermutedForm) :
+    i.e. lessons with different segment bounds, already ordered or placed by another constraint (fixedSlots, simultaneousGroups, ...) are not interchangeable.
+    In each class of interchangeable lessons, the lessons are ordered by index (in the first division for lessons of all divisions).
+    In each class of interchangeable divisions, the first lessons are ordered by division.
+    Both can be combined : permuting divisions keeps the order of the lessons of each division.
+    An ordering is an end_before_start when both lessons are in the same no_overlap (they can not start together), a start_of inequality otherwise.
+
+    :param model: (CpoModel) model, complete
+    :param listOfLessonDicts: (list) lessonDicts (see variables.py) in which symmetries are searched
+    :param listOfEntityIntervalVariables: (list) dictionaries of the resources (groups, teachers, rooms) with key = resource name, value = (list) interval variables
+    :param constants: (dict) constants of the model
+    """
+    global _symmetryStatistics
+    _symmetryStatistics = {"lessonClasses": 0, "divisionClasses": 0, "constraints": 0}
+
+    resourcesOfVariables = {}
+    for kind, entityIntervalVariables in enumerate(listOfEntityIntervalVariables):
+        for entity, intervalVariables in entityIntervalVariables.items():
+            for intervalVariable in intervalVariables:
+                resourcesOfVariables.setdefault(id(intervalVariable), set()).add((kind, entity))
+
+    def getSignature(intervalVariable, withResources=True):
+        resources = frozenset(resourcesOfVariables.get(id(intervalVariable), ())) if withResources else None
+        return (resources, intervalVariable.get_start(), intervalVariable.get_end(), intervalVariable.get_size())
+
+    # canonical forms of the expressions of the model, and expressions of each variable
+    expressions = [expression for expression, location in model.get_all_expressions()]
+    canonicalForms = {}
+    canonicalExpressions = set()
+    expressionsOfVariables = {}
+    noOverlapsOfVariables = {}
+    for i, expression in enumerate(expressions):
+        form, variableIds = getCanonicalForm(expression, canonicalForms)
+        canonicalExpressions.add(form)
+        for variableId in variableIds:
+            expressionsOfVariables.setdefault(variableId, []).append(i)
+            if isinstance(expression, cp.CpoFunctionCall) and expression.operation.cpo_name == "noOverlap":
+                noOverlapsOfVariables.setdefault(variableId, set()).add(i)
+
+    def isSymmetry(pairs):
+        # pairs of interval variables exchanged by the permutation
+        permutation = {}
+        for intervalVariable1, intervalVariable2 in pairs:
+            permutation[id(intervalVariable1)] = id(intervalVariable2)
+            permutation[id(intervalVariable2)] = id(intervalVariable1)
+        touchedExpressions = {i for variableId in permutation for i in expressionsOfVariables.get(variableId, ())}
+        for i in touchedExpressions:
+            form = getPermutedForm(expressions[i], permutation, canonicalForms)
+            if form is not canonicalForms[id(expressions[i])][1] and form not in canonicalExpressions:
+                return False
+        return True
+
+    def getClasses(candidates, getPairs):
+        # a candidate joins the first class whose first member it can be exchanged with : exchanges with a common member generate all permutations of the class
+        classes = []
+        for candidate in candidates:
+            for candidateClass in classes:
+                if isSymmetry(getPairs(candidateClass[0], candidate)):
+                    candidateClass.append(candidate)
+                    break
+            else:
+                classes.append([candidate])
+        return [candidateClass for candidateClass in classes if len(candidateClass) > 1]
+
+    def addOrdering(intervalVariable1, intervalVariable2):
+        if noOverlapsOfVariables.get(id(intervalVariable1), set()) & noOverlapsOfVariables.get(id(intervalVariable2), set()):
+            model.add(cp.end_before_start(intervalVariable1, intervalVariable2))
+        else:
+            model.add(cp.start_of(intervalVariable1) <= cp.start_of(intervalVariable2))
+        _symmetryStatistics["constraints"] += 1
+
+    orderings = []
+    for lessonDict in listOfLessonDicts:
+        for AA in lessonDict.values():
+            numberOfOrderings = len(orderings)
+            # lessons of a division
+            for variablesOfDivision in AA["divisions"]:
+                candidatesOfSignatures = {}
+                for intervalVariable in variablesOfDivision:
+                    candidatesOfSignatures.setdefault(getSignature(intervalVariable), []).append(intervalVariable)
+                for candidates in candidatesOfSignatures.values():
+                    for lessonClass in getClasses(candidates, lambda intervalVariable1, intervalVariable2: [(intervalVariable1, intervalVariable2)]):
+                        _symmetryStatistics["lessonClasses"] += 1
+                        orderings.extend(zip(lessonClass, lessonClass[1:]))
+
+            # divisions of the AA
+            candidatesOfSignatures = {}
+            for variablesOfDivision in AA["divisions"]:
+                if variablesOfDivision:
+                    candidatesOfSignatures.setdefault(tuple(getSignature(intervalVariable, False) for intervalVariable in variablesOfDivision), []).append(variablesOfDivision)
+            for candidates in candidatesOfSignatures.values():
+                for divisionClass in getClasses(candidates, lambda division1, division2: list(zip(division1, division2))):
+                    _symmetryStatistics["divisionClasses"] += 1
+                    orderings.extend((division1[0], division2[0]) for division1, division2 in zip(divisionClass, divisionClass[1:]))
+
+            # lessons of all divisions at once (i.e. divisions synchronized lesson by lesson) : only if no other symmetry of the AA is broken,
+            # the lessons of the first division being ordered
+            if len(orderings) == numberOfOrderings and len(AA["divisions"]) > 1 and len({len(variablesOfDivision) for variablesOfDivision in AA["divisions"]}) == 1:
+                candidatesOfSignatures = {}
+                for j in range(len(AA["divisions"][0])):
+                    candidatesOfSignatures.setdefault(tuple(getSignature(variablesOfDivision[j]) for variablesOfDivision in AA["divisions"]), []).append(j)
+                for candidates in candidatesOfSignatures.values():
+                    for indexClass in getClasses(candidates, lambda j1, j2: [(variablesOfDivision[j1], variablesOfDivision[j2]) for variablesOfDivision in AA["divisions"]]):
+                        _symmetryStatistics["lessonClasses"] += 1
+                        orderings.extend((AA["divisions"][0][j1], AA["divisions"][0][j2]) for j1, j2 in zip(indexClass, indexClass[1:]))
+
+    # constraints are added once all symmetries are detected on the model without them
+    for intervalVariable1, intervalVariable2 in orderings:
+        addOrdering(intervalVariable1, intervalVariable2)
+
+def getSymmetryStatistics():
+    """
+    Function returning the counters of the last call to breakSymmetries (see _symmetryStatistics).
+
+    :return: (dict) copy of the counters
+    """
+    return dict(_symmetryStatistics)
+
+def getPrecedenceTerm(expression):
+    """
+    Function reading an operand of a static precedence : start_of/end_of of a present interval variable with a fixed size,
+    plus or minus a constant, or an integer constant.
+    The end of an interval variable is its start plus its size : every term is a start plus a constant.
+
+    :param expression: (CpoExpr) operand
+    :return: (tuple) (interval variable or None for a constant, constant added to its start), None if the operand is not such a term
+    """
+    if isinstance(expression, cp.CpoValue):
+        return (None, expression.value) if isinstance(expression.value, int) else None
+    if not isinstance(expression, cp.CpoFunctionCall):
+        return None
+    name = expression.operation.cpo_name
+    if name in ("startOf", "endOf") and len(expression.children) == 1:
+        return getPointTerm(expression.children[0], "start" if name == "startOf" else "end")
+    if name in ("plus", "minus") and len(expression.children) == 2:
+        left, right = getPrecedenceTerm(expression.children[0]), getPrecedenceTerm(expression.children[1])
+        if left is None or right is None:
+            return None
+        if name == "minus":
+            # only a constant can be subtracted : the difference of two starts is not a start
+            return (left[0], left[1] - right[1]) if right[0] is None else None
+        if left[0] is not None and right[0] is not None:
+            return None
+        return (left[0] if left[0] is not None else right[0], left[1] + right[1])
+    return None
+
+def getPointTerm(intervalVariable, point):
+    """
+    Function returning the term (see getPrecedenceTerm) of the start or the end of an interval variable.
+
+    :param intervalVariable: (CpoExpr) interval variable
+    :param point: (string) "start" or "end"
+    :return: (tuple) (interval variable, constant added to its start), None if it is not a present interval variable with a fixed size
+    """
+    if not isinstance(intervalVariable, cp.CpoIntervalVar) or not intervalVariable.is_present():
+        return None
+    size = intervalVariable.get_size()
+    if size[0] != size[1]:
+        return None
+    return (intervalVariable, 0 if point == "start" else size[0])
+
+def getStaticPrecedences(expression):
+    """
+    Function converting a constraint posted at the top level of a model into inequalities between terms (see getPrecedenceTerm).
+    A conjunction gives the inequalities of its operands. A disjunction or any other constraint gives nothing : only what holds in every solution is read.
+
+    :param expression: (CpoExpr) constraint of the model
+    :return: (list) (left term, right term) for each inequality left <= right
+    """
+    if not isinstance(expression, cp.CpoFunctionCall):
+        return []
+    name = expression.operation.cpo_name
+    children = expression.children
+    if name == "&&":
+        return [inequality for child in children for inequality in getStaticPrecedences(child)]
+
+    if name in PRECEDENCE_OPERATIONS and len(children) in (2, 3):
+        firstPoint, secondPoint, isEquality = PRECEDENCE_OPERATIONS[name]
+        delay = getPrecedenceTerm(children[2]) if len(children) == 3 else (None, 0)
+        left, right = getPointTerm(children[0], firstPoint), getPointTerm(children[1], secondPoint)
+        if left is None or right is None or delay is None or delay[0] is not None:
+            return []
+        left = (left[0], left[1] + delay[1])
+    elif name in COMPARISON_OPERATIONS and len(children) == 2:
+        isSwapped, margin, isEquality = COMPARISON_OPERATIONS[name]
+        left, right = getPrecedenceTerm(children[0]), getPrecedenceTerm(children[1])
+        if left is None or right is None:
+            return []
+        if isSwapped:
+            left, right = right, left
+        left = (left[0], left[1] + margin)
+    else:
+        return []
+    return [(left, right), (right, left)] if isEquality else [(left, right)]
+
+def getInfeasibleChain(index, names, sources, destinations, predecessors, successors, earliestStarts, latestStarts):
+    """
+    Function describing the chain of precedences making the window of an interval variable empty :
+    the arcs which raised its earliest start (from the interval variable whose earliest start is its own bound)
+    followed by the arcs which lowered its latest start (to the interval variable whose latest start is its own bound).
+
+    :param index: (integer) index of the interval variable with earliest start > latest start
+    :param names: (list) names of the interval variables, by index
+    :param sources, destinations: (numpy.ndarray) arcs of the precedence graph
+    :param predecessors, successors: (numpy.ndarray) per interval variable, last arc which raised its earliest start / lowered its latest start, -1 if none
+    :param earliestStarts, latestStarts: (numpy.ndarray) windows of the interval variables
+    :return: (tuple) indexes of the interval variables of the chain, (string) description of the chain
+    """
+    # a cycle of positive weight is followed once
+    chain = [index]
+    while predecessors[chain[0]] >= 0 and int(sources[predecessors[chain[0]]]) not in chain:
+        chain.insert(0, int(sources[predecessors[chain[0]]]))
+    while successors[chain[-1]] >= 0 and int(destinations[successors[chain[-1]]]) not in chain:
+        chain.append(int(destinations[successors[chain[-1]]]))
+    labels = [names[i] for i in chain]
+    if len(chain) == 1:
+        labels[0] += " (earliest start " + str(earliestStarts[index]) + ", latest start " + str(latestStarts[index]) + ")"
+    else:
+        labels[0] += " (earliest start " + str(earliestStarts[chain[0]]) + ")"
+        labels[-1] += " (latest start " + str(latestStarts[chain[-1]]) + ")"
+    return tuple(chain), " -> ".join(labels) + " : " + names[index] + " can not start in [" + str(earliestStarts[index]) + ", " + str(latestStarts[index]) + "]"
+
+def getPositiveCycle(arc, sources, destinations, arcsOfVariables, isForward):
+    """
+    Function returning a cycle of positive weight of the precedence graph, once the passes of propagatePrecedences no longer converge.
+    The arcs which last changed the windows are followed back from an arc of the last pass until an interval variable repeats.
+
+    :param arc: (integer) arc which improved a window in the last pass
+    :param sources, destinations: (numpy.ndarray) arcs of the precedence graph
+    :param arcsOfVariables: (numpy.ndarray) per interval variable, last arc which raised its earliest start (isForward) or lowered its latest start, -1 if none
+    :param isForward: (boolean) True if the earliest starts were propagated, False for the latest starts
+    :return: (list) indexes of the interval variables of the cycle, in the order of the precedences (the first one is repeated at the end)
+    """
+    # forward, an arc raises the earliest start of its destination from its source (and conversely backward)
+    following, preceding = (sources, destinations) if isForward else (destinations, sources)
+    index = int(preceding[arc])
+    visited = []
+    while index not in visited and arcsOfVariables[index] >= 0:
+        visited.append(index)
+        index = int(following[arcsOfVariables[index]])
+    cycle = visited[visited.index(index):] + [index] if index in visited else visited
+    return cycle[::-1] if isForward else cycle
+
+def propagatePrecedences(model, constants):
+    """
+    Function tightening the windows of the interval variables of a model with its static precedences, before solving.
+    Must be called once the model is complete : a constraint added later is not used.
+    The precedence graph has one node per interval variable and one arc s_b >= s_a + weight per static inequality between two starts
+    (end_before_start, start_at_start, start_of/end_of comparisons, ... see getStaticPrecedences), the other inequalities are bounds of a start.
+    The earliest start (longest path from the bounds) and the latest start (longest path to the bounds) of each interval variable are computed
+    by passes over all arcs at once (NumPy) until no window changes : an acyclic graph needs one pass per level of its topological order,
+    and the cycles of equalities (start_at_start) are supported.
+    As in Bellman-Ford, a path without cycle has less arcs than interval variables : the passes are limited to the number of interval variables,
+    and an arc still improving a window after them reveals a cycle of positive weight (whatever the size of the domains).
+    If every window is consistent, each window narrower than the domain and the bounds of the model is added as start_of bounds, which CP Optimizer
+    moves in the domain at presolve : the domains themselves are never changed, as interval variables are shared by the models of all builds (see _builtAAs in variables.py).
+    Otherwise nothing is changed and the offending chains (empty windows or cycles of positive weight) are returned.
+
+    :param model: (CpoModel) model, complete
+    :param constants: (dict) constants of the model
+    :return: (list) description of each chain of precedences making the window of an interval variable empty (see getInfeasibleChain), empty if none
+    """
+    global _precedenceStatistics
+    _precedenceStatistics = {"variables": 0, "precedences": 0, "bounds": 0, "passes": 0, "tightened": 0, "constraints": 0, "removedStarts": 0, "infeasible": []}
+
+    indexesOfVariables = {}
+    intervalVariables = []
+    arcs = []
+    lowerBounds = []
+    upperBounds = []
+
+    def getIndex(intervalVariable):
+        index = indexesOfVariables.get(id(intervalVariable))
+        if index is None:
+            index = indexesOfVariables[id(intervalVariable)] = len(intervalVariables)
+            intervalVariables.append(intervalVariable)
+        return index
+
+    # each inequality left <= right : variable + constant <= variable + constant
+    for expression, location in model.get_all_expressions():
+        for (leftVariable, leftConstant), (rightVariable, rightConstant) in getStaticPrecedences(expression):
+            if leftVariable is not None and rightVariable is not None:
+                arcs.append((getIndex(leftVariable), getIndex(rightVariable), leftConstant - rightConstant))
+            elif leftVariable is not None:
+                upperBounds.append((getIndex(leftVariable), rightConstant - leftConstant))
+            elif rightVariable is not None:
+                lowerBounds.append((getIndex(rightVariable), leftConstant - rightConstant))
+
+    numberOfVariables = len(intervalVariables)
+    _precedenceStatistics.update(variables=numberOfVariables, precedences=len(arcs), bounds=len(lowerBounds) + len(upperBounds))
+    if numberOfVariables == 0:
+        return []
+
+    # initial windows : domains of the interval variables, then constant bounds of the model
+    sizes = np.array([intervalVariable.get_size()[0] for intervalVariable in intervalVariables], dtype=np.int64)
+    domainStarts = np.array([intervalVariable.get_start() for intervalVariable in intervalVariables], dtype=np.int64).reshape(-1, 2)
+    domainEnds = np.array([intervalVariable.get_end() for intervalVariable in intervalVariables], dtype=np.int64).reshape(-1, 2)
+    earliestStarts = np.maximum(domainStarts[:, 0], domainEnds[:, 0] - sizes)
+    latestStarts = np.minimum(domainStarts[:, 1], domainEnds[:, 1] - sizes)
+    if lowerBounds:
+        indexes, values = np.array(lowerBounds, dtype=np.int64).T
+        np.maximum.at(earliestStarts, indexes, values)
+    if upperBounds:
+        indexes, values = np.array(upperBounds, dtype=np.int64).T
+        np.minimum.at(latestStarts, indexes, values)
+    initialStarts = (earliestStarts.copy(), latestStarts.copy())
+
+    sources, destinations, weights = np.array(arcs, dtype=np.int64).reshape(-1, 3).T
+    predecessors = np.full(numberOfVariables, -1, dtype=np.int64)
+    successors = np.full(numberOfVariables, -1, dtype=np.int64)
+
+    # earliest starts, then latest starts : the propagation stops as soon as a window is empty
+    improved = np.zeros(len(sources), dtype=bool)
+    for isForward in (True, False):
+        for numberOfPasses in range(numberOfVariables):
+            if not len(sources) or (earliestStarts > latestStarts).any():
+                break
+            _precedenceStatistics["passes"] += 1
+            if isForward:
+                candidates = earliestStarts[sources] + weights
+                newStarts = earliestStarts.copy()
+                np.maximum.at(newStarts, destinations, candidates)
+                improved = (candidates > earliestStarts[destinations]) & (candidates == newStarts[destinations])
+                predecessors[destinations[improved]] = np.flatnonzero(improved)
+                earliestStarts = newStarts
+            else:
+                candidates = latestStarts[destinations] - weights
+                newStarts = latestStarts.copy()
+                np.minimum.at(newStarts, sources, candidates)
+                improved = (candidates < latestStarts[sources]) & (candidates == newStarts[sources])
+                successors[sources[improved]] = np.flatnonzero(improved)
+                latestStarts = newStarts
+            if not improved.any():
+                break
+        # the last pass still improves a window : some arcs form a cycle of positive weight
+        if improved.any() and not (earliestStarts > latestStarts).any():
+            names = [intervalVariable.get_name() for intervalVariable in intervalVariables]
+            cycle = getPositiveCycle(int(np.flatnonzero(improved)[0]), sources, destinations, predecessors if isForward else successors, isForward)
+            _precedenceStatistics["infeasible"] = ["cycle of precedences of positive weight : " + " -> ".join(names[i] for i in cycle)]
+            return list(_precedenceStatistics["infeasible"])
+
+    infeasibleIndexes = np.flatnonzero(earliestStarts > latestStarts)
+    if len(infeasibleIndexes):
+        names = [intervalVariable.get_name() for intervalVariable in intervalVariables]
+        chains = {}
+        for index in infeasibleIndexes.tolist():
+            chain, description = getInfeasibleChain(index, names, sources, destinations, predecessors, successors,
+                                                    earliestStarts.tolist(), latestStarts.tolist())
+            chains.setdefault(chain, description)
+        _precedenceStatistics["infeasible"] = list(chains.values())
+        return list(chains.values())
+
+    # only the bounds changed by the precedences are added
+    for index in np.flatnonzero(earliestStarts > initialStarts[0]).tolist():
+        model.add(cp.start_of(intervalVariables[index]) >= int(earliestStarts[index]))
+        _precedenceStatistics["constraints"] += 1
+    for index in np.flatnonzero(latestStarts < initialStarts[1]).tolist():
+        model.add(cp.start_of(intervalVariables[index]) <= int(latestStarts[index]))
+        _precedenceStatistics["constraints"] += 1
+    tightenedIndexes = np.flatnonzero((earliestStarts > initialStarts[0]) | (latestStarts < initialStarts[1]))
+    _precedenceStatistics["tightened"] = len(tightenedIndexes)
+    _precedenceStatistics["removedStarts"] = int(((initialStarts[1] - initialStarts[0]) - (latestStarts - earliestStarts))[tightenedIndexes].sum())
+    return []
+
+def getPrecedenceStatistics():
+    """
+    Function returning the result of the last call to propagatePrecedences (see _precedenceStatistics).
 
+    :return: (dict) copy of the result
+    """
+    return dict(_precedenceStatistics, infeasible=list(_precedenceStatistics["infeasible"]))
 
 
 #Partie Projet Horaire
 def spreadOverWeek(model, weekDict, constants):
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
     for weeks in weekDict:
         week = list(weeks.keys())[0]
         AAlist = weeks[week]
@@ -316,12 +1235,11 @@ def spreadOverWeek(model, weekDict, constants):
                     if AA["subject"].split(":")[1] == "theory" or AA["subject"].split(":")[1] == "theory_exercise" or AA["subject"].split(":")[1] == "mixed":
                         # cp.interval_var creates one interval variable
                         IntervalVariable = cp.interval_var(start=(
-                        weeknumber * constants["days"] * constants["slots"],
-                        (weeknumber + 1) * constants["days"] * constants["slots"] - 1),
+                        timeGrid.getSegmentStart(weeknumber),
+                        timeGrid.getSegmentStart(weeknumber + 1) - 1),
                                                                    end=(
-                                                                   weeknumber * constants["days"] * constants["slots"] + 1,
-                                                                   (weeknumber + 1) * constants["days"] * constants[
-                                                                       "slots"]),
+                                                                   timeGrid.getSegmentStart(weeknumber) + 1,
+                                                                   timeGrid.getSegmentStart(weeknumber + 1)),
                                                                    # the first end time for an exercise interval variable is "1"
                                                                    size=1,  # the size of an exercise interval variable is 1
                                                                    length=1,
@@ -332,12 +1250,11 @@ def spreadOverWeek(model, weekDict, constants):
                     elif AA["subject"].split(":")[1] == "exercise":
                         # cp.interval_var creates one interval variable
                         IntervalVariable = cp.interval_var(start=(
-                        weeknumber * constants["days"] * constants["slots"],
-                        (weeknumber + 1) * constants["days"] * constants["slots"] - 1),
+                        timeGrid.getSegmentStart(weeknumber),
+                        timeGrid.getSegmentStart(weeknumber + 1) - 1),
                                                                    end=(
-                                                                   weeknumber * constants["days"] * constants["slots"] + 1,
-                                                                   (weeknumber + 1) * constants["days"] * constants[
-                                                                       "slots"]),
+                                                                   timeGrid.getSegmentStart(weeknumber) + 1,
+                                                                   timeGrid.getSegmentStart(weeknumber + 1)),
                                                                    # the first end time for an exercise interval variable is "1"
                                                                    size=1,  # the size of an exercise interval variable is 1
                                                                    length=1,
@@ -348,12 +1265,11 @@ def spreadOverWeek(model, weekDict, constants):
                     elif AA["subject"].split(":")[1] == "TP":
                         # cp.interval_var creates one interval variable
                         IntervalVariable = cp.interval_var(start=(
-                        weeknumber * constants["days"] * constants["slots"],
-                        (weeknumber + 1) * constants["days"] * constants["slots"] - 2),
+                        timeGrid.getSegmentStart(weeknumber),
+                        timeGrid.getSegmentStart(weeknumber + 1) - 2),
                                                                    end=(
-                                                                   weeknumber * constants["days"] * constants["slots"] + 2,
-                                                                   (weeknumber + 1) * constants["days"] * constants[
-                                                                       "slots"]),
+                                                                   timeGrid.getSegmentStart(weeknumber) + 2,
+                                                                   timeGrid.getSegmentStart(weeknumber + 1)),
                                                                    # the first end time for an exercise interval variable is "1"
                                                                    size=2,  # the size of an exercise interval variable is 1
                                                                    length=2,
@@ -366,8 +1282,8 @@ def spreadOverWeek(model, weekDict, constants):
                         print("Missing : ",AA["subject"].split(":")[1])
 
 
-                    model.add(cp.start_of(IntervalVariable) >= weeknumber * constants["days"] * constants["slots"] + 1)
-                    model.add(cp.start_of(IntervalVariable) <= (weeknumber+1) * constants["days"] * constants["slots"])
+                    model.add(cp.start_of(IntervalVariable) >= timeGrid.getSegmentStart(weeknumber) + 1)
+                    model.add(cp.start_of(IntervalVariable) <= timeGrid.getSegmentStart(weeknumber+1))
 
 
 
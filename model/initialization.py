@@ -1,5 +1,5 @@
-import math
 import docplex.cp.model as cp
+import TimeGrid as TFEtimeGrid
 
 def simultaneousGroups(model, AAdict1, AAdict2):
     numberOfDivisions1 = len(AAdict1["divisions"])
@@ -14,10 +14,10 @@ def simultaneousGroups(model, AAdict1, AAdict2):
 
 def fixedSlots(model, AAdict, fixedDay, fixedSlot, constants):
     numberOfIntervalVariables = len(AAdict["divisions"][0])
-    startWeek = math.floor((AAdict["weekBounds"][0] - 1) / constants["segmentSize"])
-    endWeek = math.ceil(AAdict["weekBounds"][1] / constants["segmentSize"])
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
+    startWeek, endWeek = timeGrid.getModelSegmentBounds(AAdict["weekBounds"])
     if endWeek - startWeek == numberOfIntervalVariables and 1 <= fixedDay <= constants["days"] and 1 <= fixedSlot <= constants["slots"]:
         for index,intervalVariable in enumerate(AAdict["divisions"][0]):
-            model.add(cp.start_of(intervalVariable) == index * constants["days"] * constants["slots"] + (fixedDay - 1) * constants["slots"] + fixedSlot - 1)
+            model.add(cp.start_of(intervalVariable) == timeGrid.getSegmentStart(index) + (fixedDay - 1) * timeGrid.slots + fixedSlot - 1)
     else:
         print("The AA doesn't match (incorrect number of interval variables or incorrect day/slot).")
\ No newline at end of file
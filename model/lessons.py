@@ -0,0 +1,490 @@
+import CursusGroups as TFEcursusGroups
+import data.io as TFEdata
+import TimeGrid as TFEtimeGrid
+import math
+
+"""
+Lessons of the model described without any docplex object.
+Counting lessons, validating a dataset or reading an old solution only needs the LessonSpecs of this file :
+interval variables are created from them (see materializeLessonSpecs in /model/variables.py) only when a model is solved.
+"""
+
+"""
+Lesson types of the model, in the order of the lessonDicts (lecturesDict, exercisesDict, tpsDict, projectsDict).
+The lessons of a type (see generateAALessonSpecs) and their interval variables (see /model/variables.py) are built from its entry :
+a new lesson type is a new entry.
+
+LESSON_TYPES = tuple of dictionaries with :
+    - "name" : (string) prefix of the columns of the "TFE" sheet (i.e. "lecture" for "lectureHours", "lectureWeekStart", ...)
+    - "suffix" : (string) suffix of the names of the interval variables (i.e. "I-XXX-000_lec_2")
+    - "size" : (integer) size and length of an interval variable (1 unit of time = 2 hours)
+    - "duration" : (string) column holding the duration of a lesson in hours, None for lessons of 2 hours
+    - "divisions" : (string) column holding the number of divisions, None if all the groups follow the same lessons
+    - "split" : (string) column holding the number of teachers and rooms per division (see splitResources), None if all of them are planned
+    - "teachers", "rooms" : (string) field of the AARecord holding the teacher and room ids (see /data/io.py), None if there is no such resource
+    - "placingTypes" : (tuple) types of the lessons of the Opti assignation built as this lesson type (see generateIntervalVariablesForCPplacing in /model/variables.py)
+"""
+LESSON_TYPES = (
+    {"name": "lecture", "suffix": "_lec", "size": 1, "duration": None, "divisions": None, "split": None,
+     "teachers": "lectureTeacherIds", "rooms": "lectureRoomIds", "placingTypes": ("theory", "theory_exercise", "mixed")},
+    {"name": "exercise", "suffix": "_ex", "size": 1, "duration": None, "divisions": "exerciseDivisions", "split": "exerciseSplit",
+     "teachers": "exerciseTeacherIds", "rooms": "exerciseRoomIds", "placingTypes": ("exercise",)},
+    {"name": "tp", "suffix": "_tp", "size": 2, "duration": "tpDuration", "divisions": "tpDivisions", "split": None,
+     "teachers": "tpTeacherIds", "rooms": "tpRoomIds", "placingTypes": ("TP",)},
+    {"name": "project", "suffix": "_pr", "size": 2, "duration": "projectDuration", "divisions": None, "split": None,
+     "teachers": "projectTeacherIds", "rooms": None, "placingTypes": ("project",)},
+)
+
+
+class LessonSpec:
+    """
+    Class describing one lesson of the model, i.e. one interval variable not created yet.
+
+    self.AA = (string) AA code
+    self.lessonType = (string) name of the lesson type (see LESSON_TYPES)
+    self.index = (integer) index of the lesson in its division
+    self.division = (integer) index of the division of the lesson
+    self.domain = (tuple) (first slot, last slot + 1) in which the lesson must be placed
+    self.size = (integer) size and length of the lesson
+    self.name = (string) name of the interval variable (i.e. "I-XXX-000_ex_2_d_0")
+    self.groupIds, self.teacherIds, self.roomIds = (tuple) ids of the groups, teachers and rooms needed by the lesson (see EntityRegistry in /data/io.py)
+
+    The lessons of a division share their tuples of resource ids, and their domain unless the domains are folded (see getLessonDomains).
+    """
+    __slots__ = ("AA", "lessonType", "index", "division", "domain", "size", "name", "groupIds", "teacherIds", "roomIds")
+
+    def __init__(self, AA, lessonType, index, division, domain, size, name, groupIds, teacherIds, roomIds):
+        """
+        Constructor of LessonSpec class (see the class for the meaning of each parameter)
+        """
+        self.AA = AA
+        self.lessonType = lessonType
+        self.index = index
+        self.division = division
+        self.domain = domain
+        self.size = size
+        self.name = name
+        self.groupIds = groupIds
+        self.teacherIds = teacherIds
+        self.roomIds = roomIds
+
+def generateLessonSpecs(constants):
+    """
+    Function building the lessons of all the AAs of the model, without creating any interval variable.
+    The AAs are the same as in generateIntervalVariables (see /model/variables.py).
+
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables in /model/variables.py)
+    :return: (dict) dictionary with :
+        - "AAs" : (dict) key = AA code, value = lessons of the AA (see generateAALessonSpecs), in the order of the dataset
+        - "cursusGroups" : (CursusGroups) object with information about groups and divisions
+        - "delta" : (integer) number of added/deleted lessons in order to fit weeks in segments
+    """
+    cursusGroups = TFEcursusGroups.CursusGroups(constants["fileDataset"])
+    groupIdsOfCursus = TFEdata.loadGroupIdsOfCursus(constants["fileDataset"])
+    totalSlots = TFEtimeGrid.getTimeGrid(constants).totalSlots
+
+    datasetAA = TFEdata.selectAARecords(constants["fileDataset"], constants["quadri"],
+                                        [cursus for cursus, isSelected in constants["cursus"].items() if isSelected is True],
+                                        constants.get("teachers"), constants.get("rooms"))
+    AAs = {}
+    delta = 0
+    for rowAA in datasetAA:
+        # an AA is built once, even if the dataset has several lines for it
+        if rowAA.id not in AAs:
+            AAs[rowAA.id] = generateAALessonSpecs(rowAA, constants, cursusGroups, groupIdsOfCursus, totalSlots)
+            delta += AAs[rowAA.id]["delta"]
+
+    return {"AAs": AAs, "cursusGroups": cursusGroups, "delta": delta}
+
+def iterateLessonSpecs(lessonSpecs):
+    """
+    Generator going through all the lessons built by generateLessonSpecs, AA by AA, then in the order of LESSON_TYPES and divisions.
+
+    :param lessonSpecs: (dict) lessons of the model (see generateLessonSpecs)
+    :return: (generator) LessonSpecs
+    """
+    for builtAA in lessonSpecs["AAs"].values():
+        for lessonDict in builtAA["lessons"]:
+            for AA in lessonDict.values():
+                for division in AA["divisions"]:
+                    yield from division
+
+def generateAALessonSpecs(rowAA, constants, cursusGroups, groupIdsOfCursus, totalSlots):
+    """
+    Function building the lessons of one AA, without creating any interval variable.
+    Every lesson type follows its entry of LESSON_TYPES.
+
+    :param rowAA: (AARecord) AA to build (see /data/io.py)
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables in /model/variables.py)
+    :param cursusGroups: (CursusGroups) object with information about groups and divisions
+    :param groupIdsOfCursus: (dict) group ids of each cursus id (see /data/io.py)
+    :param totalSlots: (integer) number of slots in the model
+    :return: (dict) dictionary with :
+        - "lessons" : (tuple) one dictionary per lesson type of LESSON_TYPES (empty if the AA has no such lesson) with :
+            - key = (string) AA code
+            - value = a dictionary with the same "weekBounds", "divisions" (LessonSpecs per division) and "cursus" keys as a lessonDict,
+                      and "resources" = (list) (groupIds, teacherIds, roomIds) per division
+        - "delta" : (integer) number of added/deleted lessons in order to fit weeks in segments
+    """
+    lessonDicts = tuple({} for spec in LESSON_TYPES)
+    registry = TFEdata.registry
+
+    # the "cursus" field in dataset contains all cursus following the AA (already split)
+    listOfCursus = list(rowAA.cursus)
+
+    # count the number of added/deleted lessons in order to fit weeks in segments
+    delta = 0
+
+    for spec, lessonDict in zip(LESSON_TYPES, lessonDicts):
+        # an AA has lessons of a type iff its "xHours" field in the dataset has a value (i.e. "lectureHours")
+        if getattr(rowAA, spec["name"] + "Hours") is None:
+            continue
+
+        # groupIdsOfDivision[d] = ids of the groups placed in the division d
+        if spec["divisions"] is None:
+            # since the lesson is given once, all the groups belong to the same and unique division
+            # groupIdsOfCursus gives the ids of all the groups of a cursus (same groups as cursusGroups.getGroups())
+            numberOfDivisions = 1
+            groupIdsOfDivision = [[group for cursus in rowAA.cursusIds for group in groupIdsOfCursus[cursus]]]
+        else:
+            # the following function generates balanced divisions (automatically or not depending on the boolean "constants["groupAuto"]")
+            # it first gets all groups in all cursus contained in "listOfCursus" and returns a dict with key = group ; value = index of division
+            # i.e. two divisions with the cursus "BA1" containing "BA1_A" and "BA1_B" groups, one in each division will result in :
+            # listOfDivisions = {"BA1_A": 0, "BA1_B": 1}
+            numberOfDivisions = getattr(rowAA, spec["divisions"])
+            listOfDivisions = cursusGroups.generateBalancedDivisions(listOfCursus, numberOfDivisions, constants["groupAuto"])
+            groupIdsOfDivision = [[] for d in range(numberOfDivisions)]
+            for group,divisionIndex in listOfDivisions.items():
+                groupIdsOfDivision[divisionIndex].append(registry.getId("group", group))
+
+        # computing the number of lessons in regards to the size of a segment (a multiplied lesson is counted once per division)
+        modelNumberOfLessons, lessonDelta = getNumberOfLessons(rowAA, spec, constants)
+        delta += lessonDelta * numberOfDivisions
+
+        listOfTeachers = getattr(rowAA, spec["teachers"]) if spec["teachers"] is not None else ()
+        listOfRooms = getattr(rowAA, spec["rooms"]) if spec["rooms"] is not None else ()
+        split = getattr(rowAA, spec["split"]) if spec["split"] is not None else 0
+
+        AALessons = lessonDict[rowAA.id] = {
+            "weekBounds": (getattr(rowAA, spec["name"] + "WeekStart"), getattr(rowAA, spec["name"] + "WeekEnd")),
+            "divisions": [],
+            "cursus": listOfCursus,
+            "resources": []
+        }
+
+        domains = getLessonDomains(AALessons["weekBounds"], modelNumberOfLessons, constants, totalSlots)
+
+        # each multiplied lesson is a LessonSpec
+        # i.e. for 6 exercises and 2 divisions, 12 lessons must be created, 6 for each division
+        for currentDivisionIndex in range(numberOfDivisions):
+            # a division without lesson has no teacher or room to split (see splitResources)
+            divisionSplit = split if modelNumberOfLessons != 0 else 0
+            resources = (tuple(groupIdsOfDivision[currentDivisionIndex]),
+                         tuple(splitResources(listOfTeachers, divisionSplit, currentDivisionIndex)),
+                         tuple(splitResources(listOfRooms, divisionSplit, currentDivisionIndex)))
+            AALessons["resources"].append(resources)
+
+            # the 3_rd lecture of I-XXX-000 will have the name "I-XXX-000_lec_2",
+            # the 3_rd exercise of I-XXX-000 in the 1_st division will have the name "I-XXX-000_ex_2_d_0"
+            divisionSuffix = "" if spec["divisions"] is None else "_d_" + str(currentDivisionIndex)
+            AALessons["divisions"].append([LessonSpec(rowAA.id, spec["name"], l, currentDivisionIndex, domain, spec["size"],
+                                                      rowAA.id + spec["suffix"] + "_" + str(l) + divisionSuffix, *resources)
+                                           for l, domain in enumerate(domains)])
+
+    return {"lessons": lessonDicts, "delta": delta}
+
+def hasFoldedDomains(weekBounds, constants):
+    """
+    Function indicating if the segment bounds of an AA are the domains of its lessons (see getLessonDomains) :
+    the constraints of these bounds are then not added (see /model/constraints.py).
+    Week bounds outside the model (i.e. week 0) are left to the constraints.
+
+    :param weekBounds: (tuple) (weekStart, weekEnd) of the AA
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables in /model/variables.py)
+    :return: (boolean) True if the domains are folded
+    """
+    if not constants.get("foldDomains") or not isinstance(weekBounds[0], int) or not isinstance(weekBounds[1], int):
+        return False
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
+    modelSegmentBounds = timeGrid.getModelSegmentBounds(weekBounds)
+    return 0 <= modelSegmentBounds[0] < modelSegmentBounds[1] <= timeGrid.numberOfSegments
+
+def getLessonDomains(weekBounds, numberOfLessons, constants, totalSlots):
+    """
+    Function computing the domain of each lesson of a division.
+
+    Without "constants["foldDomains"]", all lessons can be placed anywhere in the model : segment bounds are constraints (see /model/constraints.py).
+    With "constants["foldDomains"]" set to True, the static bounds of spreadIntervalVariablesOverSegments and segmentBoundsConstraint are the domains :
+        - a lesson of a full sequence is placed in its segment (the j_th lesson of a full sequence in the j_th segment of the AA)
+        - a lesson of the floating sequence is placed in the segments of the AA
+    i.e. 5 lessons in the segments 1 to 3 (weeks 4 to 12, segments of 3 weeks) : lessons 0, 1, 2 in segments 1, 2, 3 and lessons 3, 4 in segments 1 to 3
+
+    :param weekBounds: (tuple) (weekStart, weekEnd) of the AA
+    :param numberOfLessons: (integer) number of lessons of the division
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables in /model/variables.py)
+    :param totalSlots: (integer) number of slots in the model
+    :return: (list) (first slot, last slot + 1) of each lesson
+    """
+    if not hasFoldedDomains(weekBounds, constants):
+        return [(0, totalSlots)] * numberOfLessons
+
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
+    modelSegmentBounds = timeGrid.getModelSegmentBounds(weekBounds)
+    sizeOfFullSequence = modelSegmentBounds[1] - modelSegmentBounds[0]
+
+    numberOfFullSequences = math.trunc(numberOfLessons / sizeOfFullSequence)
+    floatingDomain = (timeGrid.getSegmentStart(modelSegmentBounds[0]), timeGrid.getSegmentStart(modelSegmentBounds[1]))
+    domains = []
+    for l in range(numberOfLessons):
+        if l < numberOfFullSequences * sizeOfFullSequence:
+            segment = modelSegmentBounds[0] + l % sizeOfFullSequence
+            domains.append((timeGrid.getSegmentStart(segment), timeGrid.getSegmentStart(segment + 1)))
+        else:
+            domains.append(floatingDomain)
+    return domains
+
+def getNumberOfLessons(rowAA, spec, constants):
+    """
+    Function computing the number of lessons of a lesson type of an AA in the model.
+
+    The true number of lessons is rounded up or down (depending on the boolean "constants["roundUp"]") in order to fit in segments
+    i.e. 7 lessons in segments of size 3 will be rounded to 9 lessons (rounded up) or 6 lessons (rounded down)
+
+    :param rowAA: (AARecord) AA (see /data/io.py)
+    :param spec: (dict) lesson type (see LESSON_TYPES)
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables)
+    :return: modelNumberOfLessons = (integer) number of interval variables per division and per segment,
+             delta = (integer) number of added (> 0) or deleted (< 0) lessons of one division
+    """
+    hours = getattr(rowAA, spec["name"] + "Hours")
+    if spec["duration"] is None:
+        # assumption : a lecture or an exercise lasts for 2 hours
+        trueNumberOfLessons = math.ceil(hours / 2)
+    else:
+        # a tp or a project lasts for 3 or 4 hours (i.e. rowAA.tpDuration)
+        trueNumberOfLessons = int(hours / getattr(rowAA, spec["duration"]))
+
+    if constants["roundUp"]:
+        modelNumberOfLessons = math.ceil(trueNumberOfLessons / constants["segmentSize"])
+    else:
+        modelNumberOfLessons = math.floor(trueNumberOfLessons / constants["segmentSize"])
+    return modelNumberOfLessons, modelNumberOfLessons * constants["segmentSize"] - trueNumberOfLessons
+
+def splitResources(resourceIds, split, divisionIndex):
+    """
+    Function returning the teachers or rooms planned for one division of a "split" lesson.
+
+    When a lesson must be "split", it means that only a subset of teachers and rooms are planned for each division
+    split = n : n teachers and n rooms per multiplied lesson, determined in a cyclic way
+    i.e. for 5 multiplied lessons, 4 rooms (R1, R2, R3, R4) and split = 2 :
+        - the subset R1,R2 will be planned for the first, third and fifth division
+        - the subset R3,R4 will be planned for the second and fourth division
+    split = 0 : no split (all teachers and rooms are planned for all divisions)
+
+    :param resourceIds: (tuple) ids of all the teachers (or rooms) of the lesson
+    :param split: (integer) number of teachers (or rooms) per division
+    :param divisionIndex: (integer) index of the division
+    :return: (tuple) ids of the teachers (or rooms) planned for the division
+    """
+    if split == 0:
+        return resourceIds
+    # numberSubsets = number of subsets of resources
+    numberSubsets = math.ceil(len(resourceIds) / split)
+    # sizeLastSubset = number of resources in the last subset
+    sizeLastSubset = len(resourceIds) % split if split != 1 else 1
+    # currentSubsetIndex = index of the subset of the division
+    currentSubsetIndex = divisionIndex % numberSubsets
+    # sizeCurrentSubset = number of resources in the current subset (= split or sizeLastSubset for the last subset)
+    sizeCurrentSubset = split if currentSubsetIndex != numberSubsets - 1 else sizeLastSubset
+    # currentSubsetIndex * split = shift to the current subset of resources
+    return resourceIds[currentSubsetIndex * split:currentSubsetIndex * split + sizeCurrentSubset]
+
+def mergeLessonSpecs(lessonSpecs):
+    """
+    Function gathering the lessons of all the AAs built by generateLessonSpecs in one dictionary per lesson type.
+    Each dictionary has the structure of a lessonDict (see generateIntervalVariables in /model/variables.py) with LessonSpecs instead of interval variables.
+
+    :param lessonSpecs: (dict) lessons of the model (see generateLessonSpecs)
+    :return: (tuple) one dictionary per lesson type of LESSON_TYPES
+    """
+    lessonDicts = tuple({} for spec in LESSON_TYPES)
+    for builtAA in lessonSpecs["AAs"].values():
+        for lessonDict, AALessonDict in zip(lessonDicts, builtAA["lessons"]):
+            lessonDict.update(AALessonDict)
+    return lessonDicts
+
+def countResourceLessons(lessonSpecs):
+    """
+    Function counting the lessons of each group, teacher and room, i.e. the sizes of the lists of
+    groupsIntervalVariables, teachersIntervalVariables and roomsIntervalVariables (see materializeAALessonSpecs in /model/variables.py).
+
+    :param lessonSpecs: (dict) lessons of the model (see generateLessonSpecs)
+    :return: (dict) key = kind of resource ("group", "teacher" or "room"), value = dictionary with key = resource name, value = (integer) number of lessons
+    """
+    countsById = {"group": {}, "teacher": {}, "room": {}}
+    for builtAA in lessonSpecs["AAs"].values():
+        for spec, lessonDict in zip(LESSON_TYPES, builtAA["lessons"]):
+            for AALessons in lessonDict.values():
+                for lessons, resources in zip(AALessons["divisions"], AALessons["resources"]):
+                    # same rule as the materialization : a lesson given once creates the entries of its resources even without lesson
+                    if not lessons and spec["divisions"] is not None:
+                        continue
+                    for kind, resourceIds in zip(("group", "teacher", "room"), resources):
+                        for resourceId in resourceIds:
+                            countsById[kind][resourceId] = countsById[kind].get(resourceId, 0) + len(lessons)
+
+    return {kind: {TFEdata.registry.getName(kind, resourceId): count for resourceId, count in counts.items()}
+            for kind, counts in countsById.items()}
+
+def getModelSegmentBounds(weekBounds, constants):
+    """
+    Function converting the week bounds of an AA in segment bounds, as the constraints do (see /model/constraints.py)
+
+    :param weekBounds: (tuple) (weekStart, weekEnd) of the AA
+    :param constants: (dict) dictionary with information about the model to build
+    :return: (tuple) (first segment, last segment + 1)
+    """
+    return TFEtimeGrid.getTimeGrid(constants).getModelSegmentBounds(weekBounds)
+
+def countSpreadScenarios(lessonDict, constants, errors):
+    """
+    Function counting the logical_or constraints and their scenarios added by spreadIntervalVariablesOverSegments (see /model/constraints.py)
+
+    :param lessonDict: (dict) lessons of one lesson type (see mergeLessonSpecs)
+    :param constants: (dict) dictionary with information about the model to build
+    :param errors: (list) messages of the AAs on which the constraint would fail, completed by this function
+    :return: (tuple) (number of logical_or, number of scenarios)
+    """
+    numberOfConstraints = 0
+    numberOfScenarios = 0
+    for idAA, AA in lessonDict.items():
+        for lessonsOfDivision in AA["divisions"]:
+            if not isinstance(AA["weekBounds"][0],int) and not isinstance(AA["weekBounds"][1],int):
+                continue
+            if not isinstance(AA["weekBounds"][0],int) or not isinstance(AA["weekBounds"][1],int):
+                errors.append("spreadIntervalVariablesOverSegments : " + idAA + " has the week bounds " + str(AA["weekBounds"]))
+                break
+            modelSegmentBounds = getModelSegmentBounds(AA["weekBounds"], constants)
+            sizeOfFullSequence = modelSegmentBounds[1] - modelSegmentBounds[0]
+            numberOfFullSequences = math.trunc(len(lessonsOfDivision) / sizeOfFullSequence)
+            sizeOfFloatingSequence = int(len(lessonsOfDivision) % sizeOfFullSequence)
+            # one scenario per position of the floating sequence in the segments of the AA
+            if sizeOfFloatingSequence != 0 and numberOfFullSequences != 0:
+                numberOfConstraints += 1
+                numberOfScenarios += sizeOfFullSequence - sizeOfFloatingSequence + 1
+    return numberOfConstraints, numberOfScenarios
+
+def countLecturesBeforeScenarios(lecturesDict, listOfAfterLessonsDict, constants, errors):
+    """
+    Function counting the logical_or constraints and their scenarios added by lecturesBeforeConstraint (see /model/constraints.py)
+
+    :param lecturesDict: (dict) lectures (see mergeLessonSpecs)
+    :param listOfAfterLessonsDict: (list) lessons of the lesson types given after the lectures
+    :param constants: (dict) dictionary with information about the model to build
+    :param errors: (list) messages of the AAs on which the constraint would fail, completed by this function
+    :return: (tuple) (number of logical_or, number of scenarios)
+    """
+    numberOfConstraints = 0
+    numberOfScenarios = 0
+    for idAA, lectures in lecturesDict.items():
+        if not (isinstance(lectures["weekBounds"][0],int) and isinstance(lectures["weekBounds"][1],int)):
+            continue
+        modelWeekBoundsLecture = getModelSegmentBounds(lectures["weekBounds"], constants)
+        sizeOfFullSequenceLecture = modelWeekBoundsLecture[1] - modelWeekBoundsLecture[0]
+        for lessonsOfDivisionLecture in lectures["divisions"]:
+            sizeOfFloatingSequenceLecture = int(len(lessonsOfDivisionLecture) % sizeOfFullSequenceLecture)
+            for afterLessonDict in listOfAfterLessonsDict:
+                if idAA not in afterLessonDict:
+                    continue
+                if not isinstance(afterLessonDict[idAA]["weekBounds"][0],int) or not isinstance(afterLessonDict[idAA]["weekBounds"][1],int):
+                    errors.append("lecturesBeforeConstraint : " + idAA + " has the week bounds " + str(afterLessonDict[idAA]["weekBounds"]))
+                    continue
+                modelWeekBoundsAfterLesson = getModelSegmentBounds(afterLessonDict[idAA]["weekBounds"], constants)
+                sizeOfFullSequenceAfterLesson = modelWeekBoundsAfterLesson[1] - modelWeekBoundsAfterLesson[0]
+                if modelWeekBoundsLecture[0] >= modelWeekBoundsAfterLesson[1] or modelWeekBoundsAfterLesson[0] >= modelWeekBoundsLecture[1]:
+                    continue
+                for lessonsOfDivisionAfterLesson in afterLessonDict[idAA]["divisions"]:
+                    numberOfFullSequencesAfterLesson = math.trunc(len(lessonsOfDivisionAfterLesson) / sizeOfFullSequenceAfterLesson)
+                    sizeOfFloatingSequenceAfterLesson = int(len(lessonsOfDivisionAfterLesson) % sizeOfFullSequenceAfterLesson)
+                    isFullAfterLesson = sizeOfFloatingSequenceAfterLesson == 0 or numberOfFullSequencesAfterLesson != 0
+
+                    if sizeOfFloatingSequenceLecture == 0 and isFullAfterLesson:
+                        # only end_before_start constraints
+                        continue
+                    numberOfConstraints += 1
+                    if sizeOfFloatingSequenceLecture == 0:
+                        # one scenario per position of the floating after lessons overlapping the last full sequence of lectures
+                        numberOfScenarios += sum(1 for i in range(sizeOfFullSequenceAfterLesson - sizeOfFloatingSequenceAfterLesson + 1)
+                                                 if any(lectureIndex + modelWeekBoundsLecture[0] == afterLessonIndex + modelWeekBoundsAfterLesson[0] + i
+                                                        for lectureIndex in range(sizeOfFullSequenceLecture) for afterLessonIndex in range(sizeOfFloatingSequenceAfterLesson)))
+                    elif isFullAfterLesson:
+                        # one scenario per position of the floating lectures overlapping the after lessons
+                        numberOfScenarios += sum(1 for i in range(sizeOfFullSequenceLecture - sizeOfFloatingSequenceLecture + 1)
+                                                 if any(lectureIndex + modelWeekBoundsLecture[0] + i == afterLessonIndex + modelWeekBoundsAfterLesson[0]
+                                                        for lectureIndex in range(sizeOfFloatingSequenceLecture) for afterLessonIndex in range(sizeOfFullSequenceAfterLesson)))
+                    else:
+                        # one scenario per pair of positions of both floating sequences
+                        numberOfScenarios += (sizeOfFullSequenceLecture - sizeOfFloatingSequenceLecture + 1) * (sizeOfFullSequenceAfterLesson - sizeOfFloatingSequenceAfterLesson + 1)
+    return numberOfConstraints, numberOfScenarios
+
+def countUnavailabilityLessons(resourceLessons, unavailableResources):
+    """
+    Function counting the forbid_extent constraints added by an unavailability constraint (see /model/constraints.py) : one per lesson of an unavailable resource.
+
+    :param resourceLessons: (dict) key = resource name, value = number of lessons (see countResourceLessons)
+    :param unavailableResources: (iterable) names of the resources with at least one unavailability
+    :return: (integer) number of forbid_extent
+    """
+    return sum(resourceLessons.get(resource, 0) for resource in set(unavailableResources))
+
+def estimateModelSize(lessonSpecs, constants):
+    """
+    Function estimating the size of the model built by runModel4Segments.py, without creating any interval variable or CpoModel.
+    The counts follow the constraint families of /model/constraints.py used by this script, and lecturesBeforeConstraint (lectures before exercises and tps).
+    An AA on which a constraint would fail (missing week bound) is reported in "errors" and not counted.
+
+    :param lessonSpecs: (dict) lessons of the model (see generateLessonSpecs)
+    :param constants: (dict) dictionary with information about the model to build (see generateIntervalVariables in /model/variables.py)
+    :return: (dict) dictionary with :
+        - "intervalVariables" : (dict) key = lesson type name, value = (integer) number of interval variables
+        - "noOverlap" : (dict) key = kind of resource, value = (dict) key = resource name, value = (integer) size of the no_overlap of the resource
+        - "forbidStart" : (dict) key = constraint family, value = (integer) number of forbid_start
+        - "forbidExtent" : (dict) key = constraint family, value = (integer) number of forbid_extent requested by the family,
+                           and key = "mergedUnavailabilities", value = (integer) number of forbid_extent in the model once merged per interval variable
+                           (see addUnavailabilities in /model/constraints.py, unavailabilities outside the domain of a lesson are counted)
+        - "logicalOr" : (dict) key = constraint family, value = (tuple) (number of logical_or, number of scenarios)
+        - "errors" : (list) messages of the AAs on which a constraint would fail
+    """
+    lessonDicts = dict(zip((spec["name"] for spec in LESSON_TYPES), mergeLessonSpecs(lessonSpecs)))
+    resourceLessons = countResourceLessons(lessonSpecs)
+
+    intervalVariables = {spec["name"]: 0 for spec in LESSON_TYPES}
+    for lesson in iterateLessonSpecs(lessonSpecs):
+        intervalVariables[lesson.lessonType] += 1
+
+    # unavailabilities of the groups of a cursus and of the teachers
+    cursusTable = TFEdata.loadTable(constants["fileDataset"], constants["quadri"], "Cursus")
+    teachersTable = TFEdata.loadTable(constants["fileDataset"], constants["quadri"], "Teachers")
+    unavailableGroups = [group for cursus in cursusTable["cursus"] for group in lessonSpecs["cursusGroups"].getGroups([cursus])]
+    # a lesson with at least one unavailable group or teacher has one forbid_extent once unavailabilities are merged
+    registry = TFEdata.registry
+    unavailableGroupIds = set(registry.getIds("group", unavailableGroups))
+    unavailableTeacherIds = set(registry.getIds("teacher", teachersTable["teacher"]))
+    mergedUnavailabilities = sum(1 for lesson in iterateLessonSpecs(lessonSpecs)
+                                 if not unavailableGroupIds.isdisjoint(lesson.groupIds) or not unavailableTeacherIds.isdisjoint(lesson.teacherIds))
+
+    errors = []
+    spreadScenarios = [countSpreadScenarios(lessonDict, constants, errors) for lessonDict in lessonDicts.values()]
+    lecturesBeforeScenarios = countLecturesBeforeScenarios(lessonDicts["lecture"], [lessonDicts["exercise"], lessonDicts["tp"]], constants, errors)
+
+    return {
+        "intervalVariables": intervalVariables,
+        "noOverlap": resourceLessons,
+        "forbidStart": {"longIntervalVariablesIntegrity": intervalVariables["tp"] + intervalVariables["project"]},
+        "forbidExtent": {"cursusUnavailabilityConstraint": countUnavailabilityLessons(resourceLessons["group"], unavailableGroups),
+                         "teachersUnavailabilityConstraint": countUnavailabilityLessons(resourceLessons["teacher"], teachersTable["teacher"]),
+                         "mergedUnavailabilities": mergedUnavailabilities},
+        "logicalOr": {"spreadIntervalVariablesOverSegments": (sum(c for c, s in spreadScenarios), sum(s for c, s in spreadScenarios)),
+                      "lecturesBeforeConstraint": lecturesBeforeScenarios},
+        "errors": errors
+    }
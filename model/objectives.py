@@ -1,17 +1,8 @@
 import docplex.cp.model as cp
+import calendars as TFEcalendars
 
 def avoidAfternoonForShortIntervalVariables(listOfLessonsDict, AAblacklist, constants):
-    afternoonPenalty = cp.CpoSegmentedFunction()
-    for i in range(int(constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"])):
-        slotPosition = i%4
-        if slotPosition == 0:
-            afternoonPenalty.set_value(i,i+1,0)
-        elif slotPosition == 1:
-            afternoonPenalty.set_value(i,i+1,0)
-        elif slotPosition == 2:
-            afternoonPenalty.set_value(i,i+1,0.5)
-        elif slotPosition == 3:
-            afternoonPenalty.set_value(i,i+1,1)
+    afternoonPenalty = TFEcalendars.getPeriodicSegmentedFunction(constants, (0, 0, 0.5, 1))
 
     objectiveFunction = cp.sum(
         [cp.start_eval(intervalVariable, afternoonPenalty) for lessonDict in listOfLessonsDict for ID, AA in lessonDict.items() for variablesOfDivision in
@@ -19,13 +10,8 @@ def avoidAfternoonForShortIntervalVariables(listOfLessonsDict, AAblacklist, cons
     return objectiveFunction
 
 def avoidAfternoonForLongIntervalVariables(listOfLessonsDict, AAblacklist, constants):
-    afternoonPenalty = cp.CpoSegmentedFunction()
-    for i in range(int((constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"]) / 2 + 1)):
-        slotPosition = i % 2
-        if slotPosition == 0:
-            afternoonPenalty.set_value(2 * i, 2 * (i + 1), 1)
-        elif slotPosition == 1:
-            afternoonPenalty.set_value(2 * i, 2 * (i + 1), 0)
+    # a long interval variable of the afternoon ends on the first slot of the next day (evaluated with end_eval), up to 2 slots after the model
+    afternoonPenalty = TFEcalendars.getPeriodicSegmentedFunction(constants, (1, 1, 0, 0), 2 * int(TFEcalendars.getTotalSlots(constants) / 2 + 1))
 
     objectiveFunction = cp.sum(
         [cp.end_eval(intervalVariable, afternoonPenalty) for lessonDict in listOfLessonsDict for ID, AA in lessonDict.items() for variablesOfDivision in
@@ -33,11 +19,7 @@ def avoidAfternoonForLongIntervalVariables(listOfLessonsDict, AAblacklist, const
     return objectiveFunction
 
 def avoidLastSlotForShortIntervalVariables(listOfLessonsDict, AAblacklist, constants):
-    lastSlotPenalty = cp.CpoSegmentedFunction()
-    for i in range(int(constants["weeks"] * constants["days"] * constants["slots"] / constants["segmentSize"])):
-        slotPosition = i % 4
-        if slotPosition == 3:
-            lastSlotPenalty.set_value(i, i + 1, 1)
+    lastSlotPenalty = TFEcalendars.getPeriodicSegmentedFunction(constants, (0, 0, 0, 1))
 
     objectiveFunction = cp.sum(
         [cp.start_eval(intervalVariable, lastSlotPenalty) for lessonDict in listOfLessonsDict for ID, AA in lessonDict.items() for variablesOfDivision in
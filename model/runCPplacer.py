@@ -6,7 +6,6 @@ import callbacks as TFEcallbacks
 import initialization as TFEinitialization
 import data.colors as colors
 import time
-import json
 import docplex.cp.model as cp
 
 """
@@ -85,8 +84,6 @@ cursusGroups, AAset = TFEvariables.generateIntervalVariablesForCPplacing(constan
 #groupsIntervalVariables,"\n", teachersIntervalVariables,"\n", roomsIntervalVariables,"\n", \
 #cursusGroups,"\n", AAset,"\n")
 
-weekDict = json.load(open("../data/weekseparation.json"))
-
 # constraint 6.3.4 : Unavailability
 TFEconstraints.cursusUnavailabilityConstraint(model, cursusGroups, groupsIntervalVariables, constants)
 
@@ -101,6 +98,7 @@ TFEconstraints.notOverlappingConstraint(model, roomsIntervalVariables)
 
 
 # constraint 6.3.9 (6.3.5 included) : Segment repartition
+# (weekDict = list of the weeks of weekseparation.json as written in the file, {"Semaine i": lessons} per week)
 # TFEconstraints.spreadOverWeek(model,weekDict,constants)
 
 # constraint 6.3.10 : Theory before TP and exercices
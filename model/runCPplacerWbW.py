@@ -79,7 +79,7 @@ Generates variables and place them in appropriate dict for later use :
 """
 lecturesDict, exercisesDict, tpsDict, projectsDict, \
 groupsIntervalVariables, teachersIntervalVariables, roomsIntervalVariables, \
-cursusGroups, AAset = TFEvariables.generateIntervalVariablesForJSON(constants,"../data/weekseparation.json")
+cursusGroups, AAset = TFEvariables.generateIntervalVariablesForJSON(constants,"weekseparation.json")
 
 
 # constraint 6.3.4 : Unavailability
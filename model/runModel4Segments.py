@@ -1,8 +1,11 @@
 import variables as TFEvariables
 import constraints as TFEconstraints
 import timetable as TFEtimetable
+import data.io as TFEdata
 import callbacks as TFEcallbacks
+import lessons as TFElessons
 import data.colors as colors
+import sys
 import time
 import docplex.cp.model as cp
 
@@ -37,6 +40,20 @@ model = cp.CpoModel()
                    7.2.3.rooms : "datasetAnglaisLocaux.xlsx") = file name of the dataset. Must be placed in the /data folder
     - folderResults (7.2.3.rooms : "4SegmentsStrategies") = folder name where the results will be stored. Must be placed in the /results folder
     - groupAuto (7.2.2 : True ; 7.2.3 : False) = boolean indicating if the divisions are generated automatically considering number of students or not
+    - dryRun (False) = boolean indicating if only the size of the model is printed, without building nor solving it
+    - foldDomains (False) = boolean indicating if segment bounds are written in the domains of the interval variables (see getLessonDomains in lessons.py)
+    - segmentNoOverlap (False) = boolean indicating if the no_overlap of a resource is split by segment for interval variables confined to one segment
+                                 (see notOverlappingConstraint in constraints.py, only useful with foldDomains)
+    - offsetEncoding (False) = boolean indicating if the placements of floating sequences are selected by one offset variable per floating sequence
+                               instead of a logical_or of scenarios (see addScenarios in constraints.py and benchmarkScenarioEncodings.py)
+    - linearSynchronization (False) = boolean indicating if the lessons of the divisions of an AA are synchronized with the first division
+                                      (one constraint per division) instead of one constraint per pair of divisions (see multipliedVariablesInSameSegmentConstraint)
+    - breakSymmetries (False) = boolean indicating if interchangeable lessons and divisions are detected and ordered once the model is built
+                                (see breakSymmetries in constraints.py). With the constraints of this script it is a no-op on the datasets of the repository :
+                                spreadIntervalVariablesOverSegments places each lesson of a division in its own segment and the group no_overlap link
+                                the divisions of different AAs, so no lessons nor divisions are interchangeable (lessons are only found with segmentBoundsConstraint)
+    - propagatePrecedences (False) = boolean indicating if the static precedences of the model tighten the start windows of the interval variables before solving
+                                     (see propagatePrecedences in constraints.py)
 """
 constants = {
     "weeks":12,
@@ -56,9 +73,39 @@ constants = {
     "quadri": "Q1",
     "fileDataset": "datasetAnglais.xlsx", #dataset-Base/Anglais/AnglaisLocaux
     "folderResults": "4SegmentsStrategies",
-    "groupAuto": False
+    "groupAuto": False,
+    "dryRun": False,
+    "foldDomains": False,
+    "segmentNoOverlap": False,
+    "offsetEncoding": False,
+    "linearSynchronization": False,
+    "breakSymmetries": False,
+    "propagatePrecedences": False
 }
 
+# the dataset is checked before building the model : the script stops if there is any error (see checkDataset in /data/io.py)
+TFEdata.checkDataset(constants)
+
+"""
+Dry run : prints the size of the model (see estimateModelSize in lessons.py) from the lessons of the dataset,
+without creating any interval variable nor CpoModel, then stops
+"""
+if constants["dryRun"]:
+    modelSize = TFElessons.estimateModelSize(TFElessons.generateLessonSpecs(constants), constants)
+    for lessonType, numberOfVariables in modelSize["intervalVariables"].items():
+        print("Interval variables (" + lessonType + ") :", numberOfVariables)
+    for kind, sizes in modelSize["noOverlap"].items():
+        print("no_overlap (" + kind + ") :", len(sizes), "sets,", sum(sizes.values()), "interval variables, largest :",
+              sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:5])
+    for family, numberOfConstraints in list(modelSize["forbidStart"].items()) + list(modelSize["forbidExtent"].items()):
+        print(family, ":", numberOfConstraints, "forbid constraints")
+    for family, (numberOfConstraints, numberOfScenarios) in modelSize["logicalOr"].items():
+        print(family, ":", numberOfConstraints, "logical_or,", numberOfScenarios, "scenarios")
+    for error in modelSize["errors"]:
+        print("Error :", error)
+    print(time.time()-begin)
+    sys.exit()
+
 """
 Generates variables and place them in appropriate dict for later use :
     - lecturesDict = (dict) all lecture interval variables divided by AA
@@ -83,10 +130,10 @@ TFEconstraints.teachersUnavailabilityConstraint(model, teachersIntervalVariables
 TFEconstraints.longIntervalVariablesIntegrity(model, tpsDict, constants)
 TFEconstraints.longIntervalVariablesIntegrity(model, projectsDict, constants)
 
-# constraint 6.3.2
-TFEconstraints.notOverlappingConstraint(model, groupsIntervalVariables)
-TFEconstraints.notOverlappingConstraint(model, teachersIntervalVariables)
-TFEconstraints.notOverlappingConstraint(model, roomsIntervalVariables)
+# constraint 6.3.2 (resources with the same interval variables or a subset of them share one no_overlap, see notOverlappingConstraint)
+TFEconstraints.notOverlappingConstraint(model, groupsIntervalVariables, constants)
+TFEconstraints.notOverlappingConstraint(model, teachersIntervalVariables, constants)
+TFEconstraints.notOverlappingConstraint(model, roomsIntervalVariables, constants)
 
 # constraint 6.3.3
 TFEconstraints.multipliedVariablesInSameSegmentConstraint(model, exercisesDict, constants)
@@ -98,9 +145,26 @@ TFEconstraints.spreadIntervalVariablesOverSegments(model, exercisesDict, constan
 TFEconstraints.spreadIntervalVariablesOverSegments(model, tpsDict, constants)
 TFEconstraints.spreadIntervalVariablesOverSegments(model, projectsDict, constants)
 
+# symmetries are searched once all constraints are in the model
+if constants["breakSymmetries"]:
+    TFEconstraints.breakSymmetries(model, [lecturesDict, exercisesDict, tpsDict, projectsDict],
+                                   [groupsIntervalVariables, teachersIntervalVariables, roomsIntervalVariables], constants)
+    print("Symmetries : " + str(TFEconstraints.getSymmetryStatistics()))
+
+# the windows of the interval variables are tightened once all constraints are in the model : the script stops if a chain of precedences is infeasible
+if constants["propagatePrecedences"]:
+    infeasibleChains = TFEconstraints.propagatePrecedences(model, constants)
+    for chain in infeasibleChains:
+        print("Infeasible chain :", chain)
+    if infeasibleChains:
+        raise ValueError(str(len(infeasibleChains)) + " infeasible chain(s) of precedences in the model")
+    print("Precedences : " + str(TFEconstraints.getPrecedenceStatistics()))
+
 model.add_solver_callback(TFEcallbacks.PersonalCallback())
 
 print(time.time()-begin)
+print("Unavailabilities : " + str(TFEconstraints.getUnavailabilityStatistics()))
+print("no_overlap : " + str(TFEconstraints.getNoOverlapStatistics()))
 model.write_information()
 ################# SETUP MODEL #################
 
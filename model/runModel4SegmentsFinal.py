@@ -4,6 +4,7 @@ import timetable as TFEtimetable
 import objectives as TFEobjectives
 import callbacks as TFEcallbacks
 import initialization as TFEinitialization
+import data.io as TFEdata
 import data.colors as colors
 import time
 import docplex.cp.model as cp
@@ -93,6 +94,9 @@ constants = {
     "groupAuto": False
 }
 
+# the dataset is checked before building the model : the script stops if there is any error (see checkDataset in /data/io.py)
+TFEdata.checkDataset(constants)
+
 """
 Generates variables and place them in appropriate dict for later use :
     - lecturesDict = (dict) all lecture interval variables divided by AA
@@ -110,6 +114,7 @@ groupsIntervalVariables, teachersIntervalVariables, roomsIntervalVariables, \
 cursusGroups, AAset = TFEvariables.generateIntervalVariables(constants)
 
 print("Reading data : " + str(time.time() - begin))
+print("Dataset cache : " + str(TFEdata.getDatasetCacheStatistics()))
 
 # constraint 6.3.4 : Unavailability
 TFEconstraints.cursusUnavailabilityConstraint(model, cursusGroups, groupsIntervalVariables, constants)
@@ -1,6 +1,7 @@
 import variables as TFEvariables
 import constraints as TFEconstraints
 import timetable as TFEtimetable
+import data.io as TFEdata
 import data.colors as colors
 import time
 import docplex.cp.model as cp
@@ -60,6 +61,9 @@ constants = {
     "groupAuto": True
 }
 
+# the dataset is checked before building the model : the script stops if there is any error (see checkDataset in /data/io.py)
+TFEdata.checkDataset(constants)
+
 """
 Generates variables and place them in appropriate dict for later use :
     - lecturesDict = (dict) all lecture interval variables divided by AA
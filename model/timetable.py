@@ -1,5 +1,5 @@
 import numpy as np
-import math
+import TimeGrid as TFEtimeGrid
 import matplotlib.pyplot as plt
 import random
 
@@ -10,8 +10,9 @@ def generateTimetables(solution, majorData, minorData1, minorData2, constants, c
 
     fullNameOfLessons = {"lec": "Cours","ex": "Exercices","tp": "TP","pr": "Projet"}
     timetables = {}
+    timeGrid = TFEtimeGrid.getTimeGrid(constants)
     for majorName,majorIntervalVariables in majorData.items():
-        timetable = np.full((constants["slots"], int(constants["days"] * constants["weeks"] / constants["segmentSize"])), "", dtype=object)
+        timetable = np.full((timeGrid.slots, timeGrid.totalDays), "", dtype=object)
         for majorIntervalVariable in majorIntervalVariables:
             variableName = majorIntervalVariable.get_name()
             valuesOfInterval = solution[variableName]
@@ -58,8 +59,8 @@ def generateTimetables(solution, majorData, minorData1, minorData2, constants, c
             elif "ch4" in variableName:
                 displayName += "4"
 
-            dayOfTimetable = math.trunc(valuesOfInterval[0] / constants["slots"])
-            slotOfTimetable = valuesOfInterval[0] % constants["slots"]
+            dayOfTimetable = timeGrid.dayOfSlot[valuesOfInterval[0]]
+            slotOfTimetable = timeGrid.slotInDay[valuesOfInterval[0]]
             timetable[slotOfTimetable][dayOfTimetable] = displayName
 
             if "Charleroi" not in displayName and caracteristicsOfVariable[0] not in colorsDict: